@@ -0,0 +1,45 @@
+"""
+Benchmark of resolving very deep documents.
+
+The documents nest far deeper than the Python recursion limit, which is
+left untouched.
+
+Run with `python benchmarks/deep.py`.
+"""
+import sys
+import time
+
+from dollar_ref import resolve
+
+from generators import nested
+
+
+def chained(depth: int) -> dict:
+    """
+    Return a document of `depth` definitions, each referencing the next.
+    """
+    data = {
+        f'd{i}': {'next': {'$ref': f'#/d{i + 1}'}}
+        for i in range(depth)
+    }
+    data[f'd{depth}'] = 'deep'
+
+    return data
+
+
+def main():
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+
+    for name, generate in (('nested', nested), ('chained', chained)):
+        for depth in (1000, 10000, 100000):
+            data = generate(depth)
+
+            start = time.perf_counter()
+            resolve(data)
+            elapsed = time.perf_counter() - start
+
+            print(f"{name:>8} depth={depth:<7} {elapsed * 1000:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Generators of synthetic documents resembling real specifications, used by
+the benchmark suite.
+"""
+import os
+import json
+
+import yaml
+
+
+def schema(i: int, ref: str = None) -> dict:
+    """
+    Return an OpenAPI like object schema, referencing `ref` if given.
+    """
+    properties = {
+        'id': {'type': 'integer', 'format': 'int64', 'minimum': 0},
+        'name': {'type': 'string', 'maxLength': 128},
+        'ratio': {'type': 'number', 'default': i / 7},
+        'tags': {'type': 'array', 'items': {'type': 'string'}}
+    }
+
+    if ref is not None:
+        properties['parent'] = {'$ref': ref}
+
+    return {
+        'type': 'object',
+        'description': f'Schema number {i}.',
+        'required': ['id', 'name'],
+        'properties': properties
+    }
+
+
+def wide_definitions(count: int) -> dict:
+    """
+    Return a document with `count` definitions, each but the first
+    referencing another one, and paths referencing all of them.
+    """
+    return {
+        'paths': {
+            f'/items{i}': {
+                'get': {
+                    'responses': {
+                        '200': {
+                            'schema': {'$ref': f'#/definitions/Schema{i}'}
+                        }
+                    }
+                }
+            }
+            for i in range(count)
+        },
+        'definitions': {
+            f'Schema{i}': schema(i, f'#/definitions/Schema{i // 2}'
+                                 if i else None)
+            for i in range(count)
+        }
+    }
+
+
+def fan_in(refs: int, targets: int = 4) -> dict:
+    """
+    Return a document with `refs` references to only `targets` definitions.
+    """
+    return {
+        'items': [
+            {'$ref': f'#/definitions/Schema{i % targets}'}
+            for i in range(refs)
+        ],
+        'definitions': {
+            f'Schema{i}': schema(i) for i in range(targets)
+        }
+    }
+
+
+def nested(depth: int) -> dict:
+    """
+    Return a document nesting dicts and lists `depth` levels deep, with an
+    internal reference at the bottom.
+    """
+    data = {'value': 'deep'}
+
+    node = data
+    for _ in range(depth):
+        node['child'] = {'items': [{}]}
+        node = node['child']['items'][0]
+
+    node['ref'] = {'$ref': '#/value'}
+
+    return data
+
+
+def sparse(count: int, refs: int = 10) -> dict:
+    """
+    Return a document with `count` example payloads and only `refs`
+    references among them.
+    """
+    return {
+        'examples': [
+            {
+                'id': i,
+                'name': f'Example {i}',
+                'values': list(range(10)),
+                'schema': ({'$ref': '#/definitions/Example'}
+                           if i % max(count // refs, 1) == 0
+                           else {'type': 'object'})
+            }
+            for i in range(count)
+        ],
+        'definitions': {'Example': schema(0)}
+    }
+
+
+def small_files(directory: str, count: int) -> dict:
+    """
+    Write `count` small JSON files into `directory`, each referencing a
+    shared one, and return a root document referencing all of them.
+    """
+    with open(os.path.join(directory, 'common.json'), 'w') as file:
+        json.dump({'Common': schema(0)}, file)
+
+    for i in range(count):
+        with open(os.path.join(directory, f'schema{i}.json'), 'w') as file:
+            json.dump(schema(i, 'common.json#/Common'), file)
+
+    return {
+        'definitions': {
+            f'Schema{i}': {'$ref': f'schema{i}.json'} for i in range(count)
+        }
+    }
+
+
+def huge_yaml(directory: str, files: int, definitions: int) -> dict:
+    """
+    Write `files` YAML files of `definitions` schemas each into
+    `directory`, and return a root document referencing all of them.
+    """
+    for i in range(files):
+        with open(os.path.join(directory, f'huge{i}.yaml'), 'w') as file:
+            yaml.dump(wide_definitions(definitions), file,
+                      Dumper=getattr(yaml, 'CDumper', yaml.Dumper))
+
+    return {
+        f'part{i}': {'$ref': f'huge{i}.yaml#/definitions'}
+        for i in range(files)
+    }
+
+
+def huge_json(directory: str, definitions: int) -> str:
+    """
+    Write a JSON file of `definitions` schemas into `directory` and return
+    its path.
+    """
+    path = os.path.join(directory, 'huge.json')
+
+    with open(path, 'w') as file:
+        json.dump(wide_definitions(definitions), file)
+
+    return path
+
+
+def payloads(directory: str, count: int) -> dict:
+    """
+    Write a JSON file of `count` example payloads without any references
+    into `directory`, and return a root document referencing parts of it.
+    """
+    with open(os.path.join(directory, 'payloads.json'), 'w') as file:
+        json.dump({
+            'examples': [
+                {'id': i, 'name': f'Example {i}', 'values': list(range(10))}
+                for i in range(count)
+            ]
+        }, file)
+
+    return {
+        'all': {'$ref': 'payloads.json#/examples'},
+        'first': {'$ref': 'payloads.json#/examples/0'}
+    }
+
+
+def pointers(count: int) -> list:
+    """
+    Return `count` JSON pointers into a `wide_definitions(count)` document.
+    """
+    return [f'#/definitions/Schema{i}/properties/name'
+            for i in range(count)]
+
+
+def missing_pointers(count: int) -> list:
+    """
+    Return `count` JSON pointers to optional properties missing from the
+    schemas of a `wide_definitions(count)` document.
+    """
+    return [f'#/definitions/Schema{i}/properties/optional'
+            for i in range(count)]
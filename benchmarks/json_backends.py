@@ -0,0 +1,58 @@
+"""
+Benchmark of decoding a large JSON document with the standard `json`
+module and with the JSON decoder picked by `dollar_ref`.
+
+Run with `python benchmarks/json_backends.py`.
+"""
+import json
+import time
+
+from dollar_ref import JSON_BACKEND
+from dollar_ref.decoders import decode_json
+
+
+def spec(definitions: int) -> dict:
+    """
+    Return an OpenAPI like document with `definitions` schemas.
+    """
+    return {
+        'definitions': {
+            f'Schema{i}': {
+                'type': 'object',
+                'description': f'Schema number {i} ' * 4,
+                'properties': {
+                    'id': {'type': 'integer', 'minimum': 0},
+                    'ratio': {'type': 'number', 'default': i / 7},
+                    'tags': {'type': 'array', 'items': {'type': 'string'}},
+                    'parent': {'$ref': f'#/definitions/Schema{i // 2}'}
+                }
+            }
+            for i in range(definitions)
+        }
+    }
+
+
+def best_of(repeat: int, function, *args) -> float:
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    raw = json.dumps(spec(50000))
+
+    print(f"document size: {len(raw) / 1024 / 1024:.1f} MiB")
+
+    for name, decode in (('json', json.loads), (JSON_BACKEND, decode_json)):
+        elapsed = best_of(5, decode, raw)
+
+        print(f"{name:>8} {elapsed * 1000:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
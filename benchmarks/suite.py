@@ -0,0 +1,295 @@
+"""
+Benchmark suite of the resolution hot paths.
+
+Every benchmark times a number of rounds of one workload, each on freshly
+generated data, and the best, median and mean times are reported. The
+results may be written as JSON and compared against an earlier run:
+
+    python benchmarks/suite.py --output new.json --compare old.json
+
+Run with `make bench`, or `python benchmarks/suite.py --help` for options.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+from copy import deepcopy
+from collections import OrderedDict
+
+import dollar_ref
+from dollar_ref import (
+    resolve, read_file, DocumentCache, InternalResolutionError, _follow_path
+)
+from dollar_ref.bundle import bundle
+from dollar_ref.plan import compile_plan
+
+import generators
+
+
+BENCHMARKS = OrderedDict()
+
+
+def benchmark(function):
+    """
+    Register a benchmark.
+
+    The benchmark is called with the size `scale` and a scratch
+    `directory`, and returns a `setup` function, returning the arguments of
+    a single round, and a `run` function, which is timed.
+    """
+    BENCHMARKS[function.__name__] = function
+
+    return function
+
+
+def _copying(data):
+    return lambda: (deepcopy(data),)
+
+
+def _generating(generate, *args):
+    return lambda: (generate(*args),)
+
+
+@benchmark
+def wide_definitions(scale: float, directory: str):
+    return (_generating(generators.wide_definitions, int(5000 * scale)),
+            resolve)
+
+
+@benchmark
+def fan_in(scale: float, directory: str):
+    return _generating(generators.fan_in, int(50000 * scale)), resolve
+
+
+@benchmark
+def deep_nesting(scale: float, directory: str):
+    return _generating(generators.nested, int(20000 * scale)), resolve
+
+
+@benchmark
+def sparse_copied(scale: float, directory: str):
+    data = generators.sparse(int(20000 * scale))
+
+    return (lambda: (data,)), lambda data: resolve(deepcopy(data))
+
+
+@benchmark
+def sparse_shared(scale: float, directory: str):
+    data = generators.sparse(int(20000 * scale))
+
+    return (lambda: (data,)), lambda data: resolve(data, inplace=False)
+
+
+@benchmark
+def follow_path(scale: float, directory: str):
+    count = int(5000 * scale)
+    data = generators.wide_definitions(count)
+    pointers = generators.pointers(count)
+
+    def run():
+        for pointer in pointers:
+            _follow_path(pointer, data)
+
+    return tuple, run
+
+
+@benchmark
+def ref_misses(scale: float, directory: str):
+    count = int(5000 * scale)
+    data = generators.wide_definitions(count)
+    pointers = generators.missing_pointers(count)
+
+    def run():
+        for pointer in pointers:
+            try:
+                _follow_path(pointer, data)
+            except InternalResolutionError:
+                pass
+
+    return tuple, run
+
+
+@benchmark
+def small_files(scale: float, directory: str):
+    data = generators.small_files(directory, int(500 * scale))
+
+    return _copying(data), lambda data: resolve(data, cwd=directory)
+
+
+@benchmark
+def small_files_cached(scale: float, directory: str):
+    data = generators.small_files(directory, int(500 * scale))
+    cache = DocumentCache(maxsize=None)
+
+    resolve(deepcopy(data), cwd=directory, cache=cache)
+
+    return (_copying(data),
+            lambda data: resolve(data, cwd=directory, cache=cache))
+
+
+@benchmark
+def huge_json_cached(scale: float, directory: str):
+    generators.huge_json(directory, int(20000 * scale))
+    data = {'all': {'$ref': 'huge.json'}}
+    cache = DocumentCache(maxsize=None)
+
+    resolve(deepcopy(data), cwd=directory, cache=cache)
+
+    return (_copying(data),
+            lambda data: resolve(data, cwd=directory, cache=cache))
+
+
+@benchmark
+def small_files_planned(scale: float, directory: str):
+    data = generators.small_files(directory, int(500 * scale))
+    plan = compile_plan(data, cwd=directory)
+
+    return tuple, plan.apply
+
+
+@benchmark
+def small_files_replayed(scale: float, directory: str):
+    data = generators.small_files(directory, int(500 * scale))
+    plan = compile_plan(data, cwd=directory)
+
+    return (lambda: (data,)), plan.apply
+
+
+@benchmark
+def small_files_bundled(scale: float, directory: str):
+    data = generators.small_files(directory, int(500 * scale))
+
+    return _copying(data), lambda data: bundle(data, directory)
+
+
+@benchmark
+def ref_free_file(scale: float, directory: str):
+    data = generators.payloads(directory, int(50000 * scale))
+
+    return _copying(data), lambda data: resolve(data, cwd=directory)
+
+
+@benchmark
+def huge_yaml(scale: float, directory: str):
+    data = generators.huge_yaml(directory, 3, int(2000 * scale))
+
+    return _copying(data), lambda data: resolve(data, cwd=directory)
+
+
+@benchmark
+def read_huge_yaml(scale: float, directory: str):
+    generators.huge_yaml(directory, 1, int(2000 * scale))
+    path = os.path.join(directory, 'huge0.yaml')
+
+    return tuple, lambda: read_file(path)
+
+
+@benchmark
+def read_huge_json(scale: float, directory: str):
+    path = generators.huge_json(directory, int(20000 * scale))
+
+    return tuple, lambda: read_file(path)
+
+
+def measure(name: str, rounds: int, scale: float) -> dict:
+    """
+    Run the benchmark `name` for `rounds` rounds and return its timings.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        setup, run = BENCHMARKS[name](scale, directory)
+
+        times = []
+        for _ in range(rounds):
+            args = setup()
+
+            start = time.perf_counter()
+            run(*args)
+            times.append(time.perf_counter() - start)
+
+    return {
+        'rounds': rounds,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times)
+    }
+
+
+def environment() -> dict:
+    """
+    Return the description of the environment the benchmarks run in.
+    """
+    try:
+        from importlib.metadata import version
+        package = version('dollar-ref')
+    except Exception:  # pylint: disable=broad-except
+        package = 'unknown'
+
+    return {
+        'dollar_ref': package,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'json_backend': dollar_ref.JSON_BACKEND,
+        'libyaml': bool(dollar_ref.HAS_LIBYAML)
+    }
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help=('the benchmarks to run, all by default: '
+                              f"{', '.join(BENCHMARKS)}."))
+    parser.add_argument('-r', '--rounds', type=int, default=5,
+                        help='the number of rounds of every benchmark.')
+    parser.add_argument('-s', '--scale', type=float, default=1.0,
+                        help='the multiplier of the workload sizes.')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='write the results to FILE as JSON.')
+    parser.add_argument('-c', '--compare', metavar='FILE',
+                        help='compare with the results in FILE.')
+
+    parsed = parser.parse_args(args)
+
+    for name in parsed.names:
+        if name not in BENCHMARKS:
+            parser.error(f"Unknown benchmark '{name}'.")
+
+    return parsed
+
+
+def main(args=None):
+    args = parse_args(sys.argv[1:] if args is None else args)
+
+    baseline = {}
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+
+    results = OrderedDict()
+
+    for name in args.names or BENCHMARKS:
+        results[name] = measure(name, args.rounds, args.scale)
+
+        line = (f"{name:>20} {results[name]['min'] * 1000:10.2f} ms "
+                f"{results[name]['median'] * 1000:10.2f} ms")
+
+        if name in baseline:
+            ratio = results[name]['min'] / baseline[name]['min']
+            line += f" {ratio:8.2f}x"
+
+        print(line)
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'environment': environment(),
+                'scale': args.scale,
+                'results': results
+            }, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark of reading and writing large YAML files with the pure Python and
+the libyaml PyYAML backends.
+
+Run with `python benchmarks/yaml_backends.py`.
+"""
+import io
+import os
+import tempfile
+import time
+
+import yaml
+
+from dollar_ref import read_file, yaml_dumper, HAS_LIBYAML
+
+
+def spec(definitions: int) -> dict:
+    """
+    Return an OpenAPI like document with `definitions` schemas.
+    """
+    return {
+        'definitions': {
+            f'Schema{i}': {
+                'type': 'object',
+                'required': ['id', 'name'],
+                'properties': {
+                    'id': {'type': 'integer', 'format': 'int64'},
+                    'name': {'type': 'string', 'maxLength': 128},
+                    'tags': {'type': 'array', 'items': {'type': 'string'}},
+                    'parent': {'$ref': f'#/definitions/Schema{i // 2}'}
+                }
+            }
+            for i in range(definitions)
+        }
+    }
+
+
+def measure(function, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    function(*args, **kwargs)
+
+    return time.perf_counter() - start
+
+
+def main():
+    backends = ['python'] + (['libyaml'] if HAS_LIBYAML else [])
+    data = spec(5000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'spec.yaml')
+        with open(path, 'w') as file:
+            yaml.dump(data, file, Dumper=yaml_dumper(),
+                      default_flow_style=False)
+
+        size = os.path.getsize(path) / 1024 / 1024
+        print(f"file size: {size:.1f} MiB")
+
+        for backend in backends:
+            read = measure(read_file, path, loader=backend)
+            write = measure(yaml.dump, data, io.StringIO(),
+                            Dumper=yaml_dumper(backend),
+                            default_flow_style=False)
+
+            print(f"{backend:>8} read {read:8.3f} s  write {write:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
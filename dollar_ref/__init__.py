@@ -2,10 +2,40 @@
 Main functionality of `dollar-ref` library.
 """
 import os
+import time
+import asyncio
+import reprlib
+import functools
+from copy import deepcopy
 import logging
-import json
+from urllib.parse import urldefrag, urlsplit, unquote
+from urllib.request import url2pathname
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+)
 
-import yaml
+from dollar_ref.backends import (
+    YAML_BACKENDS, HAS_LIBYAML, yaml_loader, yaml_dumper
+)
+from dollar_ref.cache import (
+    DocumentCache, DiskCache, default_cache_dir, normalize_path
+)
+from dollar_ref.lazy import LazyMapping, LazySequence
+from dollar_ref.pointer import (
+    PointerIndex, PointerLookupError, compile_pointer, walk
+)
+from dollar_ref.refs import RefIndex, scan
+from dollar_ref.loaders import (
+    LOADERS, Loader, LoaderError, MemoryLoader, ArchiveLoader, Response,
+    register_loader, unregister_loader, is_uri, join_uri
+)
+from dollar_ref.remote import RemoteLoader, RemoteError
+from dollar_ref.writers import write_json, write_yaml
+from dollar_ref.stats import ResolutionStats
+from dollar_ref.decoders import (
+    DECODERS, JSON_BACKEND, Decoder,
+    register_decoder, unregister_decoder, find_decoder
+)
 
 
 class ResolutionError(Exception):
@@ -15,11 +45,43 @@ class ResolutionError(Exception):
     pass
 
 
+_brief = reprlib.Repr()
+_brief.maxlevel = 2
+_brief.maxdict = 4
+_brief.maxlist = 4
+_brief.maxstring = 40
+_brief.maxother = 40
+
+
 class InternalResolutionError(ResolutionError):
     """
     Error while resolving internal referenses.
+
+    Errors of missing targets carry the `ref` being resolved, the pointer
+    `token` which was not found, the `node` it was looked up in and the
+    `path` of the file if the reference is into one. The message is only
+    formatted when needed, showing a truncated representation of the node,
+    so that errors caught and handled, e.g. when probing for optional
+    targets, take no time formatting large documents.
     """
-    pass
+    def __init__(self, message: str = None, *, ref: str = None,
+                 token: str = None, node=None, path: str = None):
+        super().__init__(message)
+
+        self.message = message
+        self.ref = ref
+        self.token = token
+        self.node = node
+        self.path = path
+
+    def __str__(self):
+        if self.message is not None:
+            return self.message
+
+        where = '' if self.path is None else f" in '{self.path}'"
+
+        return (f"Error resolving '{self.ref}'{where}, "
+                f"'{self.token}' not found in {_brief.repr(self.node)}.")
 
 
 class FileResolutionError(ResolutionError):
@@ -29,6 +91,13 @@ class FileResolutionError(ResolutionError):
     pass
 
 
+class RemoteResolutionError(ResolutionError):
+    """
+    Error while resolving a reference to a remote document.
+    """
+    pass
+
+
 class DecodeError(ResolutionError):
     """
     Error while deciding a referenced file.
@@ -36,57 +105,102 @@ class DecodeError(ResolutionError):
     pass
 
 
+class CircularReferenceError(ResolutionError):
+    """
+    Error when a reference directly or indirectly refers to itself.
+    """
+    pass
+
+
+CIRCULAR_POLICIES = ('raise', 'keep', 'link')
+
+
 log = logging.getLogger('dollar-ref.lib')
 
 
 def resolve(data, root=None, cwd: str = None,
-            *, external_only: bool = False) -> dict:
+            *, external_only: bool = False,
+            cache: DocumentCache = None, copy: bool = False,
+            circular: str = 'raise', loader='auto',
+            workers: int = None, processes: bool = False,
+            dependencies: set = None, stats: ResolutionStats = None,
+            inplace: bool = True, remote: RemoteLoader = None,
+            loaders: dict = None) -> dict:
     """
-    Recursively resolve any references in `data` **inplace**.
+    Resolve any references in `data` **inplace**, unless `inplace` is
+    `False`.
 
     If `root` is provided, all internal references are resolved relative
     to that document.
 
     If `cwd` is provided, all external references are resolved relative
-    to that path.
+    to that path. It may also be the URI of `data`, which is then the base
+    URI of its references.
 
     If `external_only` is passed as `True` then only external references
     are reloved.
 
-    Additionally, returns the resolved document.
-    """
-    if not isinstance(data, dict):
-        if isinstance(data, list):
-            for i, item in enumerate(data):
-                data[i] = resolve(item, root, cwd,
-                                  external_only=external_only)
+    Every referenced file is read and decoded only once per call. If a
+    `DocumentCache` is passed as `cache`, the decoded files are also kept
+    there for subsequent calls.
 
-        return data
+    Every referenced object is resolved only once and the same resolved
+    object is shared by all of its references. If `copy` is `True`, each
+    reference gets an independent deep copy instead.
 
-    if root is None:
-        root = data
+    The `circular` argument defines what happens with a reference to an
+    object that is still being resolved, e.g. a recursive schema:
+        'raise' - a `CircularReferenceError` is raised.
+        'keep' - the reference is kept as is.
+        'link' - the reference is replaced with the object itself, which
+            results in a cyclic Python object.
 
-    if '$ref' not in data:
-        for subkey in data:
-            data[subkey] = resolve(data[subkey], root, cwd,
-                                   external_only=external_only)
+    The `loader` selects the YAML backend used to decode the referenced
+    files, see `read_file`.
 
-        return data
+    If `workers` is more than 1, all the files referenced from `data`,
+    directly or through other files, are loaded up front by that many
+    threads, which pays off for slow file systems. If `processes` is also
+    `True`, the files are decoded in as many worker processes instead. The
+    result is the same as without `workers`.
 
-    ref = data['$ref']
+    If a `set` is passed as `dependencies`, the normalized paths of all the
+    files the resolution needed are added to it, including the missing
+    ones, even if the resolution fails.
 
-    if ref.startswith('#'):
-        if not external_only:
-            return resolve_internal(ref, root, cwd=cwd)
+    If a `ResolutionStats` is passed as `stats`, the counters and timings
+    of the resolution are added to it.
 
-        return data
-    elif ref.startswith(('http://', 'https://')):
-        raise ResolutionError("Web resolution is not implemented yet")
-    else:
-        return resolve_file(ref, cwd, external_only=external_only)
+    If `inplace` is `False`, `data` and `root` are left untouched and a new
+    document is built instead. Only the containers on the way to the
+    references are copied, shallowly, while all the other objects are
+    shared with `data`, so the cost depends on the number of references
+    rather than on the size of the document. The result must not be
+    modified if `data` is to be kept intact, and neither must the documents
+    of a `cache`, which are not copied then.
 
+    References to URIs, and relative references in the documents loaded
+    from them, are loaded by the `Loader` of their scheme. The `loaders`
+    are given by scheme and take precedence over the ones registered with
+    `register_loader`. The `RemoteLoader` passed as `remote` is used for
+    the 'http' and 'https' schemes, without which such references raise
+    `RemoteResolutionError`.
 
-def _follow_path(ref: str, data: dict) -> dict:
+    Additionally, returns the resolved document.
+    """
+    resolver = _Resolver(external_only=external_only, cache=cache, copy=copy,
+                         circular=circular, loader=loader,
+                         workers=workers, processes=processes, stats=stats,
+                         inplace=inplace, remote=remote, loaders=loaders)
+
+    try:
+        return resolver.resolve(data, root, cwd)
+    finally:
+        if dependencies is not None:
+            dependencies.update(resolver.files)
+
+
+def _follow_path(ref: str, data: dict, index: PointerIndex = None) -> dict:
     """
     Returns the object from `data` at `ref`.
 
@@ -101,41 +215,51 @@ def _follow_path(ref: str, data: dict) -> dict:
 
         The result will be:
             'value'
-    """
-    if ref in ('', '#', '#/'):
-        return data
 
-    ref_path = ref[2:].split('/')
+    The reference is a JSON pointer as defined by RFC 6901, so the `~1` and
+    `~0` escapes stand for `/` and `~`, and items of lists are referred to
+    by their indices.
 
-    ref_data = data
-    for path_item in ref_path:
-        try:
-            ref_data = ref_data[path_item]
-        except KeyError:
-            log.debug(f"Key '{path_item}' not found in '{ref_data}'"
-                      f"while resolving '{ref}'")
-            raise InternalResolutionError(
-                f"Error resolving '{ref}', "
-                f"'{path_item}' not found in '{ref_data}'."
-            )
+    If a `PointerIndex` of `data` is passed as `index`, the lookup goes
+    through it.
+    """
+    try:
+        path = compile_pointer(ref)
+    except ValueError as exc:
+        raise InternalResolutionError(str(exc)) from None
 
-    return ref_data
+    try:
+        if index is None:
+            return walk(data, path)
+
+        return index.find(data, path)
+    except PointerLookupError as exc:
+        log.debug("Key '%s' not found while resolving '%s'.", exc.token, ref)
+        raise InternalResolutionError(ref=ref, token=exc.token,
+                                      node=exc.node) from None
 
 
-def resolve_internal(ref: str, root: dict, cwd: str = None) -> dict:
+def resolve_internal(ref: str, root: dict, cwd: str = None, *,
+                     dependencies: set = None, **options) -> dict:
     """
     Resolve an internal reference specified by `ref`.
 
     The resolution is performed based on the `root` document.
-    """
-    log.debug(f"Resolving internal reference '{ref}'.")
 
-    ref_data = _follow_path(ref, root)
+    The `dependencies` and the other keyword `options` are the same as for
+    `resolve`.
+    """
+    resolver = _Resolver(**options)
 
-    return resolve(ref_data, root=root, cwd=cwd, external_only=False)
+    try:
+        return resolver.resolve_internal(ref, root, cwd)
+    finally:
+        if dependencies is not None:
+            dependencies.update(resolver.files)
 
 
-def resolve_file(ref: str, cwd: str, *, external_only: bool = False) -> dict:
+def resolve_file(ref: str, cwd: str, *, external_only: bool = False,
+                 dependencies: set = None, **options) -> dict:
     """
     Resolve an external file reference specified by `ref`.
 
@@ -147,38 +271,920 @@ def resolve_file(ref: str, cwd: str, *, external_only: bool = False) -> dict:
 
     If `external_only` is `True`, the internal references of the referenced
     file contents are not resolved and are kept as is.
+
+    The `dependencies` and the other keyword `options` are the same as for
+    `resolve`.
+    """
+    resolver = _Resolver(external_only=external_only, **options)
+
+    try:
+        return resolver.resolve_file(ref, cwd)
+    finally:
+        if dependencies is not None:
+            dependencies.update(resolver.files)
+
+
+_TARGET = object()
+_PUSHED = object()
+_NOTHING = object()
+
+# The types of the values which are never walked.
+_SCALARS = frozenset((str, int, float, bool, type(None)))
+
+
+class _Resolver:
+    """
+    Holds the state of a single top-level resolution.
+
+    The referenced files are decoded once and kept in `documents` for the
+    whole resolution, so that every reference to the same file is resolved
+    against the same document. The paths of all the files the resolution
+    asked for are kept in `files`.
+
+    The errors of loading files ahead of the resolution are kept in
+    `failures` and raised when the resolution gets to them.
+
+    The resolved targets are memoized in `memo` by the identity of their
+    document and their JSON pointer, and the identities of the already
+    resolved containers are kept in `resolved`, so that no subtree is
+    walked twice. The containers holding scalars only are neither walked
+    nor kept, as they have nothing to resolve. The targets being resolved
+    are kept in `pending` in the order they were entered, and the
+    containers being walked in `active` with the number of pending targets
+    when they were entered, which are used to detect circular references,
+    also to targets reached first as ordinary containers.
+
+    Unless resolving `inplace`, the containers are never modified. Instead,
+    the first resolved value differing from the original item of a
+    container goes into a shallow copy of it, kept in `copies` by the
+    identity of the original, and the copies take the place of their
+    originals in the result.
+
+    The objects referred to by JSON pointers are looked up through a
+    `PointerIndex` per document, kept in `indexes` by the document identity.
+    Chains of references to references are followed once, and every target
+    on the way is kept in `aliases` as an alias of the final one.
+
+    The references of the files decoded by the resolver are found while
+    decoding them and kept in the `RefIndex` `refs`, so the files without
+    any references are never walked, and the files referenced from a file
+    are known without walking it.
+
+    The documents are traversed with an explicit stack of frames instead of
+    recursion, so the depth of a document is not limited by the Python
+    recursion limit. There are two kinds of frames:
+        (container, keys, root, cwd, current) - a container whose items are
+            being resolved, where `current` is the key of the item waiting
+            for its resolved value, or `_NOTHING`.
+        (_TARGET, key) - a reference target being resolved, whose result
+            is memoized under `key` when it is done.
     """
-    log.debug(f"Resolving file reference '{ref}' with 'cwd = {cwd}'.")
+    def __init__(self, *, external_only: bool = False,
+                 cache: DocumentCache = None, copy: bool = False,
+                 circular: str = 'raise', loader='auto',
+                 workers: int = None, processes: bool = False,
+                 stats: ResolutionStats = None, inplace: bool = True,
+                 remote: RemoteLoader = None, loaders: dict = None):
+        if circular not in CIRCULAR_POLICIES:
+            raise ValueError(
+                f"Unknown circular reference policy '{circular}', "
+                f"expected one of {CIRCULAR_POLICIES}."
+            )
+
+        self.external_only = external_only
+        self.cache = cache
+        self.copy = copy
+        self.circular = circular
+        self.loader = yaml_loader(loader)
+        self.workers = workers
+        self.processes = processes
+        self.stats = stats
+        self.inplace = inplace
+
+        self.loaders = dict(LOADERS)
+        if remote is not None:
+            self.loaders.update(http=remote, https=remote)
+        self.loaders.update((scheme.lower(), loader)
+                            for scheme, loader in (loaders or {}).items())
+
+        self.documents = {}
+        self.memo = {}
+        self.resolved = set()
+        self.active = {}
+        self.pending = {}
+        self.failures = {}
+        self.proxies = {}
+        self.indexes = {}
+        self.files = set()
+        self.copies = {}
+        self.refs = RefIndex()
+        self.urls = {}
+        self.aliases = {}
+
+    def resolve(self, data, root=None, cwd: str = None):
+        """
+        Resolve any references in `data`, **inplace** unless disabled.
+        """
+        if self.stats is None:
+            return self.walk(data, root, cwd)
+
+        start = time.perf_counter()
+
+        try:
+            return self.walk(data, root, cwd)
+        finally:
+            self.stats.resolution(time.perf_counter() - start)
+
+    def walk(self, data, root, cwd: str):
+        """
+        Resolve any references in `data`, see `resolve`.
+        """
+        if self.workers is not None and self.workers > 1:
+            self.prefetch(data, cwd)
+
+        stack = []
+        push, pop = stack.append, stack.pop
+        enter = self.enter
+        resolved = self.resolved
+        stats = self.stats
+        inplace = self.inplace
+        copies = self.copies
+        replace = self.replace
+        active = self.active
+        pending = self.pending
+        scalars = _SCALARS
+        only_scalars = _SCALARS.issuperset
+
+        value = enter(data, root, cwd, stack)
+
+        while stack:
+            if stats is not None:
+                stats.depth(len(stack))
+
+            frame = pop()
+
+            if frame[0] is _TARGET:
+                key = frame[1]
+                self.memo[key] = value
+                del self.pending[key]
+
+                value = self.result(key)
+                continue
+
+            container, keys, root, cwd, current = frame
+
+            if current is not _NOTHING:
+                if inplace:
+                    container[current] = value
+                elif value is not container[current]:
+                    replace(container, current, value)
+
+            for key in keys:
+                item = container[key]
+
+                if type(item) in scalars:
+                    continue
+
+                if isinstance(item, dict):
+                    if '$ref' not in item:
+                        if only_scalars(map(type, item.values())):
+                            continue
+
+                        if id(item) in resolved:
+                            if id(item) in copies:
+                                replace(container, key, copies[id(item)])
+
+                            continue
+
+                        push((container, keys, root, cwd,
+                              _NOTHING if inplace else key))
+                        push((item, iter(item),
+                              item if root is None else root, cwd, _NOTHING))
+                        active[id(item)] = len(pending)
+                        break
+                elif isinstance(item, list):
+                    if only_scalars(map(type, item)):
+                        continue
+
+                    if id(item) in resolved:
+                        if id(item) in copies:
+                            replace(container, key, copies[id(item)])
+
+                        continue
+
+                    push((container, keys, root, cwd,
+                          _NOTHING if inplace else key))
+                    push((item, iter(range(len(item))), root, cwd, _NOTHING))
+                    active[id(item)] = len(pending)
+                    break
+                else:
+                    continue
 
+                push((container, keys, root, cwd, key))
+                size = len(stack)
+
+                result = enter(item, root, cwd, stack)
+
+                if len(stack) != size:
+                    value = result
+                    break
+
+                pop()
+
+                if result is not item:
+                    if inplace:
+                        container[key] = result
+                    else:
+                        replace(container, key, result)
+            else:
+                resolved.add(id(container))
+                del active[id(container)]
+                value = copies.get(id(container), container)
+
+        return value
+
+    def writable(self, container):
+        """
+        Return the container the resolved items of `container` are set in,
+        which is a shallow copy of it unless resolving `inplace`.
+        """
+        if self.inplace:
+            return container
+
+        try:
+            return self.copies[id(container)]
+        except KeyError:
+            copy = self.copies[id(container)] = container.copy()
+
+            return copy
+
+    def replace(self, container, key, value):
+        """
+        Set the item at `key` of `container` to its resolved `value`.
+        """
+        self.writable(container)[key] = value
+
+    def enter(self, data, root, cwd: str, stack: list):
+        """
+        Start resolving `data`, pushing frames to `stack` if needed.
+
+        Returns the resolved value if it is known right away, which is
+        passed to the frame on top of the stack if any were pushed.
+        Otherwise returns `_PUSHED`.
+        """
+        if isinstance(data, dict) and '$ref' in data:
+            if root is None:
+                root = data
+
+            located = self.locate(data, root, cwd)
+
+            if located is None:
+                return data
+
+            ref, pointer, root, cwd = located
+            key = (id(root), pointer)
+
+            if key in self.aliases:
+                key, root, cwd = self.aliases[key]
+
+            if key in self.pending:
+                return self.cycle(ref, key[1], root, data)
+
+            if key in self.memo:
+                if self.stats is not None:
+                    self.stats.memo(ref)
+
+                return self.result(key)
+
+            target = self.follow(key[1], root)
+
+            if isinstance(target, dict) and '$ref' in target:
+                key, target, root, cwd = self.collapse(ref, key, target,
+                                                       root, cwd, data)
+
+                if key is None:
+                    return target
+
+                if key in self.pending:
+                    return self.cycle(ref, key[1], root, data)
+
+                if key in self.memo:
+                    if self.stats is not None:
+                        self.stats.memo(ref)
+
+                    return self.result(key)
+
+            if id(target) in self.active:
+                return self.cycle(ref, key[1], root, data)
+
+            if not self.refs.has_refs(root):
+                self.memo[key] = target
+
+                return self.result(key)
+
+            self.pending[key] = ref
+            stack.append((_TARGET, key))
+
+            data = target
+
+        if isinstance(data, dict):
+            keys = iter(data)
+
+            if root is None:
+                root = data
+        elif isinstance(data, list):
+            keys = iter(range(len(data)))
+        else:
+            return data
+
+        if id(data) in self.resolved:
+            return self.copies.get(id(data), data)
+
+        stack.append((data, keys, root, cwd, _NOTHING))
+        self.active[id(data)] = len(self.pending)
+
+        return _PUSHED
+
+    def resolve_internal(self, ref: str, root: dict, cwd: str = None):
+        """
+        Resolve an internal reference specified by `ref`.
+        """
+        return self.resolve({'$ref': ref}, root, cwd)
+
+    def resolve_file(self, ref: str, cwd: str):
+        """
+        Resolve an external file reference specified by `ref`.
+        """
+        return self.resolve({'$ref': ref}, None, cwd)
+
+    def locate(self, node: dict, root, cwd: str):
+        """
+        Locate the target of the reference `node`.
+
+        Returns the reference, the JSON pointer of the target, and the
+        document and the directory the pointer is relative to, or `None` if
+        the reference should be kept as is.
+        """
+        ref = node['$ref']
+
+        if ref.startswith('#'):
+            if self.external_only:
+                return None
+
+            log.debug("Resolving internal reference '%s'.", ref)
+
+            if self.stats is not None:
+                self.stats.ref('internal', ref)
+
+            return ref, ref, root, cwd
+
+        if self.stats is not None:
+            self.stats.ref('external', ref)
+
+        if is_uri(ref) or is_uri(cwd):
+            pointer, root, cwd = self.locate_uri(ref, cwd)
+        else:
+            pointer, root, cwd = self.locate_file(ref, cwd)
+
+        return ref, pointer, root, cwd
+
+    def lazy(self, data, root, cwd: str):
+        """
+        Return `data` with its reference followed, if it is one, and wrapped
+        in a lazy proxy if it is a container.
+        """
+        if isinstance(data, dict) and '$ref' in data:
+            if root is None:
+                root = data
+
+            located = self.locate(data, root, cwd)
+
+            if located is not None:
+                ref, pointer, root, cwd = located
+                key = self.aliases.get((id(root), pointer))
+
+                if key is not None:
+                    key, root, cwd = key
+                    pointer = key[1]
+
+                target = self.follow(pointer, root)
+
+                if isinstance(target, dict) and '$ref' in target:
+                    _, target, root, cwd = self.collapse(
+                        ref, (id(root), pointer), target, root, cwd, data
+                    )
+
+                data = target
+
+        if isinstance(data, dict):
+            proxy = LazyMapping
+        elif isinstance(data, list):
+            proxy = LazySequence
+        else:
+            return data
+
+        try:
+            return self.proxies[id(data)]
+        except KeyError:
+            pass
+
+        value = proxy(data, data if root is None else root, cwd, self)
+        self.proxies[id(data)] = value
+
+        return value
+
+    def follow(self, pointer: str, root):
+        """
+        Return the object at `pointer` in `root`, looking it up in the
+        `PointerIndex` of `root`.
+        """
+        try:
+            index = self.indexes[id(root)]
+        except KeyError:
+            index = self.indexes[id(root)] = PointerIndex()
+
+        try:
+            return _follow_path(pointer, root, index)
+        except InternalResolutionError as exc:
+            if exc.path is None:
+                exc.path = next((path for path, document
+                                 in self.documents.items()
+                                 if document is root), None)
+
+            raise
+
+    def locate_file(self, ref: str, cwd: str):
+        """
+        Read the file referenced by `ref`.
+
+        Returns the JSON pointer part of `ref`, the file document and the
+        directory of the file.
+        """
+        log.debug("Resolving file reference '%s' with 'cwd = %s'.", ref, cwd)
+
+        path, in_ref = _file_path(ref, cwd)
+
+        return (in_ref,) + self.read_located(ref, path)
+
+    def read_located(self, ref: str, path: str):
+        """
+        Read the file at `path` referenced by `ref`.
+
+        Returns the file document and the directory of the file.
+        """
+        try:
+            file_data = self.read(path)
+        except FileNotFoundError:
+            raise FileResolutionError(
+                f"Could not resolve '{ref}', "
+                f"'{path}' file not found."
+            )
+
+        return file_data, os.path.dirname(path)
+
+    def locate_uri(self, ref: str, base: str):
+        """
+        Load the document referenced by `ref`, relative to the `base` URI if
+        it is one.
+
+        Returns the JSON pointer part of `ref`, the document and its URI,
+        which the references in it are relative to.
+        """
+        log.debug("Resolving reference '%s' with 'base = %s'.", ref, base)
+
+        location, pointer = _split_uri(ref, base)
+
+        if not is_uri(location):
+            return (pointer,) + self.read_located(ref, location)
+
+        document = self.read(location)
+
+        return pointer, document, self.urls.get(location, location)
+
+    def fetch(self, uri: str):
+        """
+        Load and decode the document at `uri` with the loader of its scheme.
+        """
+        scheme = urlsplit(uri).scheme.lower()
+        error = RemoteResolutionError if scheme in ('http', 'https') \
+            else FileResolutionError
+
+        try:
+            loader = self.loaders[scheme]
+        except KeyError:
+            raise error(
+                f"Could not resolve '{uri}', no loader is registered for "
+                f"the '{scheme}' scheme."
+            ) from None
+
+        start = time.perf_counter()
+
+        try:
+            response = loader.fetch(uri)
+        except LoaderError as exc:
+            raise error(f"Could not resolve '{uri}', {exc}") from exc
+
+        self.urls[uri] = response.url
+
+        if response.document is not None:
+            if self.inplace:
+                return deepcopy(response.document)
+
+            return response.document
+
+        found = find_decoder(path=urlsplit(response.url).path,
+                             raw=response.body,
+                             mimetype=response.content_type)
+
+        return _decode(response.body, response.url, loader=self.loader,
+                       decoder=found.name, stats=self.stats, refs=self.refs,
+                       read_time=time.perf_counter() - start)
+
+    def collapse(self, ref: str, key, target: dict, root, cwd: str,
+                 node: dict):
+        """
+        Follow the chain of references starting at `ref`, whose target
+        `target` at `key` is itself a reference, down to its first target
+        that is not a reference.
+
+        All the targets on the way are recorded in `aliases` as aliases of
+        the final one, so that the chain is only followed once, however
+        many times it is referred to.
+
+        Returns the key, the target, and the document and the directory of
+        the final target. The key is `None` if the chain ends in a
+        reference which is kept as is, which is then the target, or in a
+        loop of references kept by the 'keep' policy, in which case `node`
+        is returned as the target. Otherwise, the loop raises
+        `CircularReferenceError`.
+        """
+        chain = {key: ref}
+
+        while isinstance(target, dict) and '$ref' in target:
+            located = self.locate(target, root, cwd)
+
+            if located is None:
+                return None, target, root, cwd
+
+            ref, pointer, root, cwd = located
+            key = (id(root), pointer)
+
+            if key in self.aliases:
+                key, root, cwd = self.aliases[key]
+                target = self.follow(key[1], root)
+                break
+
+            if key in chain:
+                refs = list(chain.values())
+                start = list(chain).index(key)
+
+                if self.circular == 'keep':
+                    log.debug("Keeping reference loop '%s'.", ref)
+
+                    return None, node, root, cwd
+
+                loop = ' -> '.join(f"'{item}'"
+                                   for item in refs[start:] + [ref])
+
+                raise CircularReferenceError(
+                    f"Circular reference detected: {loop}."
+                )
+
+            chain[key] = ref
+            target = self.follow(pointer, root)
+
+        final = (key, root, cwd)
+
+        for alias in chain:
+            if alias != key:
+                self.aliases[alias] = final
+
+        return key, target, root, cwd
+
+    def cycle(self, ref: str, pointer: str, root, node: dict = None):
+        """
+        Handle `ref` referring to a target that is still being resolved.
+        """
+        if self.circular == 'keep':
+            log.debug("Keeping circular reference '%s'.", ref)
+
+            return node if node is not None else {'$ref': ref}
+
+        target = self.follow(pointer, root)
+
+        if self.circular == 'link' and not (isinstance(target, dict) and
+                                            '$ref' in target):
+            log.debug("Linking circular reference '%s'.", ref)
+
+            if isinstance(target, (dict, list)):
+                return self.writable(target)
+
+            return target
+
+        refs = list(self.pending.values())
+
+        try:
+            start = list(self.pending).index((id(root), pointer))
+        except ValueError:
+            # The target is walked as an ordinary container, not as the
+            # target of a reference.
+            refs = [pointer] + refs[self.active[id(target)]:]
+            start = 0
+
+        chain = ' -> '.join(f"'{item}'" for item in refs[start:] + [ref])
+
+        raise CircularReferenceError(
+            f"Circular reference detected: {chain}."
+        )
+
+    def result(self, key):
+        """
+        Return the memoized resolution result for `key`.
+        """
+        if self.copy:
+            return deepcopy(self.memo[key])
+
+        return self.memo[key]
+
+    def read(self, path: str):
+        """
+        Return the document at `path`, decoding it only on first use.
+
+        Documents taken from a shared `cache` are copied when resolving
+        `inplace`, since the resolution modifies them then.
+
+        The `path` may also be the URL of a remote document.
+        """
+        if is_uri(path):
+            key = path
+        else:
+            key = normalize_path(path)
+            self.files.add(key)
+
+        try:
+            document = self.documents[key]
+        except KeyError:
+            pass
+        else:
+            if self.stats is not None:
+                self.stats.document()
+
+            return document
+
+        if key in self.failures:
+            raise self.failures[key]
+
+        data = self.load(path)
+
+        self.documents[key] = data
+
+        return data
+
+    def load(self, path: str, pool: ProcessPoolExecutor = None):
+        """
+        Load the document at `path` from the `cache`, or from the file.
+
+        If a process `pool` is given, the file is decoded there. The
+        documents of URIs are fetched by their loaders instead.
+        """
+        if is_uri(path):
+            return self.fetch(path)
+
+        missed = []
+
+        def load_file(path):
+            missed.append(path)
+
+            if pool is None:
+                return read_file(path, loader=self.loader, stats=self.stats,
+                                 refs=self.refs)
+
+            return pool.submit(read_file, path, loader=self.loader).result()
+
+        if self.cache is None:
+            return load_file(path)
+
+        if self.inplace:
+            document = self.cache.load_copy(path, load_file)
+        else:
+            document = self.cache.load(path, load_file)
+
+        if self.stats is not None:
+            self.stats.cache(path, hit=not missed)
+
+        return document
+
+    def prefetch(self, data, cwd: str):
+        """
+        Load all the files referenced from `data`, directly or through
+        other files, in parallel.
+
+        Errors are ignored here, they are raised by the resolution itself
+        when it gets to the failing reference.
+        """
+        futures = {}
+        seen = set(self.documents)
+
+        def submit(data, cwd):
+            for path in self.referenced(data, cwd, seen):
+                futures[executor.submit(self.load, path, pool)] = path
+
+        pool = ProcessPoolExecutor(self.workers) if self.processes else None
+
+        try:
+            with ThreadPoolExecutor(self.workers) as executor:
+                submit(data, cwd)
+
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        path = futures.pop(future)
+                        key = _location_key(path)
+
+                        try:
+                            document = future.result()
+                        except Exception as exc:  # pylint: disable=broad-except
+                            self.failures[key] = exc
+                            continue
+
+                        self.documents[key] = document
+
+                        submit(document, _location_base(path))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    async def async_prefetch(self, data, cwd: str, fetch=None,
+                             executor=None):
+        """
+        Load all the files referenced from `data`, directly or through
+        other files, concurrently.
+
+        The files are read with the `fetch` coroutine function if given,
+        and decoded in the `executor`. Otherwise, the files are read and
+        decoded in the `executor`.
+        """
+        loop = asyncio.get_running_loop()
+        seen = set(self.documents)
+
+        async def load(path):
+            if fetch is None or is_uri(path):
+                return await loop.run_in_executor(executor, self.load, path)
+
+            start = time.perf_counter()
+            raw = await fetch(path)
+            elapsed = time.perf_counter() - start
+
+            return await loop.run_in_executor(
+                executor,
+                functools.partial(_decode, raw, path, loader=self.loader,
+                                  stats=self.stats, refs=self.refs,
+                                  read_time=elapsed)
+            )
+
+        async def visit(path):
+            key = _location_key(path)
+
+            try:
+                document = await load(path)
+            except Exception as exc:  # pylint: disable=broad-except
+                self.failures[key] = exc
+                return
+
+            self.documents[key] = document
+
+            await asyncio.gather(*(
+                visit(child)
+                for child in self.referenced(document, _location_base(path),
+                                             seen)
+            ))
+
+        await asyncio.gather(*(
+            visit(path) for path in self.referenced(data, cwd, seen)
+        ))
+
+    def referenced(self, data, cwd: str, seen: set):
+        """
+        Yield the paths of the files and the URIs of the documents
+        referenced from `data` which are not in `seen` yet, adding them to
+        it. The `cwd` is the directory or the URI the references are
+        relative to.
+
+        The references of `data` are taken from the `RefIndex` if known,
+        otherwise `data` is walked for them.
+        """
+        refs = self.refs.refs(data)
+
+        if refs is None:
+            refs = _file_refs(data)
+        else:
+            refs = (ref for ref in refs if not ref.startswith('#'))
+
+        for ref in refs:
+            if is_uri(ref) or is_uri(cwd):
+                path, _ = _split_uri(ref, cwd)
+            else:
+                try:
+                    path, _ = _file_path(ref, cwd)
+                except (TypeError, FileResolutionError):
+                    continue
+
+            key = _location_key(path)
+
+            if key not in seen:
+                seen.add(key)
+                yield path
+
+
+def _file_path(ref: str, cwd: str):
+    """
+    Split an external file reference into the file path and the JSON
+    pointer.
+
+    The path is resolved relative to `cwd` if it is not absolute.
+    """
     ref_split = ref.split('#')
 
     if len(ref_split) == 1:
         path, in_ref = ref_split[0], ''
     elif len(ref_split) == 2:
         path, in_ref = ref_split
+    else:
+        raise FileResolutionError(f"Invalid file reference '{ref}'.")
 
     in_ref = f"#{in_ref}"
 
     if not os.path.isabs(path):
         path = os.path.join(cwd, path)
 
-    try:
-        file_data = read_file(path)
-    except FileNotFoundError:
-        raise FileResolutionError(
-            f"Could not resolve '{ref}', "
-            f"'{path}' file not found."
-        )
+    return path, in_ref
 
-    data = _follow_path(in_ref, file_data)
 
-    new_cwd = os.path.dirname(path)
+def _split_uri(ref: str, base: str):
+    """
+    Split the reference `ref`, relative to the `base` URI, into the URI of
+    the document and the JSON pointer.
 
-    return resolve(data, root=file_data, cwd=new_cwd,
-                   external_only=external_only)
+    The `file:` URIs are turned into file paths.
+    """
+    uri, fragment = urldefrag(join_uri(base or '', ref))
+    pointer = f'#{unquote(fragment)}'
 
+    parts = urlsplit(uri)
+    if parts.scheme.lower() == 'file':
+        return url2pathname(parts.path), pointer
 
-def read_file(path: str) -> dict:
+    return uri, pointer
+
+
+def _location_key(location: str) -> str:
+    """
+    Return the key of the file path or the URL `location` in `documents`.
+    """
+    return location if is_uri(location) else normalize_path(location)
+
+
+def _location_base(location: str) -> str:
+    """
+    Return what the references in the document at the file path or the URL
+    `location` are relative to.
+    """
+    return location if is_uri(location) else os.path.dirname(location)
+
+
+def _file_refs(data):
+    """
+    Yield all the external file and remote references found in `data`.
+    """
+    stack = [data]
+    seen = set()
+
+    while stack:
+        item = stack.pop()
+
+        if isinstance(item, (dict, list)):
+            if id(item) in seen:
+                continue
+
+            seen.add(id(item))
+
+        if isinstance(item, dict):
+            ref = item.get('$ref')
+
+            if isinstance(ref, str):
+                if not ref.startswith('#'):
+                    yield ref
+
+                continue
+
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+
+
+def read_file(path: str, *, loader='auto', decoder: str = None,
+              stats: ResolutionStats = None, refs: RefIndex = None) -> dict:
     """
     Read and decode a file specified by `path`.
 
@@ -189,35 +1195,149 @@ def read_file(path: str) -> dict:
     loaded as yaml. Yaml file contents may begin with ---
     http://yaml.org/spec/1.0/#id2561718 therefore
     this is another possible criterion. Any data not fitting these criteria
-    is parsed as JSON.
+    is parsed as JSON. Other formats may be added with `register_decoder`,
+    and a registered `decoder` may also be selected by name.
+
+    The `loader` selects the YAML backend, one of `YAML_BACKENDS`, or may
+    be a PyYAML loader class. By default, the libyaml based loader is used
+    if available.
+
+    The file is read as bytes and passed as such to the decoders accepting
+    them, which avoids decoding it into a `str` first, and the format is
+    sniffed from its first bytes only.
+
+    The reading and decoding times are added to the `stats` if given, and
+    the references found in the file to the `RefIndex` `refs`.
     """
-    log.debug(f"Reading file '{path}'.")
+    log.debug("Reading file '%s'.", path)
 
-    with open(path, 'r') as file:
+    start = time.perf_counter()
+
+    with open(path, 'rb') as file:
         raw = file.read()
-        if raw.startswith('---') or any(
-                [path.lower().endswith(s) for s in ['.yaml', '.yml']]):
-            log.debug(f"Decoding file '{path}' YAML.")
 
-            try:
-                data = yaml.load(raw, Loader=yaml.FullLoader)
-            except yaml.YAMLError as exc:
-                raise DecodeError(
-                    f"Error decoding '{path}' file."
-                ) from exc
-        else:
-            log.debug(f"Decoding file '{path}' JSON.")
+    return _decode(raw, path, loader=loader, decoder=decoder, stats=stats,
+                   refs=refs, read_time=time.perf_counter() - start)
+
+
+def _decode(raw, path: str, *, loader='auto', decoder: str = None,
+            stats: ResolutionStats = None, refs: RefIndex = None,
+            read_time: float = 0.0):
+    """
+    Decode the `raw` contents of the file at `path`, either a `str` or UTF-8
+    encoded `bytes`.
+
+    If `stats` are given, the file is accounted for there, with the time
+    it took to read taken from `read_time`. If a `RefIndex` is given as
+    `refs`, the references found by `scan` are recorded there.
+    """
+    if decoder is None:
+        found = find_decoder(path=path, raw=raw)
+    else:
+        found = DECODERS[decoder]
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Decoding file '%s' %s.", path, found.name.upper())
+
+    options = {'loader': loader}
+    start = time.perf_counter()
+
+    if not found.binary and not isinstance(raw, str):
+        try:
+            raw = bytes(raw).decode('utf-8')
+        except UnicodeDecodeError as exc:
+            raise DecodeError(
+                f"Error decoding '{path}' file."
+            ) from exc
+
+    try:
+        data = found.decode(raw, **{name: options[name]
+                                    for name in found.options})
+    except found.errors as exc:
+        raise DecodeError(
+            f"Error decoding '{path}' file."
+        ) from exc
+
+    if stats is not None:
+        stats.file(path, found.name, read_time, time.perf_counter() - start)
+
+    if refs is not None:
+        refs.add(data, scan(raw, found.name))
 
-            try:
-                data = json.loads(raw)
-            except json.decoder.JSONDecodeError as exc:
-                raise DecodeError(
-                    f"Error decoding '{path}' file."
-                ) from exc
     return data
 
 
-def pluck(root: dict, *path: str):
+def lazy_resolve(data, root=None, cwd: str = None, *,
+                 dependencies: set = None, inplace: bool = False,
+                 **options):
+    """
+    Return a read-only view of `data` resolving references on first access.
+
+    Instead of walking the whole document up front, `dict` and `list`
+    objects are wrapped in `LazyMapping` and `LazySequence` proxies, which
+    follow a reference only when the key holding it is read, so only the
+    accessed parts of the document and the referenced files are ever
+    resolved or loaded. `data` itself is not modified.
+
+    The keyword `options` are the same as for `resolve`, except that the
+    paths of the files are added to the `dependencies` as they are needed
+    by the accesses to the view, and that `inplace` is `False` by default,
+    so the documents of a `cache` or of a `MemoryLoader` are used as they
+    are instead of being copied, since the view never modifies them.
+    """
+    resolver = _Resolver(inplace=inplace, **options)
+
+    if dependencies is not None:
+        resolver.files = dependencies
+
+    return resolver.lazy(data, root, cwd)
+
+
+async def async_resolve(data, root=None, cwd: str = None,
+                        *, fetch=None, executor=None,
+                        dependencies: set = None, **options):
+    """
+    Resolve any references in `data` **inplace**, without blocking the
+    running event loop.
+
+    All the referenced files are loaded concurrently. If a `fetch`
+    coroutine function is given, it is awaited with a file path and should
+    return the raw file contents, as `str` or `bytes`, which are then
+    decoded in the
+    `executor`. Otherwise, the files are read and decoded in the
+    `executor`. The resolution itself also runs in the `executor`. The
+    default executor of the event loop is used if `executor` is `None`.
+
+    The `dependencies` and the other keyword `options` are the same as for
+    `resolve`, and the result is the same as of `resolve`.
+    """
+    resolver = _Resolver(**options)
+
+    try:
+        await resolver.async_prefetch(data, cwd, fetch, executor)
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(executor, resolver.resolve,
+                                          data, root, cwd)
+    finally:
+        if dependencies is not None:
+            dependencies.update(resolver.files)
+
+
+async def async_pluck(root: dict, *path: str, **options):
+    """
+    Pluck the object at `path` in the `root` object, like `pluck`, but
+    resolving it with `async_resolve`.
+    """
+    data = root
+    for path_item in path:
+        data = data[path_item]
+
+    return await async_resolve(data, root, **options)
+
+
+def pluck(root: dict, *path: str, **options):
     """
     Pluck the object at `path` in the `root` object.
 
@@ -226,9 +1346,11 @@ def pluck(root: dict, *path: str):
 
     While getting the requested object, this function also resolves all
     the references found in the requested object.
+
+    The keyword `options` are the same as for `resolve`.
     """
     data = root
     for path_item in path:
         data = data[path_item]
 
-    return resolve(data, root)
+    return resolve(data, root, **options)
@@ -0,0 +1,59 @@
+"""
+Selection of the PyYAML loading and dumping backends.
+
+PyYAML comes with a pure Python implementation and optional bindings for
+the much faster libyaml C library.
+"""
+import yaml
+
+
+YAML_BACKENDS = ('auto', 'libyaml', 'python')
+
+HAS_LIBYAML = getattr(yaml, '__with_libyaml__', False)
+
+
+def _check_backend(backend: str):
+    if backend not in YAML_BACKENDS:
+        raise ValueError(
+            f"Unknown YAML backend '{backend}', "
+            f"expected one of {YAML_BACKENDS}."
+        )
+
+    if backend == 'libyaml' and not HAS_LIBYAML:
+        raise ValueError(
+            "The 'libyaml' YAML backend is not available, "
+            "PyYAML is installed without libyaml support."
+        )
+
+
+def yaml_loader(backend: str = 'auto'):
+    """
+    Return the PyYAML loader class for `backend`.
+
+    The 'auto' backend uses libyaml when it is available and falls back to
+    pure Python otherwise.
+    """
+    if not isinstance(backend, str):
+        return backend
+
+    _check_backend(backend)
+
+    if backend == 'python' or not HAS_LIBYAML:
+        return yaml.FullLoader
+
+    return yaml.CFullLoader
+
+
+def yaml_dumper(backend: str = 'auto'):
+    """
+    Return the PyYAML dumper class for `backend`.
+
+    The 'auto' backend uses libyaml when it is available and falls back to
+    pure Python otherwise.
+    """
+    _check_backend(backend)
+
+    if backend == 'python' or not HAS_LIBYAML:
+        return yaml.Dumper
+
+    return yaml.CDumper
@@ -0,0 +1,281 @@
+"""
+Resolution of many documents in a single run of `dref`.
+"""
+import os
+import sys
+import glob
+import time
+import functools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from dollar_ref import (
+    resolve, read_file, ResolutionError, DocumentCache, DiskCache,
+    ResolutionStats, RemoteLoader, is_uri,
+    yaml_loader, yaml_dumper, write_json, write_yaml, normalize_path
+)
+from dollar_ref.bundle import bundle as bundle_document
+
+
+OUTPUT_FORMATS = ('json', 'yaml')
+
+Job = namedtuple('Job', ['input_uri', 'output'])
+
+
+class JobError(Exception):
+    """
+    Error while resolving the document of a single job.
+    """
+    pass
+
+
+def output_format(output: str, requested: str = None) -> str:
+    """
+    Return the format to write `output` in.
+
+    Unless a format is `requested`, outputs ending in yml or yaml are YAML
+    and everything else is JSON.
+    """
+    if requested is not None:
+        return requested
+
+    return 'yaml' if output.endswith(('yml', 'yaml')) else 'json'
+
+
+def write_output(data, out, fmt: str, dumper):
+    """
+    Write the resolved `data` to the `out` stream as it is serialized.
+
+    The objects found more than once in `data` are written in full every
+    time, unless they contain themselves.
+    """
+    if fmt == 'yaml':
+        write_yaml(data, out, dumper=dumper, expand=True)
+    else:
+        write_json(data, out)
+
+
+def read_input(path: str, *, loader, cache: DocumentCache = None,
+               dependencies: set = None, stats: ResolutionStats = None):
+    """
+    Read the input file at `path`, through the `cache` if given, adding it
+    to the `dependencies`.
+
+    Raises `JobError` if the file does not exist.
+    """
+    if dependencies is not None:
+        dependencies.add(normalize_path(path))
+
+    try:
+        if cache is None:
+            return read_file(path, loader=loader, stats=stats)
+
+        return cache.load_copy(
+            path, functools.partial(read_file, loader=loader, stats=stats)
+        )
+    except FileNotFoundError:
+        raise JobError(f"Input file '{path}' was not found.")
+
+
+def run_job(job: Job, *, fmt: str = None, backend: str = 'auto',
+            external_only: bool = True, workers: int = None,
+            cache: DocumentCache = None, dependencies: set = None,
+            stats: ResolutionStats = None, remote: RemoteLoader = None,
+            bundle: bool = False, definitions: str = None):
+    """
+    Resolve the input document of `job` and write it to its output, where
+    `-` stands for the standard output.
+
+    The `fmt` is the output format, see `output_format`, `backend` is the
+    YAML backend, and the rest of the arguments are passed to `resolve`.
+    The input document itself is also added to the `dependencies`, and is
+    loaded through the `cache` too. It may also be the URI of a document
+    loaded by one of the registered loaders, or by the `remote` loader.
+
+    If `bundle` is `True`, the document is bundled with `bundle` instead,
+    importing the external targets into the `definitions`, and
+    `external_only` is ignored.
+
+    Raises `JobError` with a message describing the problem.
+    """
+    loader = yaml_loader(backend)
+    dumper = yaml_dumper(backend)
+
+    if is_uri(job.input_uri):
+        data = {'$ref': job.input_uri}
+    else:
+        data = read_input(job.input_uri, loader=loader, cache=cache,
+                          dependencies=dependencies, stats=stats)
+
+    fmt = output_format(job.output, fmt)
+
+    cwd = os.path.dirname(job.input_uri)
+
+    try:
+        if bundle:
+            resolved = bundle_document(data, cwd, definitions=definitions,
+                                       cache=cache, loader=loader,
+                                       workers=workers,
+                                       dependencies=dependencies,
+                                       stats=stats, remote=remote)
+        else:
+            resolved = resolve(data, cwd=cwd, external_only=external_only,
+                               cache=cache, loader=loader, workers=workers,
+                               dependencies=dependencies, stats=stats,
+                               remote=remote)
+
+        if job.output == '-':
+            write_output(resolved, sys.stdout, fmt, dumper)
+        else:
+            with open(job.output, 'w') as out:
+                write_output(resolved, out, fmt, dumper)
+    except FileNotFoundError:
+        raise JobError(f"Could not write to output file '{job.output}'.")
+    except (ResolutionError, ValueError) as exc:
+        raise JobError(str(exc)) from exc
+
+
+def expand_specs(specs: list, *, output_dir: str = None, fmt: str = None,
+                 base: str = '') -> list:
+    """
+    Return the jobs described by `specs`.
+
+    Each spec is either an `input:output` pair, or a glob pattern of input
+    files. The matching files are written to `output_dir`, under their own
+    name with the extension of the output format `fmt`, JSON by default.
+
+    Relative paths are taken relative to the `base` directory.
+
+    Raises `JobError` if a spec does not describe any jobs.
+    """
+    jobs = []
+
+    for spec in specs:
+        input_uri, separator, output = spec.partition(':')
+
+        if separator:
+            if output != '-':
+                output = os.path.join(base, output)
+
+            jobs.append(Job(os.path.join(base, input_uri), output))
+            continue
+
+        if output_dir is None:
+            raise JobError(f"An output directory is required for '{spec}'.")
+
+        paths = sorted(glob.glob(os.path.join(base, spec), recursive=True))
+
+        if not paths:
+            raise JobError(f"No input files match '{spec}'.")
+
+        extension = 'yaml' if fmt == 'yaml' else 'json'
+
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+
+            jobs.append(Job(path, os.path.join(output_dir,
+                                               f'{name}.{extension}')))
+
+    outputs = set()
+
+    for job in jobs:
+        if job.output in outputs and job.output != '-':
+            raise JobError(
+                f"More than one input would be written to '{job.output}'."
+            )
+
+        outputs.add(job.output)
+
+    return jobs
+
+
+def read_manifest(path: str, **options) -> list:
+    """
+    Return the jobs listed in the manifest file at `path`.
+
+    Every non-empty line not starting with `#` is a spec, see
+    `expand_specs`, with the paths relative to the manifest file. The
+    keyword `options` are passed to `expand_specs`.
+    """
+    try:
+        with open(path, 'r') as manifest:
+            specs = [line.strip() for line in manifest]
+    except FileNotFoundError:
+        raise JobError(f"Manifest file '{path}' was not found.")
+
+    return expand_specs([spec for spec in specs
+                         if spec and not spec.startswith('#')],
+                        base=os.path.dirname(path), **options)
+
+
+def timed_job(job: Job, **options):
+    """
+    Run `job`, returning the time it took and the error message, or `None`
+    if it succeeded.
+
+    The keyword `options` are passed to `run_job`.
+    """
+    start = time.perf_counter()
+
+    try:
+        run_job(job, **options)
+    except JobError as exc:
+        return time.perf_counter() - start, str(exc)
+
+    return time.perf_counter() - start, None
+
+
+_WORKER_CACHE = None
+
+
+def _init_worker(disk: DiskCache = None):
+    global _WORKER_CACHE  # pylint: disable=global-statement
+    _WORKER_CACHE = DocumentCache(maxsize=None, disk=disk)
+
+
+def _run_in_worker(job: Job, options: dict, collect: bool):
+    stats = ResolutionStats() if collect else None
+    elapsed, error = timed_job(job, cache=_WORKER_CACHE, stats=stats,
+                               **options)
+
+    return elapsed, error, None if stats is None else stats.as_dict(None)
+
+
+def run_batch(jobs: list, *, processes: int = None, disk: DiskCache = None,
+              **options):
+    """
+    Run all the `jobs`, yielding every job with the time it took and its
+    error message, or `None` if it succeeded, in the order of `jobs`.
+
+    The referenced files are decoded once for all the jobs, using a shared
+    `DocumentCache`. If `processes` is more than 1, the jobs are spread
+    over that many worker processes, each with its own cache. The caches
+    are backed by the `disk` cache if given. The statistics of the jobs run
+    in worker processes are added up into the `stats` passed in `options`,
+    without calling its hook.
+
+    The keyword `options` are passed to `run_job`.
+    """
+    if processes is None or processes <= 1:
+        cache = DocumentCache(maxsize=None, disk=disk)
+
+        for job in jobs:
+            yield (job,) + timed_job(job, cache=cache, **options)
+
+        return
+
+    stats = options.pop('stats', None)
+
+    with ProcessPoolExecutor(processes, initializer=_init_worker,
+                             initargs=(disk,)) as pool:
+        futures = [pool.submit(_run_in_worker, job, options,
+                               stats is not None)
+                   for job in jobs]
+
+        for job, future in zip(jobs, futures):
+            elapsed, error, counts = future.result()
+
+            if counts is not None:
+                stats.merge(counts)
+
+            yield job, elapsed, error
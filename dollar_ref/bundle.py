@@ -0,0 +1,267 @@
+"""
+Bundling of documents split over several files into a single document.
+"""
+import posixpath
+from urllib.parse import urldefrag
+
+from dollar_ref import _Resolver
+from dollar_ref.pointer import compile_pointer
+
+
+def _escape(token: str) -> str:
+    return token.replace('~', '~0').replace('/', '~1')
+
+
+def default_definitions(data) -> str:
+    """
+    Return the JSON pointer of the object the external targets of `data`
+    are imported into by default, which is '#/components/schemas' for
+    OpenAPI 3 documents and '#/definitions' otherwise.
+    """
+    if isinstance(data, dict) and 'openapi' in data:
+        return '#/components/schemas'
+
+    return '#/definitions'
+
+
+def _name(ref: str, tokens: tuple) -> str:
+    """
+    Return the name suggested by `ref` for its target at the pointer
+    `tokens`, which is the last token, or the name of the file.
+    """
+    if tokens:
+        return str(tokens[-1])
+
+    location = urldefrag(ref)[0]
+    name = posixpath.splitext(posixpath.basename(location))[0]
+
+    return name or 'definition'
+
+
+class _Bundler:
+    """
+    Holds the state of a single bundling.
+
+    The targets of the external references are imported into `imported`
+    by their generated names, and the local reference to every imported
+    target is kept in `names` by the identity of its document and its
+    compiled JSON pointer, so that every target is imported once. The
+    targets within imported targets are referred to where they are.
+
+    The imported targets are walked as well, in the context of their own
+    documents, so that the references in them are rewritten too, including
+    the internal references of the files, which do not refer to the
+    bundled document.
+    """
+    def __init__(self, root, definitions: str, resolver: _Resolver):
+        self.root = root
+        self.definitions = definitions
+        self.resolver = resolver
+
+        self.document = root
+        self.base = ()
+        self.names = {}
+        self.imported = {}
+        self.taken = set(self.section(create=False) or ())
+        self.stack = []
+
+    def section(self, create: bool = True) -> dict:
+        """
+        Return the object of the bundled document the targets are imported
+        into, creating it if needed and `create` is `True`.
+        """
+        section = self.root
+
+        for token in compile_pointer(self.definitions):
+            if not isinstance(section, dict):
+                raise ValueError(
+                    f"Cannot import into '{self.definitions}', "
+                    f"'{token}' is not in an object."
+                )
+
+            if token not in section:
+                if not create:
+                    return None
+
+                section[token] = {}
+
+            section = section[token]
+
+        if not isinstance(section, dict):
+            raise ValueError(
+                f"Cannot import into '{self.definitions}', "
+                f"it is not an object."
+            )
+
+        return section
+
+    def unique(self, name: str) -> str:
+        """
+        Return `name`, with a number appended if it is already taken.
+        """
+        candidate, number = name, 1
+
+        while candidate in self.taken:
+            number += 1
+            candidate = f'{name}{number}'
+
+        self.taken.add(candidate)
+
+        return candidate
+
+    def imported_at(self, document, tokens: tuple) -> str:
+        """
+        Return the local reference to the target at the pointer `tokens`
+        of `document` if it is within the bundled document, or if the target
+        is imported, or is within an imported target. Otherwise returns
+        `None`.
+        """
+        base = self.base
+
+        if document is self.document and tokens[:len(base)] == base:
+            return '#' + ''.join(f'/{_escape(str(token))}'
+                                 for token in tokens[len(base):])
+
+        for end in range(len(tokens), -1, -1):
+            local = self.names.get((id(document), tokens[:end]))
+
+            if local is not None:
+                return local + ''.join(f'/{_escape(str(token))}'
+                                       for token in tokens[end:])
+
+        return None
+
+    def rewrite(self, node: dict, document, cwd: str):
+        """
+        Return what replaces the reference `node` in `document`, importing
+        its target if not yet imported.
+
+        References to containers are replaced with references to the
+        imported target, while other values are inlined.
+        """
+        ref, pointer, target_document, target_cwd = self.resolver.locate(
+            node, document, cwd
+        )
+        tokens = compile_pointer(pointer)
+        local = self.imported_at(target_document, tokens)
+
+        if local is None:
+            target = self.resolver.follow(pointer, target_document)
+
+            if not isinstance(target, (dict, list)):
+                return target
+
+            name = self.unique(_name(ref, tokens))
+            local = self.names[(id(target_document), tokens)] = \
+                f'{self.definitions.rstrip("/")}/{_escape(name)}'
+
+            if isinstance(target, dict) and \
+                    isinstance(target.get('$ref'), str):
+                self.imported[name] = self.rewrite(target, target_document,
+                                                   target_cwd)
+            else:
+                self.imported[name] = target
+                self.stack.append((target, target_document, target_cwd))
+
+        rewritten = dict(node)
+        rewritten['$ref'] = local
+
+        if len(rewritten) > 1:
+            self.stack.append((rewritten, document, cwd))
+
+        return rewritten
+
+    def bundle(self, document, cwd: str, base: tuple = ()):
+        """
+        Rewrite the references in the bundled document, which is at the
+        pointer `base` of `document`, the document its own internal
+        references refer to, and import their targets.
+        """
+        self.document = document
+        self.base = base
+
+        stack = self.stack
+        stack.append((self.root, document, cwd))
+        seen = set()
+
+        while stack:
+            container, document, cwd = stack.pop()
+
+            if id(container) in seen:
+                continue
+
+            seen.add(id(container))
+
+            keys = list(container) if isinstance(container, dict) \
+                else range(len(container))
+
+            for key in keys:
+                item = container[key]
+
+                if isinstance(item, dict) and \
+                        isinstance(item.get('$ref'), str):
+                    if document is self.root and \
+                            item['$ref'].startswith('#'):
+                        continue
+
+                    container[key] = self.rewrite(item, document, cwd)
+                elif isinstance(item, (dict, list)):
+                    stack.append((item, document, cwd))
+
+        if self.imported:
+            self.section().update(self.imported)
+
+
+def bundle(data, cwd: str = None, *, definitions: str = None,
+           dependencies: set = None, **options):
+    """
+    Bundle `data` with the targets of all of its external references into
+    a single document, **inplace**.
+
+    Instead of inlining an external target at every reference to it, like
+    `resolve` does, the target is imported once into the object at the
+    `definitions` JSON pointer, under a name taken from the reference, and
+    the references to it are rewritten as internal references, so the
+    bundled document grows with the number of distinct targets only. The
+    references in the imported targets are rewritten the same way, which
+    also keeps the recursive targets recursive. References to values other
+    than objects and lists are inlined.
+
+    The `definitions` are '#/components/schemas' for OpenAPI 3 documents
+    and '#/definitions' otherwise, unless given. The internal references of
+    `data` are kept as they are.
+
+    If `data` is itself an external reference, e.g. to a whole file, its
+    target is bundled instead.
+
+    The `dependencies` and the other keyword `options` are the same as for
+    `resolve`.
+
+    Additionally, returns the bundled document.
+    """
+    resolver = _Resolver(**options)
+
+    try:
+        if resolver.workers is not None and resolver.workers > 1:
+            resolver.prefetch(data, cwd)
+
+        document, base = data, ()
+        while isinstance(data, dict) and \
+                isinstance(data.get('$ref'), str) and \
+                not data['$ref'].startswith('#'):
+            _, pointer, document, cwd = resolver.locate(data, document, cwd)
+            data = resolver.follow(pointer, document)
+            base = compile_pointer(pointer)
+
+        if not isinstance(data, (dict, list)):
+            return data
+
+        if definitions is None:
+            definitions = default_definitions(data)
+
+        _Bundler(data, definitions, resolver).bundle(document, cwd, base)
+
+        return data
+    finally:
+        if dependencies is not None:
+            dependencies.update(resolver.files)
@@ -0,0 +1,314 @@
+"""
+Caching of decoded documents.
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+import threading
+from copy import deepcopy
+from collections import OrderedDict
+
+
+CACHE_FORMAT = b'dollar-ref-1'
+
+
+def normalize_path(path: str) -> str:
+    """
+    Return the normalized absolute form of `path` used as a cache key.
+    """
+    return os.path.normcase(os.path.abspath(path))
+
+
+def file_signature(path: str):
+    """
+    Return the modification time and size of `path`, or `None` if it does
+    not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DocumentCache:
+    """
+    A size-limited LRU cache of decoded documents keyed by file path.
+
+    Each entry is validated against the modification time and the size of
+    the file, so a changed file is transparently decoded again.
+
+    The same cache may be passed to several `resolve` calls, in which case
+    the referenced files are decoded only once for all of them. Cached
+    documents are never modified by the resolution. The resolutions which
+    modify the documents get copies from `load_copy`, made by unpickling
+    a serialized form of the document kept next to it, which is much
+    faster than a `deepcopy`.
+
+    If `maxsize` is `None`, the cache grows without a limit.
+
+    If a `DiskCache` is passed as `disk`, the documents missing in memory
+    are loaded through it.
+
+    The cache may be used from several threads at once.
+    """
+    def __init__(self, maxsize: int = 128, disk: 'DiskCache' = None):
+        self.maxsize = maxsize
+        self.disk = disk
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path: str, loader):
+        """
+        Return the decoded document at `path`.
+
+        On a cache miss, or when the file has changed since it was cached,
+        the document is decoded by calling `loader(path)`.
+
+        Raises `FileNotFoundError` if `path` does not exist.
+        """
+        key = normalize_path(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        if self.disk is None:
+            data = loader(path)
+        else:
+            data = self.disk.load(path, loader)
+
+        with self._lock:
+            self._entries[key] = [signature, data, None]
+            self._entries.move_to_end(key)
+
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return data
+
+    def load_copy(self, path: str, loader):
+        """
+        Return a new copy of the decoded document at `path`, which may be
+        modified without affecting the cache, see `load`.
+
+        The documents nested too deeply to be pickled are decoded again by
+        calling `loader(path)` instead.
+        """
+        data = self.load(path, loader)
+
+        with self._lock:
+            entry = self._entries.get(normalize_path(path))
+            if entry is None or entry[1] is not data:
+                entry = None
+            elif entry[2] is not None:
+                return pickle.loads(entry[2])
+
+        try:
+            blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            return loader(path)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return deepcopy(data)
+
+        if entry is not None:
+            with self._lock:
+                entry[2] = blob
+
+        return pickle.loads(blob)
+
+    def clear(self):
+        """
+        Remove all the entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, path):
+        return normalize_path(path) in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def default_cache_dir() -> str:
+    """
+    Return the default directory of the `DiskCache`, which is
+    `$XDG_CACHE_HOME/dollar-ref`, or `~/.cache/dollar-ref`.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+
+    return os.path.join(base, 'dollar-ref')
+
+
+class DiskCache:
+    """
+    A size-limited cache of decoded documents kept in files of `directory`,
+    so that they are shared by separate processes and runs.
+
+    The entries are keyed by the hash of the file contents and extension,
+    so they survive the file being touched or checked out again, and are
+    stored pickled. Only use a directory no one else can write to.
+
+    When the entries take more than `max_bytes`, the least recently used
+    ones are removed.
+
+    The cache may be used from several threads and processes at once.
+    """
+    def __init__(self, directory: str = None, max_bytes: int = 256 << 20):
+        self.directory = default_cache_dir() if directory is None \
+            else directory
+        self.max_bytes = max_bytes
+
+        self._size = None
+        self._lock = threading.Lock()
+
+    def key(self, path: str, raw: bytes) -> str:
+        """
+        Return the key of the file at `path` with the `raw` contents.
+        """
+        digest = hashlib.sha256(CACHE_FORMAT)
+        digest.update(os.path.splitext(path)[1].lower().encode())
+        digest.update(b'\0')
+        digest.update(raw)
+
+        return digest.hexdigest()
+
+    def load(self, path: str, loader):
+        """
+        Return the decoded document at `path`.
+
+        On a cache miss, the document is decoded by calling `loader(path)`
+        and stored.
+
+        Raises `FileNotFoundError` if `path` does not exist.
+        """
+        with open(path, 'rb') as file:
+            raw = file.read()
+
+        entry = os.path.join(self.directory, f'{self.key(path, raw)}.pickle')
+
+        try:
+            with open(entry, 'rb') as file:
+                data = pickle.load(file)
+        except FileNotFoundError:
+            pass
+        except Exception:  # pylint: disable=broad-except
+            self._remove(entry)
+        else:
+            try:
+                os.utime(entry)
+            except OSError:
+                pass
+
+            return data
+
+        data = loader(path)
+
+        self._store(entry, data)
+
+        return data
+
+    def load_copy(self, path: str, loader):
+        """
+        Return the decoded document at `path`, see `load`, which is a new
+        copy every time already.
+        """
+        return self.load(path, loader)
+
+    def _store(self, entry: str, data):
+        try:
+            raw = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError,
+                RecursionError):
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            handle, temp = tempfile.mkstemp(dir=self.directory,
+                                            suffix='.tmp')
+            with os.fdopen(handle, 'wb') as file:
+                file.write(raw)
+
+            os.replace(temp, entry)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += len(raw)
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """
+        Yield the last use time, the size and the path of every entry.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            if not name.endswith('.pickle'):
+                continue
+
+            path = os.path.join(self.directory, name)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            yield stat.st_mtime_ns, stat.st_size, path
+
+    def _evict(self):
+        entries = sorted(self._scan())
+        self._size = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+
+            self._remove(path)
+            self._size -= size
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'max_bytes': self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Remove all the entries from the cache.
+        """
+        with self._lock:
+            for _, _, path in list(self._scan()):
+                self._remove(path)
+
+            self._size = 0
+
+    def __len__(self):
+        return sum(1 for _ in self._scan())
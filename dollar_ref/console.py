@@ -3,14 +3,23 @@ The implementation of the command line tool `dref`.
 """
 import argparse
 import os
-import json
 import sys
+import json
+import time
 import logging
 
-import yaml
 from termcolor import colored
 
-from dollar_ref import resolve, read_file, ResolutionError
+from dollar_ref import (
+    YAML_BACKENDS, yaml_loader, yaml_dumper,
+    DocumentCache, DiskCache, ResolutionStats, RemoteLoader,
+    default_cache_dir
+)
+from dollar_ref.batch import (
+    OUTPUT_FORMATS, Job, JobError,
+    run_job, run_batch, expand_specs, read_manifest
+)
+from dollar_ref.watch import Watcher
 
 
 VERBOSITY = {
@@ -40,7 +49,7 @@ class DrefLogFormatter(logging.Formatter):
     def format(self, record):
         prefix = self.prefixes.get(record.levelno, '')
 
-        return self.color_message(f'{prefix}{record.msg}',
+        return self.color_message(f'{prefix}{record.getMessage()}',
                                   record.levelno)
 
     def color_message(self, msg, levelno):
@@ -77,21 +86,261 @@ def parse_args(args):
                      'with all the external JSON References resolved.')
     )
     parser.add_argument(
-        'input_uri',
+        'input_uri', nargs='?',
         help=('the input document URI. '
               'This could be an absolute or relative file path.')
     )
     parser.add_argument(
-        'output_file',
-        help='the filename to write the resolved output to.'
+        'output_file', nargs='?',
+        help=('the filename to write the resolved output to, '
+              'or - for the standard output.')
     )
+    parser.add_argument('-o', '--output',
+                        metavar='FILE',
+                        help='the same as output_file.')
+    parser.add_argument('-f', '--format',
+                        choices=OUTPUT_FORMATS, default=None,
+                        help=('the output format. By default, YAML for '
+                              'files ending in yml or yaml, otherwise JSON.'))
     parser.add_argument("-v", "--verbosity",
                         action="count", default=0,
                         help='increase program output verbosity.')
     parser.add_argument('-i', '--internal',
                         help='resolve internal references',
                         default=True, action='store_false')
-    return parser.parse_args(args)
+    parser.add_argument('--bundle',
+                        default=False, action='store_true',
+                        help=('import every external target once into the '
+                              'document and refer to it internally, instead '
+                              'of copying it at every reference.'))
+    parser.add_argument('--definitions',
+                        metavar='POINTER',
+                        help=('the JSON pointer to import into with --bundle, '
+                              'by default #/components/schemas for OpenAPI 3 '
+                              'documents and #/definitions otherwise.'))
+    parser.add_argument('--yaml-backend',
+                        choices=YAML_BACKENDS, default='auto',
+                        help=('the YAML library backend to use for reading '
+                              'and writing. By default, the faster libyaml '
+                              'is used if available.'))
+    parser.add_argument('-j', '--jobs',
+                        type=int, default=None, metavar='N',
+                        help='load referenced files with N parallel workers.')
+    parser.add_argument('-b', '--batch',
+                        nargs='+', default=[], metavar='SPEC',
+                        help=('resolve several documents, each given as an '
+                              'input:output pair, or a glob pattern of '
+                              'inputs to write to --output-dir.'))
+    parser.add_argument('-m', '--manifest',
+                        metavar='FILE',
+                        help=('resolve the documents listed in FILE, one '
+                              'batch SPEC per line.'))
+    parser.add_argument('--output-dir',
+                        metavar='DIR',
+                        help='the directory to write batch glob outputs to.')
+    parser.add_argument('-p', '--processes',
+                        type=int, default=None, metavar='N',
+                        help='resolve batch documents in N worker processes.')
+    parser.add_argument('-w', '--watch',
+                        default=False, action='store_true',
+                        help=('keep running and resolve the documents again '
+                              'whenever the files they depend on change.'))
+    parser.add_argument('--interval',
+                        type=float, default=0.5, metavar='SECONDS',
+                        help='how often to check for changes with --watch.')
+    parser.add_argument('--cache',
+                        default=False, action='store_true',
+                        help=('keep the decoded files on disk for later '
+                              f'runs, in {default_cache_dir()}.'))
+    parser.add_argument('--cache-dir',
+                        metavar='DIR',
+                        help=('keep the decoded files on disk for later '
+                              'runs, in DIR.'))
+    parser.add_argument('--cache-size',
+                        type=int, default=256, metavar='MB',
+                        help='the on-disk cache size limit in MB.')
+    parser.add_argument('-r', '--remote',
+                        default=False, action='store_true',
+                        help=('resolve references to HTTP(S) URLs, keeping '
+                              'the responses in the cache directory.'))
+    parser.add_argument('--offline',
+                        default=False, action='store_true',
+                        help=('resolve references to HTTP(S) URLs from the '
+                              'cached responses only.'))
+    parser.add_argument('--stats',
+                        nargs='?', choices=('table', 'json'), const='table',
+                        help=('print the statistics of the resolution as a '
+                              'table or as JSON.'))
+
+    parsed = parser.parse_args(args)
+
+    if parsed.batch or parsed.manifest:
+        if parsed.input_uri is not None or parsed.output is not None:
+            parser.error('input_uri and output_file are not allowed '
+                         'with --batch or --manifest.')
+
+        return parsed
+
+    if parsed.input_uri is None:
+        parser.error('input_uri is required.')
+
+    if (parsed.output is None) == (parsed.output_file is None):
+        parser.error('exactly one of output_file and -o/--output is required.')
+
+    if parsed.output is None:
+        parsed.output = parsed.output_file
+
+    return parsed
+
+
+def print_stats(stats: ResolutionStats, args, stream):
+    """
+    Print the resolution `stats` to the `stream` in the requested format.
+    """
+    if args.stats == 'json':
+        print(json.dumps(stats.as_dict(), indent=2), file=stream)
+    else:
+        print(stats.format_table(), file=stream)
+
+
+def disk_cache(args) -> DiskCache:
+    """
+    Return the on-disk cache requested by the arguments, or `None`.
+    """
+    if not args.cache and args.cache_dir is None:
+        return None
+
+    return DiskCache(args.cache_dir, max_bytes=args.cache_size << 20)
+
+
+def remote_loader(args) -> RemoteLoader:
+    """
+    Return the remote loader requested by the arguments, or `None`.
+
+    The responses are kept in the `remote` subdirectory of the cache
+    directory.
+    """
+    if not (args.remote or args.offline):
+        return None
+
+    directory = default_cache_dir() if args.cache_dir is None \
+        else args.cache_dir
+
+    return RemoteLoader(os.path.join(directory, 'remote'),
+                        offline=args.offline)
+
+
+def collect_jobs(args) -> list:
+    """
+    Return the jobs given by the command line arguments, creating the
+    `--output-dir` if needed.
+    """
+    if not (args.batch or args.manifest):
+        return [Job(args.input_uri, args.output)]
+
+    jobs = expand_specs(args.batch, output_dir=args.output_dir,
+                        fmt=args.format)
+
+    if args.manifest is not None:
+        jobs += read_manifest(args.manifest, output_dir=args.output_dir,
+                              fmt=args.format)
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    return jobs
+
+
+def batch(args, log, stream) -> bool:
+    """
+    Resolve all the documents of the `--batch` and `--manifest` arguments,
+    logging a timing summary at the end, and printing the statistics to
+    the `stream` if requested.
+
+    Returns whether all of them were resolved successfully.
+    """
+    try:
+        jobs = collect_jobs(args)
+    except JobError as exc:
+        log.error(str(exc))
+        return False
+
+    start = time.perf_counter()
+    results = []
+    stats = ResolutionStats() if args.stats else None
+
+    for job, elapsed, error in run_batch(
+            jobs, processes=args.processes, disk=disk_cache(args),
+            fmt=args.format, backend=args.yaml_backend,
+            external_only=args.internal, workers=args.jobs, stats=stats,
+            remote=remote_loader(args), bundle=args.bundle,
+            definitions=args.definitions):
+        if error is not None:
+            log.error(error)
+
+        results.append((job, elapsed, error))
+
+    total = time.perf_counter() - start
+    succeeded = sum(1 for _, _, error in results if error is None)
+
+    log.info(f"Resolved {succeeded} of {len(results)} documents "
+             f"in {total:.3f}s:")
+
+    for job, elapsed, error in results:
+        status = '' if error is None else ' (failed)'
+
+        log.info(f"  {elapsed:8.3f}s  '{job.input_uri}' -> "
+                 f"'{job.output}'{status}")
+
+    if stats is not None:
+        print_stats(stats, args, stream)
+
+    return succeeded == len(results)
+
+
+def watch(args, log) -> bool:
+    """
+    Resolve the documents given by the arguments, and then again whenever
+    the files they depend on change, until interrupted.
+
+    Returns `False` if the documents could not be collected.
+    """
+    try:
+        jobs = collect_jobs(args)
+    except JobError as exc:
+        log.error(str(exc))
+        return False
+
+    def report(results):
+        for job, elapsed, error in results:
+            if error is not None:
+                log.error(error)
+            else:
+                log.info(f"Resolved '{job.input_uri}' into '{job.output}' "
+                         f"in {elapsed:.3f}s.")
+
+    def changed(paths, results):
+        for path in sorted(paths):
+            log.info(f"Changed '{path}'.")
+
+        report(results)
+
+    watcher = Watcher(jobs, interval=args.interval, disk=disk_cache(args),
+                      fmt=args.format, backend=args.yaml_backend,
+                      external_only=args.internal, workers=args.jobs,
+                      remote=remote_loader(args), bundle=args.bundle,
+                      definitions=args.definitions)
+
+    report(watcher.build())
+
+    log.info(f"Watching {len(watcher.signatures)} files for changes.")
+
+    try:
+        watcher.watch(changed)
+    except KeyboardInterrupt:
+        pass
+
+    return True
 
 
 def main(custom_args: list = None):
@@ -100,10 +349,34 @@ def main(custom_args: list = None):
 
     Accepts two positional arguments:
         input_uri - the input document to be resolved.
-        output_file - the output file for resolved data.
+        output_file - the output file for resolved data, which may also be
+            passed with `-o`. If it is `-`, the output is written to the
+            standard output and the messages to the standard error.
 
     If the `output_file` extension is `yaml` or `yml`, the output
-    format will be YAML, otherwise JSON.
+    format will be YAML, otherwise JSON, unless `--format` is given.
+
+    Instead of the positional arguments, many documents may be given with
+    `--batch` or `--manifest`, which are all resolved by this single call,
+    decoding every referenced file only once.
+
+    With `--watch`, the documents are resolved again whenever the files
+    they depend on change, until the program is interrupted.
+
+    With `--cache` or `--cache-dir`, the decoded files are also kept on
+    disk, so later runs do not decode the unchanged files again.
+
+    With `--remote`, references to HTTP(S) URLs are resolved too, and
+    with `--offline` only from the responses cached by earlier runs.
+
+    With `--bundle`, every external target is imported into the document
+    once, under `--definitions`, and referred to by internal references.
+
+    With `--stats`, the statistics of the resolution are printed at the
+    end, as a table or as JSON.
+
+    The output is written while it is serialized, so it is never held in
+    memory as a whole.
 
     The program may be used from inside other python programs by calling
     this function, and passing the arguments as the `custom_args` function
@@ -113,8 +386,11 @@ def main(custom_args: list = None):
 
     log_level = VERBOSITY.get(args.verbosity, logging.INFO)
 
-    out_handler = logging.StreamHandler(sys.stdout)
-    out_handler.setFormatter(DrefLogFormatter(use_color=sys.stdout.isatty()))
+    to_stdout = args.output == '-'
+    out_stream = sys.stderr if to_stdout else sys.stdout
+
+    out_handler = logging.StreamHandler(out_stream)
+    out_handler.setFormatter(DrefLogFormatter(use_color=out_stream.isatty()))
     out_handler.addFilter(DrefLogFilter(logging.WARN,
                                         logging.INFO,
                                         logging.DEBUG))
@@ -129,30 +405,40 @@ def main(custom_args: list = None):
     log.setLevel(log_level)
 
     try:
-        data = read_file(args.input_uri)
-        cwd = os.path.dirname(args.input_uri)
-    except FileNotFoundError:
-        log.error(f"Input file '{args.input_uri}' was not found.")
+        yaml_loader(args.yaml_backend)
+        yaml_dumper(args.yaml_backend)
+    except ValueError as exc:
+        log.error(str(exc))
         sys.exit(1)
 
-    try:
-        resolved = resolve(data, cwd=cwd, external_only=args.internal)
+    if args.watch:
+        if not watch(args, log):
+            sys.exit(1)
 
-        with open(args.output_file, 'w') as out:
-            if args.output_file.endswith(('yml', 'yaml')):
-                raw_out = yaml.dump(resolved,
-                                    explicit_start=True,
-                                    default_flow_style=False)
-            else:
-                raw_out = json.dumps(resolved)
+        return
 
-            out.write(raw_out)
-    except FileNotFoundError:
-        log.error(f"Could not write to output file '{args.output_file}'.")
-        sys.exit(1)
-    except ResolutionError as exc:
+    if args.batch or args.manifest:
+        if not batch(args, log, out_stream):
+            sys.exit(1)
+
+        return
+
+    disk = disk_cache(args)
+    stats = ResolutionStats() if args.stats else None
+
+    try:
+        run_job(Job(args.input_uri, args.output), fmt=args.format,
+                backend=args.yaml_backend, external_only=args.internal,
+                workers=args.jobs, stats=stats, remote=remote_loader(args),
+                bundle=args.bundle, definitions=args.definitions,
+                cache=None if disk is None else DocumentCache(disk=disk))
+    except JobError as exc:
         log.error(str(exc))
         sys.exit(1)
 
-    log.info(f"Successfully resolved '{args.input_uri}' "
-             f"into '{args.output_file}'.")
+    target = 'the standard output' if to_stdout else f"'{args.output}'"
+
+    log.info(f"Successfully resolved '{args.input_uri}' into {target}.")
+
+    if stats is not None:
+        print_stats(stats, args, out_stream)
@@ -0,0 +1,191 @@
+"""
+Registry of the decoders used to read referenced documents.
+
+A decoder is picked for a document by its MIME type if known, then by
+sniffing its contents, and finally by its filename extension. Documents
+not matching any decoder are decoded as JSON.
+
+The JSON decoder uses the fastest of the optional `orjson`, `simdjson` and
+`ujson` packages that is installed, falling back to the standard `json`
+module for any document the fast parser rejects, so the decoded data is
+always the same as with `json.loads`.
+"""
+import os
+import json
+import importlib
+
+import yaml
+
+from dollar_ref.backends import yaml_loader
+
+
+class Decoder:  # pylint: disable=too-few-public-methods
+    """
+    A registered decoder.
+
+    `decode` is called with the raw document contents and returns the
+    decoded data. It may raise any of `errors` if the contents are invalid.
+
+    `options` lists the names of the `read_file` keyword arguments, such as
+    `loader`, that are passed through to `decode`.
+
+    If `binary` is true, `decode` also accepts the contents as `bytes`, so
+    files are passed to it as read, without decoding them into a `str`
+    first.
+    """
+    def __init__(self, name: str, decode, *, extensions=(), mimetypes=(),
+                 sniff=None, errors=(ValueError,), options=(),
+                 binary=False):
+        self.name = name
+        self.decode = decode
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.mimetypes = tuple(mimetypes)
+        self.sniff = sniff
+        self.errors = tuple(errors)
+        self.options = tuple(options)
+        self.binary = binary
+
+    def __repr__(self):
+        return f"Decoder({self.name!r})"
+
+
+DECODERS = {}
+
+DEFAULT_DECODER = 'json'
+
+SNIFF_SIZE = 512
+
+
+def register_decoder(name: str, decode, **kwargs) -> Decoder:
+    """
+    Register a `decode` function under `name`.
+
+    The keyword arguments are those of `Decoder`:
+        extensions - filename extensions handled by the decoder,
+            e.g. ('.toml',).
+        mimetypes - MIME types handled by the decoder.
+        sniff - a function receiving the first `SNIFF_SIZE` characters
+            of the contents and returning `True` if the decoder should be
+            used for them.
+        errors - the exception types `decode` raises on invalid contents.
+        binary - whether `decode` accepts the contents as `bytes`.
+
+    A decoder registered under an existing name replaces it.
+    """
+    decoder = Decoder(name, decode, **kwargs)
+
+    DECODERS[name] = decoder
+
+    return decoder
+
+
+def unregister_decoder(name: str):
+    """
+    Remove the decoder registered under `name`.
+    """
+    del DECODERS[name]
+
+
+def find_decoder(path: str = None, raw: str = None,
+                 mimetype: str = None) -> Decoder:
+    """
+    Return the decoder to use for a document.
+
+    Only the beginning of the `raw` contents, which may be a `str` or
+    `bytes`, is looked at.
+    """
+    decoders = list(DECODERS.values())
+
+    if mimetype is not None:
+        mimetype = mimetype.split(';')[0].strip().lower()
+
+        for decoder in decoders:
+            if mimetype in decoder.mimetypes:
+                return decoder
+
+    if raw is not None:
+        head = raw[:SNIFF_SIZE]
+
+        if not isinstance(head, str):
+            head = bytes(head).decode('utf-8-sig', 'ignore')
+
+        for decoder in decoders:
+            if decoder.sniff is not None and decoder.sniff(head):
+                return decoder
+
+    if path is not None:
+        extension = os.path.splitext(path)[1].lower()
+
+        for decoder in decoders:
+            if extension in decoder.extensions:
+                return decoder
+
+    return DECODERS[DEFAULT_DECODER]
+
+
+def _fast_json():
+    """
+    Return the name and the `loads` function of the fastest installed JSON
+    parser.
+    """
+    for name in ('orjson', 'simdjson', 'ujson'):
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+
+        loads = getattr(module, 'loads', None)
+        if loads is not None:
+            return name, loads
+
+    return 'json', None
+
+
+JSON_BACKEND, _fast_loads = _fast_json()
+
+
+def decode_json(raw):
+    """
+    Decode a JSON document, given as a `str` or as UTF-8, UTF-16 or UTF-32
+    encoded `bytes`.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(raw)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    return json.loads(raw)
+
+
+def decode_yaml(raw, loader='auto'):
+    """
+    Decode a YAML document, given as a `str` or as encoded `bytes`, with the
+    YAML backend selected by `loader`.
+    """
+    return yaml.load(raw, Loader=yaml_loader(loader))
+
+
+def _sniff_yaml(raw: str) -> bool:
+    # YAML file contents may begin with ---
+    # http://yaml.org/spec/1.0/#id2561718
+    return raw.startswith('---')
+
+
+register_decoder(
+    'json', decode_json,
+    extensions=('.json',),
+    mimetypes=('application/json',),
+    errors=(ValueError,),
+    binary=True
+)
+register_decoder(
+    'yaml', decode_yaml,
+    extensions=('.yaml', '.yml'),
+    mimetypes=('application/yaml', 'application/x-yaml', 'text/yaml',
+               'text/x-yaml'),
+    sniff=_sniff_yaml,
+    errors=(yaml.YAMLError,),
+    options=('loader',),
+    binary=True
+)
@@ -0,0 +1,87 @@
+"""
+Read-only proxies resolving references on first access.
+"""
+from collections.abc import Mapping, Sequence
+
+
+class LazyMapping(Mapping):
+    """
+    A read-only view of a `dict` whose references are resolved when the
+    referencing key is first read.
+
+    The resolved values are kept, so every key is resolved at most once.
+    """
+    def __init__(self, data: dict, root, cwd: str, resolver):
+        self._data = data
+        self._root = root
+        self._cwd = cwd
+        self._resolver = resolver
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        value = self._resolver.lazy(self._data[key], self._root, self._cwd)
+        self._values[key] = value
+
+        return value
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<LazyMapping of {len(self._data)} keys>"
+
+
+class LazySequence(Sequence):
+    """
+    A read-only view of a `list` whose references are resolved when the
+    referencing item is first read.
+
+    The resolved values are kept, so every item is resolved at most once.
+    """
+    def __init__(self, data: list, root, cwd: str, resolver):
+        self._data = data
+        self._root = root
+        self._cwd = cwd
+        self._resolver = resolver
+        self._values = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._data)))]
+
+        if index < 0:
+            index += len(self._data)
+
+        try:
+            return self._values[index]
+        except KeyError:
+            pass
+
+        value = self._resolver.lazy(self._data[index], self._root, self._cwd)
+        self._values[index] = value
+
+        return value
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<LazySequence of {len(self._data)} items>"
@@ -0,0 +1,241 @@
+"""
+Registry of the loaders of documents referenced by URIs, by scheme.
+
+References are resolved relative to the URI of the document they are in,
+the base URI, as defined by RFC 3986. References without a scheme in
+documents without one are file paths, which are loaded by `resolve`
+itself, as are `file:` URIs.
+"""
+import os
+import re
+import tarfile
+import zipfile
+import posixpath
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit, urlunsplit, urljoin, uses_relative
+
+
+Response = namedtuple('Response', ('url', 'body', 'content_type',
+                                   'document'))
+Response.__new__.__defaults__ = (None, None)
+
+_SCHEME = re.compile(r'[A-Za-z][A-Za-z0-9+.-]+:')
+
+
+def is_uri(location: str) -> bool:
+    """
+    Return whether `location` is a URI with a scheme rather than a file
+    path. Single letter schemes are taken for Windows drives.
+    """
+    return isinstance(location, str) and _SCHEME.match(location) is not None
+
+
+def join_uri(base: str, ref: str) -> str:
+    """
+    Return the reference `ref` resolved relative to the `base` URI.
+
+    This is `urljoin`, which only joins the URIs of the schemes it knows
+    of, extended to any scheme with hierarchical paths.
+    """
+    if not base or is_uri(ref):
+        return ref
+
+    base_parts = urlsplit(base)
+
+    if base_parts.scheme in uses_relative:
+        return urljoin(base, ref)
+
+    ref_parts = urlsplit(ref)
+    path, query = ref_parts.path, ref_parts.query
+
+    if not path:
+        path = base_parts.path
+        query = query or base_parts.query
+    elif not path.startswith('/'):
+        path = posixpath.normpath(posixpath.join(
+            posixpath.dirname(base_parts.path), path
+        ))
+
+    return urlunsplit((base_parts.scheme, base_parts.netloc, path, query,
+                       ref_parts.fragment))
+
+
+class LoaderError(OSError):
+    """
+    Error loading a document by its URI.
+    """
+    def __init__(self, message: str, url: str):
+        super().__init__(message)
+
+        self.url = url
+
+
+class Loader:  # pylint: disable=too-few-public-methods
+    """
+    A loader of the documents of a URI scheme.
+
+    `fetch` is called with the absolute URI of a document, without the
+    fragment, and returns a `Response` with either the raw `body` of the
+    document, which is then decoded like a file, or the already decoded
+    `document`. The `url` of the response is the base URI of the
+    references in the document, and the `content_type` is used to pick
+    the decoder if given.
+
+    Loaders are used from several threads at once when the documents are
+    loaded ahead, and may cache whatever suits their scheme.
+    """
+    def fetch(self, uri: str) -> Response:
+        """
+        Return the `Response` with the document at `uri`.
+
+        Raises `LoaderError` if there is no such document.
+        """
+        raise NotImplementedError
+
+
+LOADERS = {}
+
+
+def register_loader(scheme: str, loader: Loader) -> Loader:
+    """
+    Register the `loader` of the documents of the URI `scheme`.
+
+    A loader registered for an existing scheme replaces it.
+    """
+    LOADERS[scheme.lower()] = loader
+
+    return loader
+
+
+def unregister_loader(scheme: str):
+    """
+    Remove the loader registered for the URI `scheme`.
+    """
+    del LOADERS[scheme.lower()]
+
+
+class MemoryLoader(Loader):
+    """
+    Serves documents held in memory, so that they are resolved without
+    touching the disk.
+
+    The `documents` are given by their paths, e.g. 'specs/openapi.yaml',
+    and are either already decoded objects, or the raw contents as `str`
+    or `bytes`, which are decoded by the extension of their path or by
+    their contents. Registered under the 'memory' scheme, the document
+    above is referred to as 'memory:/specs/openapi.yaml'.
+
+    The decoded documents are copied by the resolution before it modifies
+    them, so they are never changed.
+    """
+    def __init__(self, documents: dict = None):
+        self.documents = {}
+
+        for path, document in (documents or {}).items():
+            self.add(path, document)
+
+    @staticmethod
+    def _path(path: str) -> str:
+        return '/' + posixpath.normpath(path).lstrip('/')
+
+    def add(self, path: str, document):
+        """
+        Add the `document` at `path`, replacing any existing one.
+        """
+        self.documents[self._path(path)] = document
+
+    def remove(self, path: str):
+        """
+        Remove the document at `path`.
+        """
+        del self.documents[self._path(path)]
+
+    def fetch(self, uri: str) -> Response:
+        try:
+            document = self.documents[self._path(urlsplit(uri).path)]
+        except KeyError:
+            raise LoaderError(f"'{uri}' not found in memory.", uri) from None
+
+        if isinstance(document, (str, bytes)):
+            return Response(uri, document, None)
+
+        return Response(uri, None, None, document)
+
+
+class ArchiveLoader(Loader):
+    """
+    Serves the files of a `.zip` or a `.tar` archive, optionally
+    compressed, e.g. `.tar.gz`, without extracting it.
+
+    The paths of the URIs are the paths of the files in the archive, so
+    that, registered under the 'bundle' scheme, 'bundle:/openapi.yaml'
+    refers to the 'openapi.yaml' file at the top of the archive, and the
+    relative references in it to the other files of the archive.
+
+    The archive is opened on first use and kept open, and is opened again
+    if it changes.
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+        self._archive = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        if signature != self._signature:
+            self.close()
+
+            if zipfile.is_zipfile(self.path):
+                self._archive = zipfile.ZipFile(self.path)
+            else:
+                self._archive = tarfile.open(self.path)
+
+            self._signature = signature
+
+        return self._archive
+
+    def fetch(self, uri: str) -> Response:
+        member = posixpath.normpath(urlsplit(uri).path).lstrip('/')
+
+        with self._lock:
+            try:
+                archive = self._open()
+
+                if isinstance(archive, zipfile.ZipFile):
+                    body = archive.read(member)
+                else:
+                    file = archive.extractfile(member)
+                    if file is None:
+                        raise KeyError(member)
+
+                    body = file.read()
+            except KeyError:
+                raise LoaderError(
+                    f"'{member}' not found in '{self.path}'.", uri
+                ) from None
+            except (OSError, zipfile.BadZipFile, tarfile.TarError) as exc:
+                raise LoaderError(
+                    f"Error reading '{self.path}': {exc}.", uri
+                ) from exc
+
+        return Response(uri, body, None)
+
+    def close(self):
+        """
+        Close the archive if it is open.
+        """
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+            self._signature = None
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
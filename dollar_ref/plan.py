@@ -0,0 +1,236 @@
+"""
+Compiled resolution plans of documents resolved many times.
+"""
+import pickle
+import threading
+from copy import copy, deepcopy
+
+from dollar_ref import resolve
+from dollar_ref.cache import file_signature
+
+
+_LEAVE = object()
+
+
+def ref_sites(data) -> list:
+    """
+    Return the path, as a tuple of keys and indices, and the reference of
+    every reference object in `data`, without following them.
+
+    The objects found more than once are listed at every path, except
+    within themselves.
+    """
+    sites = []
+    stack = [((), data)]
+    walking = set()
+
+    while stack:
+        path, item = stack.pop()
+
+        if path is _LEAVE:
+            walking.discard(item)
+            continue
+
+        if isinstance(item, (dict, list)):
+            if id(item) in walking:
+                continue
+
+            walking.add(id(item))
+            stack.append((_LEAVE, id(item)))
+
+        if isinstance(item, dict):
+            if isinstance(item.get('$ref'), str):
+                sites.append((path, item['$ref']))
+                continue
+
+            stack.extend((path + (key,), value)
+                         for key, value in item.items())
+        elif isinstance(item, list):
+            stack.extend((path + (index,), value)
+                         for index, value in enumerate(item))
+
+    sites.sort(key=lambda site: tuple(map(str, site[0])))
+
+    return sites
+
+
+def _serialize(data):
+    """
+    Return `data` pickled, or `None` if it cannot be pickled.
+    """
+    try:
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+
+
+def _copy(blob, data):
+    """
+    Return a new copy of `data`, unpickled from its `blob` if there is one.
+    """
+    if blob is not None:
+        return pickle.loads(blob)
+
+    return deepcopy(data)
+
+
+def _replay(data, sites: list, targets: dict):
+    """
+    Return `data` with the reference at the path of every site in `sites`
+    replaced by the target of the path in `targets`, copying the containers
+    on the way to them, so that `data` is not modified.
+
+    Raises `ValueError` if `data` does not have the reference of a site.
+    """
+    holder = [data]
+    copied = set()
+
+    for path, ref in sites:
+        node, key = holder, 0
+
+        try:
+            for token in path:
+                child = node[key]
+
+                if id(child) not in copied:
+                    child = node[key] = copy(child)
+                    copied.add(id(child))
+
+                node, key = child, token
+
+            site = node[key]
+        except (KeyError, IndexError, TypeError):
+            site = None
+
+        if not isinstance(site, dict) or site.get('$ref') != ref:
+            pointer = '#' + ''.join(f'/{token}' for token in path)
+            raise ValueError(
+                f"Cannot apply the plan, there is no '{ref}' reference at "
+                f"'{pointer}'."
+            )
+
+        node[key] = targets[path]
+
+    return holder[0]
+
+
+class ResolutionPlan:
+    """
+    The resolution of a template document, compiled once and replayed many
+    times.
+
+    The plan records the reference `sites` of the template, as the paths to
+    the references and the references themselves, and the resolved target
+    of every site, in a compact serialized form. `apply` replays the
+    resolution on the template, or on another document with the same
+    references at the same places, by copying the containers on the way to
+    the sites and putting a new copy of the recorded target into each of
+    them. That is much faster than resolving the document again, as no
+    references are looked for or followed and no files are read.
+
+    The targets are the ones found when compiling, those of the internal
+    references too, so the documents the plan is applied to should differ
+    from the template only outside the referenced parts of it.
+
+    The `dependencies` of the plan are the paths of the files the
+    resolution needed. When any of the files changes, the plan is compiled
+    again on the next `apply`. The documents loaded by URI loaders are not
+    checked.
+
+    The plan may be applied from several threads at once.
+    """
+    def __init__(self, data, root=None, cwd: str = None, **options):
+        self.data = data
+        self.root = root
+        self.cwd = cwd
+        self.options = options
+
+        self.sites = ref_sites(data)
+        self.dependencies = set()
+        self.compilations = 0
+
+        self._signatures = {}
+        self._resolved = None
+        self._blob = None
+        self._targets = None
+        self._targets_blob = None
+        self._lock = threading.Lock()
+
+        self.compile()
+
+    def compile(self):
+        """
+        Resolve the template and keep the result, the targets of its sites,
+        and the signatures of the files it depends on.
+        """
+        dependencies = set()
+
+        resolved = resolve(self.data, self.root, self.cwd, inplace=False,
+                           dependencies=dependencies, **self.options)
+
+        targets = {}
+        for path, _ in self.sites:
+            target = resolved
+            for token in path:
+                target = target[token]
+
+            targets[path] = target
+
+        blob = _serialize(resolved)
+        targets_blob = _serialize(targets)
+
+        with self._lock:
+            self.dependencies = dependencies
+            self._signatures = {path: file_signature(path)
+                                for path in dependencies}
+            self._resolved = resolved
+            self._blob = blob
+            self._targets = targets
+            self._targets_blob = targets_blob
+            self.compilations += 1
+
+    def changed(self) -> bool:
+        """
+        Return whether any of the files the plan depends on has changed.
+        """
+        return any(file_signature(path) != signature
+                   for path, signature in self._signatures.items())
+
+    def apply(self, data=None, *, check: bool = True):
+        """
+        Return a new copy of the resolved template, or if `data` is given,
+        `data` resolved by replaying the plan on it.
+
+        The `data` must have the references of the template at the same
+        places, otherwise `ValueError` is raised. It is never modified, and
+        its values other than the references are shared with the result,
+        like with `resolve(data, inplace=False)`. The targets put into the
+        result are new copies.
+
+        If `check` is `True`, the files the plan depends on are checked for
+        changes first, and the plan is compiled again if any has changed.
+        """
+        if check and self.changed():
+            self.compile()
+
+        with self._lock:
+            resolved, blob = self._resolved, self._blob
+            targets, targets_blob = self._targets, self._targets_blob
+
+        if data is None:
+            return _copy(blob, resolved)
+
+        return _replay(data, self.sites, _copy(targets_blob, targets))
+
+
+def compile_plan(data, root=None, cwd: str = None,
+                 **options) -> ResolutionPlan:
+    """
+    Compile the resolution of the template `data` into a `ResolutionPlan`,
+    whose `apply` returns the resolved template, or another document with
+    the same references resolved.
+
+    The arguments are the same as for `resolve`. `data` itself is never
+    modified, so it must not be modified while the plan is used either.
+    """
+    return ResolutionPlan(data, root, cwd, **options)
@@ -0,0 +1,142 @@
+"""
+Compiled JSON pointers and document indexes.
+"""
+import re
+import functools
+
+
+_INDEX = re.compile(r'0|[1-9][0-9]*')
+
+
+class PointerLookupError(LookupError):
+    """
+    Error when a JSON pointer token is not found in a node.
+    """
+    def __init__(self, token: str, node):
+        super().__init__(token)
+
+        self.token = token
+        self.node = node
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_pointer(ref: str) -> tuple:
+    """
+    Split the JSON pointer part of `ref` into its unescaped tokens.
+
+    Example:
+        Given:
+            ref = '#/paths/~1users/get'
+
+        The result will be:
+            ('paths', '/users', 'get')
+
+    The `~1` and `~0` escapes are replaced with `/` and `~` as defined by
+    RFC 6901. The pointers '', '#' and '#/' all refer to the whole document.
+
+    Compiled pointers are cached, so each distinct pointer is parsed once.
+
+    Raises `ValueError` if `ref` is not a valid JSON pointer.
+    """
+    pointer = ref[1:] if ref.startswith('#') else ref
+
+    if pointer in ('', '/'):
+        return ()
+
+    if not pointer.startswith('/'):
+        raise ValueError(f"Invalid JSON pointer '{ref}'.")
+
+    return tuple(token.replace('~1', '/').replace('~0', '~')
+                 for token in pointer[1:].split('/'))
+
+
+def step(node, token: str):
+    """
+    Return the child of `node` at the pointer `token`.
+
+    Tokens into lists are array indices, with no leading zeros.
+
+    Raises `PointerLookupError` if there is no such child.
+    """
+    try:
+        if isinstance(node, list):
+            if not _INDEX.fullmatch(token):
+                raise IndexError(token)
+
+            return node[int(token)]
+
+        return node[token]
+    except (KeyError, IndexError, TypeError):
+        raise PointerLookupError(token, node) from None
+
+
+def walk(document, path: tuple):
+    """
+    Return the node of `document` at the compiled pointer `path`.
+    """
+    node = document
+    for token in path:
+        node = step(node, token)
+
+    return node
+
+
+def _is_ref(node) -> bool:
+    return isinstance(node, dict) and '$ref' in node
+
+
+class PointerIndex:
+    """
+    An index of the nodes of a single document by their compiled pointers.
+
+    Nodes are indexed on first lookup together with their parent, so
+    repeated lookups of a pointer, and lookups of its siblings, e.g. of the
+    other schemas under 'definitions', take a constant time.
+
+    References are never indexed, since they may be replaced with their
+    targets inplace, while the other nodes keep their place.
+    """
+    def __init__(self):
+        self._nodes = {}
+
+    def find(self, document, path: tuple):
+        """
+        Return the node of `document` at the compiled pointer `path`.
+
+        Raises `PointerLookupError` if there is no such node.
+        """
+        if not path:
+            return document
+
+        nodes = self._nodes
+
+        try:
+            return nodes[path]
+        except KeyError:
+            pass
+
+        head = path[:-1]
+
+        try:
+            parent = nodes[head]
+        except KeyError:
+            parent = walk(document, head)
+
+            if head and not _is_ref(parent):
+                nodes[head] = parent
+
+        node = step(parent, path[-1])
+
+        if not _is_ref(node):
+            nodes[path] = node
+
+        return node
+
+    def clear(self):
+        """
+        Remove all the indexed nodes.
+        """
+        self._nodes.clear()
+
+    def __len__(self):
+        return len(self._nodes)
@@ -0,0 +1,114 @@
+"""
+Index of the references of decoded documents, built from their raw
+contents while they are decoded.
+"""
+import re
+import json
+
+
+_JSON_REF = re.compile(r'"\$ref"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_JSON_REF_BYTES = re.compile(_JSON_REF.pattern.encode())
+
+# Escapes which could spell any part of a `$ref` key in the decoded
+# document without a literal `$ref` in the raw contents, by decoder. The
+# escaped line breaks of YAML join the lines of a double quoted key.
+_ESCAPES = {
+    'json': ('\\u',),
+    'yaml': ('\\u', '\\x', '\\U', '\\\n', '\\\r')
+}
+_ESCAPES_BYTES = {
+    decoder: tuple(escape.encode() for escape in escapes)
+    for decoder, escapes in _ESCAPES.items()
+}
+
+_WIDE_BOMS = (b'\xff\xfe', b'\xfe\xff')
+
+
+def _unescape(ref) -> str:
+    if isinstance(ref, bytes):
+        ref = ref.decode('utf-8')
+
+    if '\\' in ref:
+        return json.loads(f'"{ref}"')
+
+    return ref
+
+
+def scan(raw, decoder: str) -> tuple:
+    """
+    Return the references in the `raw` contents of a document decoded by
+    the `decoder` named, which are only known for the built-in 'json' and
+    'yaml' decoders.
+
+    The raw contents are only searched for, which is much faster than
+    walking the decoded document. The result is:
+        () - if the document has no references at all.
+        a tuple of the references - if they could be found in the raw
+            contents, which is the case for JSON documents.
+        `None` - if the document may have references which could not be
+            found without decoding it.
+    """
+    if decoder not in _ESCAPES:
+        # The raw contents of other formats, e.g. compressed ones, may not
+        # spell out the references at all.
+        return None
+
+    if isinstance(raw, str):
+        marker, escapes, pattern = '$ref', _ESCAPES[decoder], _JSON_REF
+    else:
+        raw = bytes(raw)
+        marker, escapes, pattern = b'$ref', _ESCAPES_BYTES[decoder], \
+            _JSON_REF_BYTES
+
+        if raw[:2] in _WIDE_BOMS or b'\0' in raw[:4]:
+            # UTF-16 or UTF-32 encoded, where `$ref` is spelled differently.
+            return None
+
+    escaped = any(escape in raw for escape in escapes)
+
+    if marker not in raw and not escaped:
+        return ()
+
+    if escaped or decoder != 'json':
+        return None
+
+    return tuple(_unescape(ref) for ref in pattern.findall(raw))
+
+
+class RefIndex:
+    """
+    The references of decoded documents, as found by `scan` while they are
+    decoded, kept by the identity of the documents.
+
+    The resolution skips walking the documents known to have no
+    references, and the files referenced from a document are known without
+    walking it, e.g. to load them ahead of the resolution.
+    """
+    def __init__(self):
+        self._documents = {}
+
+    def add(self, document, refs: tuple):
+        """
+        Record the `refs` of the `document`, as returned by `scan`.
+        """
+        if refs is not None:
+            self._documents[id(document)] = (document, refs)
+
+    def refs(self, document) -> tuple:
+        """
+        Return the references of `document`, or `None` if they are not
+        known.
+        """
+        try:
+            return self._documents[id(document)][1]
+        except KeyError:
+            return None
+
+    def has_refs(self, document) -> bool:
+        """
+        Return `False` if `document` is known to have no references.
+        """
+        return self.refs(document) != ()
+
+    def __len__(self):
+        return len(self._documents)
@@ -0,0 +1,269 @@
+"""
+Loading of documents referenced by HTTP(S) URLs.
+"""
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import http.client
+from collections import defaultdict
+from urllib.parse import urlsplit, urlunsplit, urljoin
+
+from dollar_ref.loaders import Loader, LoaderError, Response
+
+
+REDIRECTS = (301, 302, 303, 307, 308)
+
+MAX_REDIRECTS = 5
+
+
+class RemoteError(LoaderError):
+    """
+    Error fetching a remote document.
+    """
+    def __init__(self, message: str, url: str, status: int = None):
+        super().__init__(message, url)
+
+        self.status = status
+
+
+class RemoteLoader(Loader):
+    """
+    Fetches remote documents over HTTP(S).
+
+    Connections are kept alive and reused for later requests to the same
+    host, with up to `connections` open connections per host, so that
+    several documents of a host may be fetched at the same time from
+    several threads.
+
+    The responses are cached in memory, and also in files of `directory`
+    if given, so they are shared by separate runs. A cached response is
+    revalidated with its `ETag` or `Last-Modified` header, so an unchanged
+    document is not transferred again. If `offline` is `True`, the
+    documents are only served from the cache and no requests are made.
+
+    The `headers` are sent with every request, e.g. for authentication,
+    but not to the other hosts redirected to.
+    """
+    def __init__(self, directory: str = None, *, offline: bool = False,
+                 timeout: float = 30.0, connections: int = 4,
+                 headers: dict = None):
+        self.directory = directory
+        self.offline = offline
+        self.timeout = timeout
+        self.connections = connections
+        self.headers = dict(headers or {})
+
+        self._responses = {}
+        self._idle = defaultdict(list)
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> Response:
+        """
+        Return the `Response` with the document at `url`, following
+        redirects.
+
+        Raises `RemoteError` if the document could not be fetched.
+        """
+        url = urlunsplit(urlsplit(url)[:4] + ('',))
+        cached = self._cached(url)
+
+        if self.offline:
+            if cached is None:
+                raise RemoteError(
+                    f"'{url}' is not cached and the loader is offline.", url
+                )
+
+            return Response(cached['url'], cached['body'],
+                            cached['content_type'])
+
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached['etag'] is not None:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified'] is not None:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        origin = urlsplit(url)[:2]
+
+        location = url
+        for _ in range(MAX_REDIRECTS + 1):
+            status, reason, response_headers, body = self._request(location,
+                                                                   headers)
+
+            if status in REDIRECTS and 'Location' in response_headers:
+                location = urljoin(location, response_headers['Location'])
+
+                if urlsplit(location)[:2] != origin:
+                    headers = {}
+
+                continue
+
+            break
+        else:
+            raise RemoteError(f"Too many redirects fetching '{url}'.", url)
+
+        if status == 304 and cached is not None:
+            return Response(cached['url'], cached['body'],
+                            cached['content_type'])
+
+        if status != 200:
+            raise RemoteError(
+                f"Error fetching '{url}': {status} {reason}.", url, status
+            )
+
+        entry = {
+            'url': location,
+            'body': body,
+            'content_type': response_headers.get('Content-Type'),
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified')
+        }
+        self._store(url, entry)
+
+        return Response(location, body, entry['content_type'])
+
+    def _request(self, url: str, headers: dict):
+        """
+        Make a GET request for `url` over a pooled connection.
+
+        A reused connection may have been closed by the server in the
+        meantime, in which case the request is retried once over a new one.
+        """
+        parts = urlsplit(url)
+        host = (parts.scheme, parts.netloc)
+        target = urlunsplit(('', '', parts.path or '/', parts.query, ''))
+
+        with self._slot(host):
+            for attempt in range(2):
+                connection, reused = self._connection(host, fresh=attempt > 0)
+
+                try:
+                    connection.request('GET', target, headers=headers)
+                    response = connection.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, OSError) as exc:
+                    connection.close()
+
+                    if reused and attempt == 0:
+                        continue
+
+                    raise RemoteError(
+                        f"Error fetching '{url}': {exc}.", url
+                    ) from exc
+
+                if response.will_close:
+                    connection.close()
+                else:
+                    with self._lock:
+                        self._idle[host].append(connection)
+
+                return response.status, response.reason, response.headers, \
+                    body
+
+    def _slot(self, host: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            try:
+                return self._slots[host]
+            except KeyError:
+                slot = self._slots[host] = threading.BoundedSemaphore(
+                    self.connections
+                )
+
+                return slot
+
+    def _connection(self, host: tuple, fresh: bool = False):
+        """
+        Return an idle connection to `host` and `True`, or a new one and
+        `False`, which is always the case if `fresh` is `True`.
+        """
+        with self._lock:
+            if self._idle[host] and not fresh:
+                return self._idle[host].pop(), True
+
+        scheme, netloc = host
+        if scheme == 'https':
+            connection = http.client.HTTPSConnection(netloc,
+                                                     timeout=self.timeout)
+        else:
+            connection = http.client.HTTPConnection(netloc,
+                                                    timeout=self.timeout)
+
+        return connection, False
+
+    def _entry_path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+
+        return os.path.join(self.directory, digest)
+
+    def _cached(self, url: str) -> dict:
+        """
+        Return the cached response for `url`, or `None`.
+        """
+        with self._lock:
+            entry = self._responses.get(url)
+
+        if entry is not None or self.directory is None:
+            return entry
+
+        path = self._entry_path(url)
+
+        try:
+            with open(f'{path}.json', 'r') as file:
+                entry = json.load(file)
+            with open(f'{path}.body', 'rb') as file:
+                entry['body'] = file.read()
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._responses[url] = entry
+
+        return entry
+
+    def _store(self, url: str, entry: dict):
+        with self._lock:
+            self._responses[url] = entry
+
+        if self.directory is None:
+            return
+
+        path = self._entry_path(url)
+        meta = {name: value for name, value in entry.items()
+                if name != 'body'}
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            for suffix, mode, content in (
+                    ('.body', 'wb', entry['body']),
+                    ('.json', 'w', json.dumps(meta))):
+                handle, temp = tempfile.mkstemp(dir=self.directory,
+                                                suffix='.tmp')
+                with os.fdopen(handle, mode) as file:
+                    file.write(content)
+
+                os.replace(temp, f'{path}{suffix}')
+        except OSError:
+            pass
+
+    def close(self):
+        """
+        Close all the idle connections.
+        """
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+
+            self._idle.clear()
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'offline': self.offline,
+                'timeout': self.timeout, 'connections': self.connections,
+                'headers': self.headers}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
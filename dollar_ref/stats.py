@@ -0,0 +1,230 @@
+"""
+Statistics of resolutions, for finding out where the time goes.
+"""
+import threading
+
+
+class ResolutionStats:
+    """
+    Counters and timings collected by the resolutions it is passed to.
+
+    The same object may be passed to several resolutions, which adds up
+    their statistics:
+        resolutions, total_time - the number and the total time of the
+            resolutions.
+        files_read, read_time - the number of files read and the time
+            spent reading them.
+        decoders - the number of files and the time spent decoding them
+            by decoder name, e.g. {'yaml': [3, 1.25]}.
+        files - the time spent reading and decoding every file by path.
+        internal_refs, external_refs - the number of internal and file
+            references followed.
+        memo_hits - the references to already resolved targets.
+        document_hits - the file references to already loaded files.
+        cache_hits, cache_misses - the lookups of the `DocumentCache`.
+        max_depth - the deepest nesting of objects being resolved.
+
+    If a `hook` is given, it is called for every event with its name and
+    details as keyword arguments, e.g. to feed an external metrics system:
+        hook('file', path=..., decoder=..., read_time=..., decode_time=...)
+        hook('ref', kind='internal' or 'external', ref=...)
+        hook('memo', ref=...)
+        hook('cache', path=..., hit=...)
+        hook('resolution', time=...)
+
+    Files decoded in worker processes are not accounted for.
+    """
+    def __init__(self, hook=None):
+        self.hook = hook
+
+        self.resolutions = 0
+        self.total_time = 0.0
+        self.files_read = 0
+        self.read_time = 0.0
+        self.decoders = {}
+        self.files = {}
+        self.internal_refs = 0
+        self.external_refs = 0
+        self.memo_hits = 0
+        self.document_hits = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.max_depth = 0
+
+        self._lock = threading.Lock()
+
+    def file(self, path: str, decoder: str, read_time: float,
+             decode_time: float):
+        """
+        Account for the file at `path`, read and decoded by `decoder`.
+        """
+        with self._lock:
+            self.files_read += 1
+            self.read_time += read_time
+
+            counts = self.decoders.setdefault(decoder, [0, 0.0])
+            counts[0] += 1
+            counts[1] += decode_time
+
+            self.files[path] = (self.files.get(path, 0.0) +
+                                read_time + decode_time)
+
+        if self.hook is not None:
+            self.hook('file', path=path, decoder=decoder,
+                      read_time=read_time, decode_time=decode_time)
+
+    def ref(self, kind: str, ref: str):
+        """
+        Account for following the `ref` of the `kind`, either 'internal'
+        or 'external'.
+        """
+        if kind == 'internal':
+            self.internal_refs += 1
+        else:
+            self.external_refs += 1
+
+        if self.hook is not None:
+            self.hook('ref', kind=kind, ref=ref)
+
+    def memo(self, ref: str):
+        """
+        Account for `ref` referring to an already resolved target.
+        """
+        self.memo_hits += 1
+
+        if self.hook is not None:
+            self.hook('memo', ref=ref)
+
+    def document(self):
+        """
+        Account for a file reference to an already loaded file.
+        """
+        self.document_hits += 1
+
+    def cache(self, path: str, hit: bool):
+        """
+        Account for a lookup of `path` in the `DocumentCache`.
+        """
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+        if self.hook is not None:
+            self.hook('cache', path=path, hit=hit)
+
+    def depth(self, depth: int):
+        """
+        Account for objects nested `depth` levels deep.
+        """
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def resolution(self, elapsed: float):
+        """
+        Account for a resolution which took `elapsed` seconds.
+        """
+        self.resolutions += 1
+        self.total_time += elapsed
+
+        if self.hook is not None:
+            self.hook('resolution', time=elapsed)
+
+    def slowest(self, count: int = 10) -> list:
+        """
+        Return the paths and times of the `count` slowest files to load.
+        """
+        return sorted(self.files.items(),
+                      key=lambda item: item[1], reverse=True)[:count]
+
+    def merge(self, other: dict):
+        """
+        Add up the statistics `other`, as returned by `as_dict`, e.g. by a
+        resolution in another process. The `hook` is not called.
+        """
+        with self._lock:
+            self.resolutions += other['resolutions']
+            self.total_time += other['total_time']
+            self.files_read += other['files_read']
+            self.read_time += other['read_time']
+
+            for name, counts in other['decoders'].items():
+                mine = self.decoders.setdefault(name, [0, 0.0])
+                mine[0] += counts['files']
+                mine[1] += counts['time']
+
+            for item in other['slowest_files']:
+                self.files[item['path']] = (self.files.get(item['path'], 0.0)
+                                            + item['time'])
+
+            self.internal_refs += other['internal_refs']
+            self.external_refs += other['external_refs']
+            self.memo_hits += other['memo_hits']
+            self.document_hits += other['document_hits']
+            self.cache_hits += other['cache_hits']
+            self.cache_misses += other['cache_misses']
+            self.max_depth = max(self.max_depth, other['max_depth'])
+
+    def as_dict(self, slowest: int = 10) -> dict:
+        """
+        Return the statistics as a JSON serializable `dict`, with the
+        `slowest` files only, or all of them if `None`.
+        """
+        return {
+            'resolutions': self.resolutions,
+            'total_time': self.total_time,
+            'files_read': self.files_read,
+            'read_time': self.read_time,
+            'decoders': {
+                name: {'files': files, 'time': elapsed}
+                for name, (files, elapsed) in self.decoders.items()
+            },
+            'internal_refs': self.internal_refs,
+            'external_refs': self.external_refs,
+            'memo_hits': self.memo_hits,
+            'document_hits': self.document_hits,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'max_depth': self.max_depth,
+            'slowest_files': [
+                {'path': path, 'time': elapsed}
+                for path, elapsed in self.slowest(slowest)
+            ]
+        }
+
+    def format_table(self, slowest: int = 10) -> str:
+        """
+        Return the statistics as a human readable table, with the
+        `slowest` files only.
+        """
+        rows = [
+            ('resolutions', f'{self.resolutions}'),
+            ('total time', f'{self.total_time:.3f}s'),
+            ('files read', f'{self.files_read}'),
+            ('read time', f'{self.read_time:.3f}s')
+        ]
+
+        for name, (files, elapsed) in sorted(self.decoders.items()):
+            rows.append((f'{name} decoding',
+                         f'{elapsed:.3f}s ({files} files)'))
+
+        rows += [
+            ('internal refs', f'{self.internal_refs}'),
+            ('external refs', f'{self.external_refs}'),
+            ('memo hits', f'{self.memo_hits}'),
+            ('document hits', f'{self.document_hits}'),
+            ('cache hits', f'{self.cache_hits}'),
+            ('cache misses', f'{self.cache_misses}'),
+            ('max depth', f'{self.max_depth}')
+        ]
+
+        width = max(len(name) for name, _ in rows)
+        lines = [f'{name:<{width}}  {value}' for name, value in rows]
+
+        files = self.slowest(slowest)
+        if files:
+            lines.append('slowest files:')
+            lines += [f'  {elapsed:8.3f}s  {path}' for path, elapsed in files]
+
+        return '\n'.join(lines)
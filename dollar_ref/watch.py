@@ -0,0 +1,123 @@
+"""
+Incremental re-resolution of documents whose files change.
+"""
+import time
+from collections import defaultdict
+
+from dollar_ref import DocumentCache, DiskCache
+from dollar_ref.batch import timed_job
+from dollar_ref.cache import file_signature
+
+
+class Watcher:
+    """
+    Keeps the outputs of a set of jobs up to date with their input files.
+
+    Every job records the files it depends on while it runs, which are
+    kept in `dependencies` by job and in `dependents` by file, the latter
+    being the reverse dependency graph. When files change, only the jobs
+    depending on them are run again.
+
+    The decoded files are kept in a shared `DocumentCache`, so a run only
+    decodes the changed files. The cache is backed by the `disk` cache if
+    given.
+
+    The files are watched by polling their modification time and size,
+    every `interval` seconds.
+
+    The keyword `options` are passed to `run_job`.
+    """
+    def __init__(self, jobs: list, *, interval: float = 0.5,
+                 disk: DiskCache = None, **options):
+        self.jobs = list(jobs)
+        self.interval = interval
+        self.options = options
+
+        self.cache = DocumentCache(maxsize=None, disk=disk)
+        self.dependencies = {}
+        self.dependents = defaultdict(set)
+        self.signatures = {}
+
+    def build(self, jobs: list = None) -> list:
+        """
+        Run `jobs`, all of them by default, updating their dependencies.
+
+        Returns the job, the time it took and the error message or `None`
+        for each of the jobs.
+        """
+        results = []
+
+        for job in self.jobs if jobs is None else jobs:
+            dependencies = set()
+
+            elapsed, error = timed_job(job, cache=self.cache,
+                                       dependencies=dependencies,
+                                       **self.options)
+
+            for path in self.dependencies.get(job, ()):
+                self.dependents[path].discard(job)
+
+                if not self.dependents[path]:
+                    del self.dependents[path]
+                    self.signatures.pop(path, None)
+
+            self.dependencies[job] = dependencies
+
+            for path in dependencies:
+                self.dependents[path].add(job)
+
+                if path not in self.signatures:
+                    self.signatures[path] = file_signature(path)
+
+            results.append((job, elapsed, error))
+
+        return results
+
+    def changed(self) -> set:
+        """
+        Return the watched files changed since the last call, or since
+        they were first depended on.
+        """
+        changed = set()
+
+        for path, signature in self.signatures.items():
+            current = file_signature(path)
+
+            if current != signature:
+                self.signatures[path] = current
+                changed.add(path)
+
+        return changed
+
+    def affected(self, paths: set) -> list:
+        """
+        Return the jobs depending on any of the `paths`, in their order.
+        """
+        jobs = set()
+        for path in paths:
+            jobs.update(self.dependents.get(path, ()))
+
+        return [job for job in self.jobs if job in jobs]
+
+    def poll(self):
+        """
+        Run the jobs affected by the files changed since the last poll.
+
+        Returns the changed files and the results of `build`.
+        """
+        changed = self.changed()
+
+        return changed, self.build(self.affected(changed))
+
+    def watch(self, callback):
+        """
+        Poll for changes forever, calling `callback` with the changed files
+        and the results of the jobs run for them whenever there are any.
+        """
+        while True:
+            time.sleep(self.interval)
+
+            changed, results = self.poll()
+
+            if changed:
+                callback(changed, results)
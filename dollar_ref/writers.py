@@ -0,0 +1,251 @@
+"""
+Streaming serialization of resolved documents.
+
+The documents are written to the output stream piece by piece instead of
+being rendered into a single string first, so the memory needed for the
+output does not grow with its size.
+"""
+import json
+
+from yaml.events import (
+    StreamStartEvent, StreamEndEvent, DocumentStartEvent, DocumentEndEvent,
+    MappingStartEvent, MappingEndEvent, SequenceStartEvent, SequenceEndEvent,
+    ScalarEvent, AliasEvent
+)
+from yaml.nodes import ScalarNode, SequenceNode, MappingNode
+
+from dollar_ref.backends import yaml_dumper
+
+
+# The levels of containers written item by item by `write_json`.
+JSON_STREAM_DEPTH = 2
+
+
+def write_json(data, stream, **options):
+    """
+    Write `data` as JSON to the `stream` in chunks.
+
+    The items of the top `JSON_STREAM_DEPTH` levels of containers are
+    encoded and written one by one by the C encoder of the `json` module,
+    which is several times faster than encoding the whole document in
+    chunks with `JSONEncoder.iterencode`, which is pure Python. Only the
+    documents written with an `indent` are encoded by `iterencode`, since
+    the C encoder does not indent.
+
+    The keyword `options` are passed to `json.JSONEncoder`.
+    """
+    encoder = json.JSONEncoder(**options)
+
+    if encoder.indent is not None:
+        stream.writelines(encoder.iterencode(data))
+    else:
+        _write_json(data, stream, encoder, JSON_STREAM_DEPTH)
+
+
+def _write_json(data, stream, encoder, depth: int):
+    write = stream.write
+
+    if isinstance(data, dict) and data and depth > 0 and \
+            all(isinstance(key, str) for key in data):
+        write('{')
+
+        for index, key in enumerate(sorted(data) if encoder.sort_keys
+                                    else data):
+            if index:
+                write(encoder.item_separator)
+
+            write(encoder.encode(key))
+            write(encoder.key_separator)
+            _write_json(data[key], stream, encoder, depth - 1)
+
+        write('}')
+    elif isinstance(data, list) and data and depth > 0:
+        write('[')
+
+        for index, item in enumerate(data):
+            if index:
+                write(encoder.item_separator)
+
+            _write_json(item, stream, encoder, depth - 1)
+
+        write(']')
+    else:
+        write(encoder.encode(data))
+
+
+def write_yaml(data, stream, *, dumper=None, expand: bool = False):
+    """
+    Write `data` as a YAML document to the `stream` in chunks.
+
+    The document is emitted event by event, in the block style and with
+    sorted keys, producing the same output as
+    `yaml.dump(data, explicit_start=True, default_flow_style=False)`.
+    Objects found more than once in `data` are written once and then
+    referred to with YAML aliases.
+
+    If `expand` is `True`, the objects found more than once are written in
+    full every time instead, and only the objects containing themselves,
+    which cannot be written out, are referred to with aliases.
+
+    The `dumper` is a PyYAML dumper class, by default the one of the 'auto'
+    backend, see `yaml_dumper`.
+    """
+    if dumper is None:
+        dumper = yaml_dumper()
+
+    emitter = dumper(stream, default_flow_style=False, explicit_start=True)
+
+    try:
+        for event in _yaml_events(data, emitter, expand):
+            emitter.emit(event)
+    finally:
+        emitter.dispose()
+
+
+def _sorted_keys(mapping: dict) -> list:
+    try:
+        return sorted(mapping)
+    except TypeError:
+        return list(mapping)
+
+
+def _pairs(mapping: dict):
+    for key in _sorted_keys(mapping):
+        yield key
+        yield mapping[key]
+
+
+def _children(node) -> list:
+    if isinstance(node, dict):
+        return [node[key] for key in _sorted_keys(node)]
+
+    return node
+
+
+_LEAVE = object()
+
+
+def _yaml_anchors(data, cycles: bool = False) -> dict:
+    """
+    Return the anchor names of the containers found more than once in
+    `data`, by their identity, or if `cycles` is `True`, of the containers
+    found again within themselves only.
+
+    The anchors are numbered in the same order as PyYAML numbers them.
+    """
+    anchors = {}
+    seen = set()
+    path = set()
+    stack = [data]
+
+    while stack:
+        node = stack.pop()
+
+        if node is _LEAVE:
+            path.discard(stack.pop())
+            continue
+
+        if not isinstance(node, (dict, list)):
+            continue
+
+        if id(node) in seen:
+            if id(node) not in anchors and (not cycles or id(node) in path):
+                anchors[id(node)] = f'id{len(anchors) + 1:03d}'
+            continue
+
+        seen.add(id(node))
+
+        if cycles:
+            path.add(id(node))
+            stack += (id(node), _LEAVE)
+
+        stack.extend(reversed(_children(node)))
+
+    return anchors
+
+
+def _yaml_events(data, emitter, expand: bool = False):
+    """
+    Yield the YAML events of the document `data`, with aliases for the
+    objects containing themselves only if `expand` is `True`.
+
+    The document is traversed with an explicit stack, so its depth is not
+    limited by the Python recursion limit.
+    """
+    anchors = _yaml_anchors(data, cycles=expand)
+    emitted = set()
+
+    yield StreamStartEvent()
+    yield DocumentStartEvent(explicit=True)
+
+    stack = [(iter((data,)), None)]
+
+    while stack:
+        items, end = stack[-1]
+
+        for item in items:
+            if isinstance(item, dict):
+                start, child_end = MappingStartEvent, MappingEndEvent
+                children = _pairs(item)
+            elif isinstance(item, list):
+                start, child_end = SequenceStartEvent, SequenceEndEvent
+                children = iter(item)
+            else:
+                emitter.represented_objects = {}
+                emitter.object_keeper = []
+
+                yield from _node_events(emitter.represent_data(item),
+                                        emitter)
+                continue
+
+            anchor = anchors.get(id(item))
+
+            if anchor is not None and id(item) in emitted:
+                yield AliasEvent(anchor)
+                continue
+
+            emitted.add(id(item))
+
+            yield start(anchor, None, True, flow_style=False)
+
+            stack.append((children, child_end))
+            break
+        else:
+            stack.pop()
+
+            if end is not None:
+                yield end()
+
+    yield DocumentEndEvent(explicit=False)
+    yield StreamEndEvent()
+
+
+def _node_events(node, emitter):
+    """
+    Yield the YAML events of a represented `node`, like PyYAML serializes
+    it.
+    """
+    if isinstance(node, ScalarNode):
+        detected = emitter.resolve(ScalarNode, node.value, (True, False))
+        default = emitter.resolve(ScalarNode, node.value, (False, True))
+
+        yield ScalarEvent(None, node.tag,
+                          (node.tag == detected, node.tag == default),
+                          node.value, style=node.style)
+    elif isinstance(node, SequenceNode):
+        implicit = node.tag == emitter.resolve(SequenceNode, node.value, True)
+
+        yield SequenceStartEvent(None, node.tag, implicit,
+                                 flow_style=node.flow_style)
+        for item in node.value:
+            yield from _node_events(item, emitter)
+        yield SequenceEndEvent()
+    elif isinstance(node, MappingNode):
+        implicit = node.tag == emitter.resolve(MappingNode, node.value, True)
+
+        yield MappingStartEvent(None, node.tag, implicit,
+                                flow_style=node.flow_style)
+        for key, value in node.value:
+            yield from _node_events(key, emitter)
+            yield from _node_events(value, emitter)
+        yield MappingEndEvent()
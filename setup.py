@@ -46,6 +46,10 @@ setup(
         'termcolor'
     ],
 
+    extras_require={
+        'fast': ['orjson']
+    },
+
     entry_points={
         'console_scripts': [
             'dref=dollar_ref.console:main'
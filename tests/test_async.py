@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+from pytest import raises
+
+from dollar_ref import (
+    resolve, async_resolve, async_pluck, FileResolutionError, DecodeError
+)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def write_tree(tmpdir):
+    tmpdir.join('a.json').write(json.dumps({
+        'name': 'a',
+        'b': {'$ref': 'sub/b.yaml'},
+        'self': {'$ref': '#/name'}
+    }))
+    tmpdir.ensure_dir('sub').join('b.yaml').write('---\nname: b\nc:\n'
+                                             '  $ref: ../c.json#/name\n')
+    tmpdir.join('c.json').write(json.dumps({'name': 'c'}))
+
+    return {
+        'a': {'$ref': 'a.json'},
+        'c': {'$ref': 'c.json#/name'}
+    }
+
+
+def test_same_result(tmpdir):
+    expected = resolve(write_tree(tmpdir), cwd=str(tmpdir))
+
+    resolved = run(async_resolve(write_tree(tmpdir), cwd=str(tmpdir)))
+
+    assert resolved == expected
+
+
+def test_fetch(tmpdir):
+    fetched = []
+
+    async def fetch(path):
+        fetched.append(path)
+        await asyncio.sleep(0)
+
+        with open(path) as file:
+            return file.read()
+
+    resolved = run(async_resolve(write_tree(tmpdir), cwd=str(tmpdir),
+                                 fetch=fetch))
+
+    assert resolved == {
+        'a': {
+            'name': 'a',
+            'b': {'name': 'b', 'c': 'c'},
+            'self': 'a'
+        },
+        'c': 'c'
+    }
+    assert len(fetched) == 3
+
+
+def test_in_memory_fetch():
+    documents = {
+        '/specs/common.json': '{"thing": {"$ref": "#/other"}, "other": 1}'
+    }
+
+    async def fetch(path):
+        try:
+            return documents[path]
+        except KeyError:
+            raise FileNotFoundError(path)
+
+    data = {'ref': {'$ref': 'common.json#/thing'}}
+
+    assert run(async_resolve(data, cwd='/specs', fetch=fetch)) == {'ref': 1}
+
+    data = {'ref': {'$ref': 'missing.json'}}
+
+    with raises(FileResolutionError):
+        run(async_resolve(data, cwd='/specs', fetch=fetch))
+
+
+def test_decode_error(tmpdir):
+    tmpdir.join('bad.json').write('{bad')
+
+    with raises(DecodeError):
+        run(async_resolve({'$ref': 'bad.json'}, cwd=str(tmpdir)))
+
+
+def test_async_pluck(tmpdir):
+    tmpdir.join('c.json').write(json.dumps({'name': 'c'}))
+
+    root = {
+        'child': {
+            'ref': {'$ref': str(tmpdir.join('c.json#/name'))}
+        }
+    }
+
+    assert run(async_pluck(root, 'child')) == {'ref': 'c'}
@@ -0,0 +1,34 @@
+import yaml
+from unittest.mock import patch
+
+from pytest import raises
+
+from dollar_ref import read_file, yaml_loader, yaml_dumper
+
+
+def test_auto():
+    if yaml.__with_libyaml__:
+        assert yaml_loader() is yaml.CFullLoader
+        assert yaml_dumper() is yaml.CDumper
+
+    with patch('dollar_ref.backends.HAS_LIBYAML', False):
+        assert yaml_loader() is yaml.FullLoader
+        assert yaml_dumper() is yaml.Dumper
+
+
+def test_python():
+    assert yaml_loader('python') is yaml.FullLoader
+    assert yaml_dumper('python') is yaml.Dumper
+
+
+def test_unknown():
+    with raises(ValueError):
+        yaml_loader('fast')
+
+
+def test_read_file_loader(tmpdir):
+    yaml_file = tmpdir.join('doc.yaml')
+    yaml_file.write('---\nsome: [1, 2]\n')
+
+    for loader in ('auto', 'python', yaml.SafeLoader):
+        assert read_file(str(yaml_file), loader=loader) == {'some': [1, 2]}
@@ -0,0 +1,168 @@
+import json
+import logging
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref.batch import (
+    Job, JobError, expand_specs, read_manifest, run_batch
+)
+from dollar_ref.console import main
+
+
+def teardown_function():
+    log = logging.getLogger('dollar-ref')
+    log.handlers = []
+
+
+def specs(tmpdir, count=3):
+    tmpdir.join('shared.json').write(json.dumps({'shared': 'data'}))
+
+    for i in range(count):
+        tmpdir.join(f'spec{i}.json').write(json.dumps({
+            'index': i,
+            'shared': {'$ref': 'shared.json#/shared'}
+        }))
+
+
+def test_expand_specs(tmpdir):
+    specs(tmpdir)
+    out = str(tmpdir.join('out'))
+
+    jobs = expand_specs(['a.yaml:b.json', 'c.json:-'], base='base')
+
+    assert jobs == [Job('base/a.yaml', 'base/b.json'), Job('base/c.json', '-')]
+
+    jobs = expand_specs([str(tmpdir.join('spec*.json'))],
+                        output_dir=out, fmt='yaml')
+
+    assert jobs == [
+        Job(str(tmpdir.join(f'spec{i}.json')), f'{out}/spec{i}.yaml')
+        for i in range(3)
+    ]
+
+    with raises(JobError):
+        expand_specs([str(tmpdir.join('spec*.json'))])
+
+    with raises(JobError):
+        expand_specs([str(tmpdir.join('nothing*.json'))], output_dir=out)
+
+    with raises(JobError):
+        expand_specs(['a.json:out.json', 'b.json:out.json'])
+
+
+def test_manifest(tmpdir):
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('# comment\n\nspec0.json:out0.json\n  spec1.json:-  \n')
+
+    assert read_manifest(str(manifest)) == [
+        Job(str(tmpdir.join('spec0.json')), str(tmpdir.join('out0.json'))),
+        Job(str(tmpdir.join('spec1.json')), '-')
+    ]
+
+    with raises(JobError):
+        read_manifest(str(tmpdir.join('missing.txt')))
+
+
+def test_shared_cache(tmpdir):
+    specs(tmpdir)
+    jobs = [Job(str(tmpdir.join(f'spec{i}.json')),
+                str(tmpdir.join(f'out{i}.json')))
+            for i in range(3)]
+    jobs.append(Job(str(tmpdir.join('missing.json')),
+                    str(tmpdir.join('out.json'))))
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        results = list(run_batch(jobs, external_only=False))
+
+    assert read.call_count == 1
+
+    assert [job for job, _, _ in results] == jobs
+    assert [error for _, _, error in results] == [None] * 3 + [
+        f"Input file '{jobs[-1].input_uri}' was not found."
+    ]
+
+    for i in range(3):
+        assert json.loads(tmpdir.join(f'out{i}.json').read()) == {
+            'index': i,
+            'shared': 'data'
+        }
+
+
+def test_processes(tmpdir):
+    specs(tmpdir)
+    jobs = [Job(str(tmpdir.join(f'spec{i}.json')),
+                str(tmpdir.join(f'out{i}.yaml')))
+            for i in range(3)]
+
+    results = list(run_batch(jobs, processes=2))
+
+    assert [error for _, _, error in results] == [None] * 3
+
+    for i in range(3):
+        assert tmpdir.join(f'out{i}.yaml').read() == (
+            f'---\nindex: {i}\nshared: data\n'
+        )
+
+
+def test_processes_stats(tmpdir, capsys):
+    specs(tmpdir)
+    jobs = [Job(str(tmpdir.join(f'spec{i}.json')),
+                str(tmpdir.join(f'out{i}.json')))
+            for i in range(3)]
+
+    stats = dollar_ref.ResolutionStats()
+    list(run_batch(jobs, processes=2, stats=stats))
+
+    assert stats.resolutions == 3
+    assert stats.external_refs == 3
+    assert stats.files_read >= 4
+    assert stats.cache_hits + stats.cache_misses == 3
+    assert str(tmpdir.join('spec0.json')) in stats.files
+
+    main(['--batch', str(tmpdir.join('spec*.json')),
+          '--output-dir', str(tmpdir.join('out')),
+          '-p', '2', '--stats', 'json'])
+
+    stdout, _ = capsys.readouterr()
+    report = json.loads(stdout[stdout.index('{'):])
+
+    assert report['resolutions'] == 3
+    assert report['external_refs'] == 3
+
+
+def test_console(tmpdir, capsys):
+    specs(tmpdir, count=2)
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('spec1.json:out1.json\n')
+
+    main(['--batch', str(tmpdir.join('spec0.json')),
+          '--output-dir', str(tmpdir.join('out')),
+          '--manifest', str(manifest)])
+
+    stdout, _ = capsys.readouterr()
+    lines = stdout.splitlines()
+
+    assert lines[0].startswith('Resolved 2 of 2 documents in ')
+    assert lines[1].endswith(f"'{tmpdir.join('spec0.json')}' -> "
+                             f"'{tmpdir.join('out', 'spec0.json')}'")
+    assert lines[2].endswith(f"'{tmpdir.join('spec1.json')}' -> "
+                             f"'{tmpdir.join('out1.json')}'")
+    assert json.loads(tmpdir.join('out1.json').read()) == {
+        'index': 1,
+        'shared': 'data'
+    }
+
+
+def test_console_failure(tmpdir, capsys):
+    with raises(SystemExit):
+        main(['--batch', f"{tmpdir.join('missing.json')}:-"])
+
+    _, err = capsys.readouterr()
+
+    assert err == (f"Error: Input file '{tmpdir.join('missing.json')}' "
+                   f"was not found.\n")
+
+    with raises(SystemExit):
+        main(['input.json', '--batch', 'a.json:b.json'])
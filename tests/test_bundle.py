@@ -0,0 +1,204 @@
+import json
+import logging
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import resolve
+from dollar_ref.bundle import bundle
+from dollar_ref.cache import normalize_path
+from dollar_ref.console import main
+
+
+def teardown_function():
+    log = logging.getLogger('dollar-ref')
+    log.handlers = []
+
+
+def files(tmpdir):
+    tmpdir.join('pet.json').write(json.dumps({
+        'type': 'object',
+        'properties': {
+            'owner': {'$ref': 'people.json#/Person'},
+            'tag': {'$ref': '#/definitions/Tag'}
+        },
+        'definitions': {'Tag': {'type': 'string'}}
+    }))
+    tmpdir.join('people.json').write(json.dumps({
+        'Person': {
+            'type': 'object',
+            'properties': {
+                'pets': {'type': 'array', 'items': {'$ref': 'pet.json'}},
+                'version': {'$ref': '#/version'}
+            }
+        },
+        'version': 3
+    }))
+
+
+def document(uses):
+    return {
+        'paths': {
+            f'/pets/{i}': {'$ref': 'pet.json'} for i in range(uses)
+        },
+        'local': {'$ref': '#/paths'}
+    }
+
+
+def test_bundle(tmpdir):
+    files(tmpdir)
+
+    bundled = bundle(document(200), str(tmpdir))
+
+    assert bundled['definitions'] == {
+        'pet': {
+            'type': 'object',
+            'properties': {
+                'owner': {'$ref': '#/definitions/Person'},
+                'tag': {'$ref': '#/definitions/pet/definitions/Tag'}
+            },
+            'definitions': {'Tag': {'type': 'string'}}
+        },
+        'Person': {
+            'type': 'object',
+            'properties': {
+                'pets': {'type': 'array',
+                         'items': {'$ref': '#/definitions/pet'}},
+                'version': 3
+            }
+        }
+    }
+    assert all(path == {'$ref': '#/definitions/pet'}
+               for path in bundled['paths'].values())
+    assert bundled['local'] == {'$ref': '#/paths'}
+
+
+def test_same_as_resolve(tmpdir):
+    tmpdir.join('name.json').write(json.dumps({'type': 'string'}))
+    tmpdir.join('user.json').write(json.dumps({
+        'type': 'object',
+        'properties': {'name': {'$ref': 'name.json'}}
+    }))
+
+    data = {'a': {'$ref': 'user.json'}, 'b': [{'$ref': 'user.json'}]}
+
+    resolved = resolve(bundle(json.loads(json.dumps(data)), str(tmpdir)))
+
+    assert set(resolved.pop('definitions')) == {'user', 'name'}
+    assert resolved == resolve(data, cwd=str(tmpdir))
+
+
+def test_openapi(tmpdir):
+    files(tmpdir)
+
+    data = document(1)
+    data['openapi'] = '3.0.0'
+    data['components'] = {'schemas': {'pet': {'type': 'null'}}}
+
+    bundled = bundle(data, str(tmpdir))
+    schemas = bundled['components']['schemas']
+
+    assert schemas['pet'] == {'type': 'null'}
+    assert schemas['pet2']['type'] == 'object'
+    assert bundled['paths']['/pets/0'] == {
+        '$ref': '#/components/schemas/pet2'
+    }
+
+
+def test_definitions(tmpdir):
+    files(tmpdir)
+
+    bundled = bundle(document(1), str(tmpdir), definitions='#/$defs')
+
+    assert set(bundled['$defs']) == {'pet', 'Person'}
+
+    with raises(ValueError):
+        bundle(document(1), str(tmpdir), definitions='#/local/$ref')
+
+
+def test_siblings(tmpdir):
+    files(tmpdir)
+
+    bundled = bundle({
+        'pet': {
+            '$ref': 'pet.json',
+            'description': {'$ref': 'people.json#/Person'}
+        }
+    }, str(tmpdir))
+
+    assert bundled['pet'] == {
+        '$ref': '#/definitions/pet',
+        'description': {'$ref': '#/definitions/Person'}
+    }
+
+
+def test_root_reference(tmpdir):
+    files(tmpdir)
+
+    bundled = bundle({'$ref': 'people.json'}, str(tmpdir))
+
+    assert bundled['Person']['properties']['version'] == {
+        '$ref': '#/version'
+    }
+    assert bundled['definitions']['pet']['properties']['owner'] == {
+        '$ref': '#/Person'
+    }
+
+
+def test_dependencies(tmpdir):
+    files(tmpdir)
+    dependencies = set()
+
+    bundle(document(1), str(tmpdir), dependencies=dependencies)
+
+    assert dependencies == {
+        normalize_path(str(tmpdir.join(name)))
+        for name in ('pet.json', 'people.json')
+    }
+
+    with raises(dollar_ref.FileResolutionError):
+        bundle({'a': {'$ref': 'missing.json'}}, str(tmpdir))
+
+
+def test_cli(tmpdir):
+    files(tmpdir)
+    tmpdir.join('api.json').write(json.dumps(document(3)))
+    output = tmpdir.join('out.json')
+
+    main([str(tmpdir.join('api.json')), str(output), '--bundle'])
+
+    bundled = json.loads(output.read())
+
+    assert set(bundled['definitions']) == {'pet', 'Person'}
+
+    main([str(tmpdir.join('api.json')), str(output), '--bundle',
+          '--definitions', '#/components/schemas'])
+
+    bundled = json.loads(output.read())
+
+    assert set(bundled['components']['schemas']) == {'pet', 'Person'}
+
+
+def test_root_within_file(tmpdir):
+    tmpdir.join('f.json').write(json.dumps({
+        'sub': {
+            'self': {'$ref': '#/sub'},
+            'nested': {'$ref': '#/sub/self'},
+            'other': {'$ref': '#/other'}
+        },
+        'other': {'x': 1}
+    }))
+
+    expected = {
+        'self': {'$ref': '#'},
+        'nested': {'$ref': '#/self'},
+        'other': {'$ref': '#/definitions/other'},
+        'definitions': {'other': {'x': 1}}
+    }
+
+    assert bundle({'$ref': 'f.json#/sub'}, str(tmpdir)) == expected
+
+    output = tmpdir.join('out.json')
+    main([f"file://{tmpdir.join('f.json')}#/sub", str(output), '--bundle'])
+
+    assert json.loads(output.read()) == expected
@@ -0,0 +1,256 @@
+import json
+import os
+import pickle
+import logging
+from unittest.mock import patch
+
+import dollar_ref
+from dollar_ref import resolve, pluck, DocumentCache, DiskCache
+from dollar_ref.console import main
+
+
+def test_single_read_per_call(tmpdir):
+    common = tmpdir.join('common.json')
+    common.write(json.dumps({
+        'one': 1,
+        'two': 2
+    }))
+
+    data = {
+        'first': {'$ref': 'common.json#/one'},
+        'second': {'$ref': 'common.json#/two'},
+        'third': [{'$ref': 'common.json'}]
+    }
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        resolved = resolve(data, cwd=str(tmpdir))
+
+    assert read.call_count == 1
+    assert resolved == {
+        'first': 1,
+        'second': 2,
+        'third': [{'one': 1, 'two': 2}]
+    }
+
+
+def test_shared_between_calls(tmpdir):
+    common = tmpdir.join('common.json')
+    common.write(json.dumps({'some': 'stuff'}))
+
+    cache = DocumentCache()
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        for _ in range(3):
+            resolved = resolve({'ref': {'$ref': 'common.json#/some'}},
+                               cwd=str(tmpdir), cache=cache)
+
+            assert resolved == {'ref': 'stuff'}
+
+    assert read.call_count == 1
+    assert str(common) in cache
+
+
+def test_cached_documents_unmodified(tmpdir):
+    common = tmpdir.join('common.json')
+    common.write(json.dumps({
+        'value': 'stuff',
+        'alias': {'$ref': '#/value'}
+    }))
+
+    cache = DocumentCache()
+
+    first = resolve({'$ref': 'common.json'}, cwd=str(tmpdir), cache=cache)
+    first['value'] = 'changed'
+
+    second = resolve({'$ref': 'common.json'}, cwd=str(tmpdir), cache=cache,
+                     external_only=True)
+
+    assert second == {
+        'value': 'stuff',
+        'alias': {'$ref': '#/value'}
+    }
+
+
+def test_copies(tmpdir):
+    common = tmpdir.join('common.json')
+    common.write(json.dumps({'nested': {'value': 'stuff'}}))
+
+    cache = DocumentCache()
+    data = {'$ref': 'common.json'}
+
+    with patch('pickle.dumps', wraps=pickle.dumps) as dumps:
+        first = resolve(dict(data), cwd=str(tmpdir), cache=cache)
+        second = resolve(dict(data), cwd=str(tmpdir), cache=cache)
+
+    assert dumps.call_count == 1
+    assert first == second == {'nested': {'value': 'stuff'}}
+    assert first['nested'] is not second['nested']
+
+    shared = resolve(dict(data), cwd=str(tmpdir), cache=cache,
+                     inplace=False)
+    again = resolve(dict(data), cwd=str(tmpdir), cache=cache,
+                    inplace=False)
+
+    assert shared is again
+
+
+def test_deep_copies(tmpdir):
+    tmpdir.join('deep.json').write('{"a": ' * 3000 + '1' + '}' * 3000)
+    tmpdir.join('in.json').write(json.dumps({'deep': {'$ref': 'deep.json'}}))
+
+    def depth(data):
+        count = 0
+        while isinstance(data, dict):
+            data, count = data['a'], count + 1
+
+        return count
+
+    cache = DocumentCache()
+
+    first = resolve({'$ref': 'deep.json'}, cwd=str(tmpdir), cache=cache)
+    second = resolve({'$ref': 'deep.json'}, cwd=str(tmpdir), cache=cache)
+
+    assert depth(first) == depth(second) == 3000
+    assert first is not second
+
+    disk = DiskCache(str(tmpdir.join('cache')))
+    resolved = resolve({'$ref': 'deep.json'}, cwd=str(tmpdir),
+                       cache=DocumentCache(disk=disk))
+
+    assert depth(resolved) == 3000
+
+    main(['--batch', f"{tmpdir.join('in.json')}:{tmpdir.join('out.yaml')}"])
+
+    assert tmpdir.join('out.yaml').read().count('a:') == 3000
+
+
+def test_invalidated_on_change(tmpdir):
+    common = tmpdir.join('common.json')
+    common.write(json.dumps({'some': 'old'}))
+
+    cache = DocumentCache()
+
+    assert resolve({'$ref': 'common.json#/some'},
+                   cwd=str(tmpdir), cache=cache) == 'old'
+
+    common.write(json.dumps({'some': 'new stuff'}))
+    stat = os.stat(str(common))
+    os.utime(str(common), ns=(stat.st_atime_ns,
+                              stat.st_mtime_ns + 1000000000))
+
+    assert resolve({'$ref': 'common.json#/some'},
+                   cwd=str(tmpdir), cache=cache) == 'new stuff'
+
+
+def test_lru_eviction(tmpdir):
+    for name in ('a', 'b', 'c'):
+        tmpdir.join(f'{name}.json').write(json.dumps(name))
+
+    cache = DocumentCache(maxsize=2)
+
+    for name in ('a', 'b', 'a', 'c'):
+        resolve({'$ref': f'{name}.json'}, cwd=str(tmpdir), cache=cache)
+
+    assert len(cache) == 2
+    assert str(tmpdir.join('a.json')) in cache
+    assert str(tmpdir.join('b.json')) not in cache
+    assert str(tmpdir.join('c.json')) in cache
+
+
+def test_pluck_cache(tmpdir):
+    tmpdir.join('common.json').write(json.dumps({'some': 'stuff'}))
+
+    cache = DocumentCache()
+    root = {
+        'child': {
+            'ref': {'$ref': str(tmpdir.join('common.json#/some'))}
+        }
+    }
+
+    assert pluck(root, 'child', cache=cache) == {'ref': 'stuff'}
+    assert len(cache) == 1
+
+
+def test_disk_cache(tmpdir):
+    common = tmpdir.join('common.yaml')
+    common.write('---\nsome: stuff\n')
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        for _ in range(3):
+            cache = DiskCache(str(tmpdir.join('cache')))
+
+            assert resolve({'$ref': 'common.yaml#/some'},
+                           cwd=str(tmpdir), cache=cache) == 'stuff'
+
+    assert read.call_count == 1
+    assert len(cache) == 1
+
+    common.write('---\nsome: new stuff\n')
+
+    assert resolve({'$ref': 'common.yaml#/some'},
+                   cwd=str(tmpdir), cache=cache) == 'new stuff'
+    assert len(cache) == 2
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_disk_cache_corrupt(tmpdir):
+    tmpdir.join('common.json').write(json.dumps({'some': 'stuff'}))
+    cache = DiskCache(str(tmpdir.join('cache')))
+
+    resolve({'$ref': 'common.json'}, cwd=str(tmpdir), cache=cache)
+
+    for entry in tmpdir.join('cache').listdir():
+        entry.write('corrupt')
+
+    assert resolve({'$ref': 'common.json#/some'},
+                   cwd=str(tmpdir), cache=cache) == 'stuff'
+
+
+def test_disk_cache_eviction(tmpdir):
+    cache = DiskCache(str(tmpdir.join('cache')), max_bytes=1000)
+
+    for i in range(10):
+        tmpdir.join(f'{i}.json').write(json.dumps({'data': 'x' * 200}) +
+                                       ' ' * i)
+        resolve({'$ref': f'{i}.json'}, cwd=str(tmpdir), cache=cache)
+
+    assert 0 < len(cache) < 10
+    assert sum(entry.size()
+               for entry in tmpdir.join('cache').listdir()) <= 1000
+
+
+def test_backed_by_disk(tmpdir):
+    tmpdir.join('common.json').write(json.dumps({'some': 'stuff'}))
+    disk = DiskCache(str(tmpdir.join('cache')))
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        for _ in range(2):
+            cache = DocumentCache(disk=disk)
+
+            for _ in range(2):
+                resolve({'$ref': 'common.json'}, cwd=str(tmpdir),
+                        cache=cache)
+
+    assert read.call_count == 1
+
+
+def test_console_disk_cache(tmpdir):
+    root = tmpdir.join('root.yaml')
+    root.write('---\nref:\n  $ref: child.yaml\n')
+    tmpdir.join('child.yaml').write('---\nchild: data\n')
+    output = tmpdir.join('out.json')
+
+    with patch('dollar_ref.batch.read_file',
+               wraps=dollar_ref.read_file) as read, \
+            patch('dollar_ref.read_file', new=read):
+        for _ in range(2):
+            main([str(root), str(output),
+                  '--cache-dir', str(tmpdir.join('cache'))])
+
+            logging.getLogger('dollar-ref').handlers = []
+
+    assert read.call_count == 2
+    assert json.loads(output.read()) == {'ref': {'child': 'data'}}
@@ -0,0 +1,126 @@
+import json
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import resolve, lazy_resolve, CircularReferenceError
+
+
+def reexports(uses):
+    return {
+        'uses': [{'$ref': '#/components/Public'} for _ in range(uses)],
+        'components': {
+            'Public': {'$ref': '#/components/Exported'},
+            'Exported': {'$ref': '#/components/Internal'},
+            'Internal': {'type': 'object'}
+        }
+    }
+
+
+def test_chain():
+    resolved = resolve(reexports(3))
+
+    internal = resolved['components']['Internal']
+
+    assert internal == {'type': 'object'}
+    assert all(use is internal for use in resolved['uses'])
+    assert resolved['components']['Public'] is internal
+    assert resolved['components']['Exported'] is internal
+
+
+def test_lazy_followed_once():
+    data = reexports(10)
+
+    with patch('dollar_ref._follow_path',
+               wraps=dollar_ref._follow_path) as follow:
+        lazy = lazy_resolve(data)
+
+        assert [use['type'] for use in lazy['uses']] == ['object'] * 10
+
+    assert follow.call_count == 12
+
+
+def test_files(tmpdir):
+    tmpdir.join('vendor.json').write(json.dumps({
+        'Pet': {'$ref': 'models.json#/Pet'}
+    }))
+    tmpdir.join('models.json').write(json.dumps({
+        'Pet': {'$ref': 'pet.json'}
+    }))
+    tmpdir.join('pet.json').write(json.dumps({'type': 'object'}))
+
+    data = {
+        'a': {'$ref': 'vendor.json#/Pet'},
+        'b': {'$ref': 'models.json#/Pet'},
+        'c': {'$ref': 'vendor.json#/Pet'}
+    }
+
+    resolved = resolve(data, cwd=str(tmpdir))
+
+    assert resolved['a'] == {'type': 'object'}
+    assert resolved['a'] is resolved['b'] is resolved['c']
+
+
+def test_link_through_alias():
+    data = {
+        'root': {'$ref': '#/definitions/Alias'},
+        'definitions': {
+            'Alias': {'$ref': '#/definitions/Node'},
+            'Node': {
+                'value': 1,
+                'child': {'$ref': '#/definitions/Alias'}
+            }
+        }
+    }
+
+    resolved = resolve(data, circular='link')
+
+    node = resolved['definitions']['Node']
+
+    assert resolved['root'] is node
+    assert node['child'] is node
+
+
+def test_loop():
+    data = {
+        'use': {'$ref': '#/a'},
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/c'},
+        'c': {'$ref': '#/b'}
+    }
+
+    with raises(CircularReferenceError) as exc:
+        resolve(data, circular='link')
+
+    assert str(exc.value) == (
+        "Circular reference detected: '#/b' -> '#/c' -> '#/b'."
+    )
+
+    with raises(CircularReferenceError):
+        lazy_resolve(data)['use']
+
+
+def test_keep_loop():
+    data = {
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/a'}
+    }
+
+    resolved = resolve(data, circular='keep')
+
+    assert resolved == {'a': {'$ref': '#/b'}, 'b': {'$ref': '#/a'}}
+
+
+def test_external_only():
+    data = {
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/c'},
+        'c': 1
+    }
+
+    assert resolve(data, external_only=True) == {
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/c'},
+        'c': 1
+    }
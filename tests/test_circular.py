@@ -0,0 +1,107 @@
+import json
+
+from pytest import raises, mark
+
+from dollar_ref import resolve, CircularReferenceError
+
+
+def tree(definitions_first=False):
+    definitions = {
+        'Node': {
+            'type': 'object',
+            'properties': {
+                'children': {
+                    'type': 'array',
+                    'items': {'$ref': '#/definitions/Node'}
+                }
+            }
+        }
+    }
+
+    if definitions_first:
+        return {
+            'definitions': definitions,
+            'root': {'$ref': '#/definitions/Node'}
+        }
+
+    return {
+        'root': {'$ref': '#/definitions/Node'},
+        'definitions': definitions
+    }
+
+
+orders = mark.parametrize('definitions_first', [False, True])
+
+
+@orders
+def test_raise(definitions_first):
+    with raises(CircularReferenceError) as exc:
+        resolve(tree(definitions_first))
+
+    assert str(exc.value) == (
+        "Circular reference detected: "
+        "'#/definitions/Node' -> '#/definitions/Node'."
+    )
+
+
+@orders
+@mark.parametrize('options', [{}, {'inplace': False}, {'copy': True}])
+def test_keep(definitions_first, options):
+    resolved = resolve(tree(definitions_first), circular='keep', **options)
+
+    node = resolved['definitions']['Node']
+
+    assert resolved['root'] == node
+    assert node['properties']['children']['items'] == {
+        '$ref': '#/definitions/Node'
+    }
+    assert json.loads(json.dumps(resolved)) == resolved
+
+    if not options:
+        assert resolved['root'] is node
+
+
+@orders
+def test_link(definitions_first):
+    resolved = resolve(tree(definitions_first), circular='link')
+
+    node = resolved['definitions']['Node']
+
+    assert resolved['root'] is node
+    assert node['properties']['children']['items'] is node
+
+
+def test_pure_loop():
+    data = {
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/a'}
+    }
+
+    with raises(CircularReferenceError):
+        resolve(data, circular='link')
+
+
+def test_files(tmpdir):
+    tmpdir.join('a.json').write(json.dumps({
+        'value': 'a',
+        'other': {'$ref': 'b.json'}
+    }))
+    tmpdir.join('b.json').write(json.dumps({
+        'value': 'b',
+        'other': {'$ref': 'a.json'}
+    }))
+
+    with raises(CircularReferenceError):
+        resolve({'$ref': 'a.json'}, cwd=str(tmpdir), external_only=True)
+
+    resolved = resolve({'$ref': 'a.json'}, cwd=str(tmpdir),
+                       external_only=True, circular='link')
+
+    assert resolved['value'] == 'a'
+    assert resolved['other']['value'] == 'b'
+    assert resolved['other']['other'] is resolved
+
+
+def test_unknown_policy():
+    with raises(ValueError):
+        resolve({}, circular='ignore')
@@ -1,6 +1,6 @@
 import json
 import logging
-from unittest.mock import patch, Mock
+from unittest.mock import patch
 
 from pytest import raises
 from termcolor import colored
@@ -114,8 +114,87 @@ def test_from_cmd_line(script_runner):
 def test_color_fromatter():
     formatter = DrefLogFormatter(use_color=True)
 
-    record = Mock()
-    record.levelno = logging.ERROR
-    record.msg = 'hello'
+    record = logging.makeLogRecord({'levelno': logging.ERROR,
+                                    'msg': 'hello %s', 'args': ('world',)})
 
-    assert formatter.format(record) == colored('Error: hello', 'red')
+    assert formatter.format(record) == colored('Error: hello world', 'red')
+
+
+def test_yaml_backend(tmpdir):
+    input_file = tmpdir.join('input_file.yaml')
+    input_file.write('---\nhello: yaml\nref:\n  $ref: child.yaml\n')
+    tmpdir.join('child.yaml').write('---\nchild: data\n')
+
+    for backend in ('auto', 'python'):
+        output_file = tmpdir.join(f'output_{backend}.yml')
+
+        main([str(input_file), str(output_file), '--yaml-backend', backend])
+
+        assert output_file.read() == ('---\nhello: yaml\n'
+                                      'ref:\n  child: data\n')
+
+
+def test_yaml_backend_unavailable(tmpdir, capsys):
+    input_file = tmpdir.join('input_file.yaml')
+    input_file.write('---\nhello: yaml\n')
+
+    with patch('dollar_ref.backends.HAS_LIBYAML', False):
+        with raises(SystemExit):
+            main([str(input_file), str(tmpdir.join('out.yaml')),
+                  '--yaml-backend', 'libyaml'])
+
+    _, err = capsys.readouterr()
+
+    assert err == ("Error: The 'libyaml' YAML backend is not available, "
+                   "PyYAML is installed without libyaml support.\n")
+
+
+def test_jobs(tmpdir):
+    input_file = tmpdir.join('input_file.json')
+    input_file.write(json.dumps({
+        'refs': [{'$ref': f'child{i}.json'} for i in range(10)]
+    }))
+
+    for i in range(10):
+        tmpdir.join(f'child{i}.json').write(json.dumps({'child': i}))
+
+    output_file = tmpdir.join('output_file.json')
+
+    main([str(input_file), str(output_file), '-j', '4'])
+
+    assert json.loads(output_file.read()) == {
+        'refs': [{'child': i} for i in range(10)]
+    }
+
+
+def test_stdout(tmpdir, capsys):
+    input_file = tmpdir.join('input_file.json')
+    input_file.write(json.dumps({
+        'hello': 'stdout',
+        'ref': {'$ref': '#/hello'}
+    }))
+
+    main([str(input_file), '-o', '-', '-i'])
+
+    out, err = capsys.readouterr()
+
+    assert json.loads(out) == {'hello': 'stdout', 'ref': 'stdout'}
+    assert err == (f"Successfully resolved '{str(input_file)}' "
+                   f"into the standard output.\n")
+
+    main([str(input_file), '-', '--format', 'yaml', '-i'])
+
+    out, _ = capsys.readouterr()
+
+    assert out == '---\nhello: stdout\nref: stdout\n'
+
+
+def test_output_required(tmpdir):
+    input_file = tmpdir.join('input_file.json')
+    input_file.write('{}')
+
+    with raises(SystemExit):
+        main([str(input_file)])
+
+    with raises(SystemExit):
+        main([str(input_file), 'out.json', '-o', 'other.json'])
@@ -0,0 +1,136 @@
+import json
+
+from pytest import raises
+
+from dollar_ref import (
+    resolve, read_file, find_decoder, register_decoder, unregister_decoder,
+    DecodeError, DECODERS
+)
+from dollar_ref.decoders import decode_json, SNIFF_SIZE
+
+
+def decode_pairs(raw):
+    pairs = (line.split('=') for line in raw.splitlines() if line)
+
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
+def test_find_decoder():
+    assert find_decoder(path='doc.json').name == 'json'
+    assert find_decoder(path='doc.YML').name == 'yaml'
+    assert find_decoder(path='doc.json', raw='---\na: 1').name == 'yaml'
+    assert find_decoder(path='doc',
+                        mimetype='application/yaml; charset=utf-8'
+                        ).name == 'yaml'
+    assert find_decoder(path='doc.txt', raw='{}').name == 'json'
+
+
+def test_json_fallback():
+    assert decode_json('{"a": [1, 2.5, "three"]}') == {'a': [1, 2.5, 'three']}
+    assert decode_json('[NaN]')[0] != decode_json('[NaN]')[0]
+    assert decode_json(json.dumps(2 ** 100)) == 2 ** 100
+
+    with raises(ValueError):
+        decode_json('{bad')
+
+
+def test_custom_decoder(tmpdir):
+    register_decoder('pairs', decode_pairs, extensions=('.pairs',))
+
+    try:
+        tmpdir.join('values.pairs').write('one = 1\ntwo = 2\n')
+
+        resolved = resolve({'ref': {'$ref': 'values.pairs#/two'}},
+                           cwd=str(tmpdir))
+
+        assert resolved == {'ref': '2'}
+    finally:
+        unregister_decoder('pairs')
+
+    assert 'pairs' not in DECODERS
+
+
+def test_custom_sniff(tmpdir):
+    register_decoder('pairs', decode_pairs,
+                     sniff=lambda raw: raw.startswith('#pairs'))
+
+    try:
+        pairs_file = tmpdir.join('values.txt')
+        pairs_file.write('#pairs = yes\nsome = thing\n')
+
+        assert read_file(str(pairs_file)) == {
+            '#pairs': 'yes',
+            'some': 'thing'
+        }
+    finally:
+        unregister_decoder('pairs')
+
+
+def test_custom_errors(tmpdir):
+    register_decoder('pairs', decode_pairs, extensions=('.pairs',))
+
+    try:
+        bad_file = tmpdir.join('bad.pairs')
+        bad_file.write('no pairs here\n')
+
+        with raises(DecodeError):
+            read_file(str(bad_file))
+    finally:
+        unregister_decoder('pairs')
+
+
+def test_select_decoder(tmpdir):
+    yaml_file = tmpdir.join('doc.txt')
+    yaml_file.write('some: yaml\n')
+
+    assert read_file(str(yaml_file), decoder='yaml') == {'some': 'yaml'}
+
+
+def test_binary_decoders(tmpdir):
+    calls = []
+
+    def decode(raw):
+        calls.append(raw)
+        return decode_json(raw)
+
+    register_decoder('tracing', decode, extensions=('.trace',), binary=True)
+
+    try:
+        doc = tmpdir.join('doc.trace')
+        doc.write_binary('{"name": "caf\\u00e9"}'.encode())
+
+        assert read_file(str(doc)) == {'name': 'café'}
+        assert isinstance(calls[0], bytes)
+
+        register_decoder('tracing', decode_pairs, extensions=('.trace',))
+        doc.write_binary('name = café\n'.encode())
+
+        assert read_file(str(doc)) == {'name': 'café'}
+    finally:
+        unregister_decoder('tracing')
+
+
+def test_sniff_head():
+    heads = []
+
+    def sniff(raw):
+        heads.append(raw)
+        return raw.startswith('#pairs')
+
+    register_decoder('pairs', decode_pairs, sniff=sniff)
+
+    try:
+        raw = b'\xef\xbb\xbf#pairs = yes\n' + b'a = 1\n' * 1000
+
+        assert find_decoder(path='doc.json', raw=raw).name == 'pairs'
+        assert len(heads[0]) <= SNIFF_SIZE
+    finally:
+        unregister_decoder('pairs')
+
+
+def test_bytes_yaml(tmpdir):
+    doc = tmpdir.join('doc.yaml')
+    doc.write_binary('---\nname: café\n'.encode())
+
+    for loader in ('auto', 'python'):
+        assert read_file(str(doc), loader=loader) == {'name': 'café'}
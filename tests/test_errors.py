@@ -77,3 +77,36 @@ def test_web():
 
     with raises(ResolutionError):
         resolve(data)
+
+
+def test_internal_error_details():
+    data = {
+        'definitions': {f'Schema{i}': {'type': 'object'} for i in range(100)},
+        'bad_ref': {'$ref': '#/definitions/Missing'}
+    }
+
+    with raises(InternalResolutionError) as error:
+        resolve(data)
+
+    assert error.value.ref == '#/definitions/Missing'
+    assert error.value.token == 'Missing'
+    assert error.value.node is data['definitions']
+    assert error.value.path is None
+
+    message = str(error.value)
+
+    assert message.startswith("Error resolving '#/definitions/Missing', "
+                              "'Missing' not found in {")
+    assert message.endswith('...}.')
+    assert len(message) < 200
+
+
+def test_internal_error_path(tmpdir):
+    other = tmpdir.join('other.json')
+    other.write('{"a": {"$ref": "#/missing"}}')
+
+    with raises(InternalResolutionError) as error:
+        resolve({'$ref': str(other)})
+
+    assert error.value.path == str(other)
+    assert f"in '{str(other)}'" in str(error.value)
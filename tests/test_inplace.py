@@ -0,0 +1,84 @@
+import json
+from copy import deepcopy
+
+from dollar_ref import resolve
+
+
+def document():
+    return {
+        'info': {'title': 'untouched', 'tags': ['a', 'b']},
+        'paths': {
+            '/items': {
+                'get': {'schema': {'$ref': '#/definitions/Item'}},
+                'examples': [{'id': 1}, {'id': 2}]
+            }
+        },
+        'definitions': {
+            'Item': {'type': 'object', 'parent': {'$ref': '#/definitions/Base'}},
+            'Base': {'type': 'string'}
+        }
+    }
+
+
+def test_not_modified():
+    data = document()
+    original = deepcopy(data)
+
+    resolved = resolve(data, inplace=False)
+
+    assert data == original
+    assert resolved == resolve(document())
+
+
+def test_structural_sharing():
+    data = document()
+
+    resolved = resolve(data, inplace=False)
+
+    assert resolved is not data
+    assert resolved['info'] is data['info']
+    assert resolved['paths'] is not data['paths']
+    assert resolved['paths']['/items']['examples'] is \
+        data['paths']['/items']['examples']
+    assert resolved['definitions']['Base'] is data['definitions']['Base']
+    assert resolved['definitions']['Item'] is not data['definitions']['Item']
+    assert resolved['paths']['/items']['get']['schema'] is \
+        resolved['definitions']['Item']
+
+
+def test_no_refs():
+    data = document()
+    del data['paths']
+    del data['definitions']
+
+    assert resolve(data, inplace=False) is data
+
+
+def test_link():
+    data = {
+        'root': {'$ref': '#/definitions/Node'},
+        'definitions': {
+            'Node': {'children': {'items': {'$ref': '#/definitions/Node'}}}
+        }
+    }
+    original = deepcopy(data)
+
+    resolved = resolve(data, circular='link', inplace=False)
+    node = resolved['definitions']['Node']
+
+    assert data == original
+    assert resolved['root'] is node
+    assert node['children']['items'] is node
+
+
+def test_files(tmpdir):
+    tmpdir.join('other.json').write(json.dumps({
+        'value': {'$ref': '#/target'},
+        'target': 'other'
+    }))
+    data = {'ref': {'$ref': 'other.json#/value'}}
+
+    resolved = resolve(data, cwd=str(tmpdir), inplace=False)
+
+    assert resolved == {'ref': 'other'}
+    assert data == {'ref': {'$ref': 'other.json#/value'}}
@@ -143,3 +143,42 @@ def test_inplace():
 
     assert resolved is data
     assert data['some_ref'] == 'stuff'
+
+
+def test_deep():
+    depth = 20000
+
+    data = {'value': 'deep'}
+    node = data
+    for _ in range(depth):
+        node['child'] = {'items': [{}]}
+        node = node['child']['items'][0]
+    node['ref'] = {'$ref': '#/value'}
+
+    resolved = resolve(data)
+
+    node = resolved
+    for _ in range(depth):
+        node = node['child']['items'][0]
+
+    assert node == {'ref': 'deep'}
+
+
+def test_deep_refs():
+    depth = 20000
+
+    data = {
+        f'd{i}': {'next': {'$ref': f'#/d{i + 1}'}}
+        for i in range(depth)
+    }
+    data[f'd{depth}'] = {'$ref': '#/end'}
+    data['end'] = 'deep'
+
+    resolved = resolve(data)
+
+    node = resolved['d0']
+    for i in range(1, depth):
+        node = node['next']
+        assert node is resolved[f'd{i}']
+
+    assert node['next'] == 'deep'
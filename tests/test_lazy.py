@@ -0,0 +1,125 @@
+import json
+from collections.abc import Mapping, Sequence
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import (
+    resolve, lazy_resolve, CircularReferenceError, DocumentCache, MemoryLoader
+)
+
+
+def test_basic():
+    data = {
+        'some': {'nested': 'data'},
+        'list': [1, {'$ref': '#/some/nested'}],
+        'ref': {'$ref': '#/some'}
+    }
+
+    lazy = lazy_resolve(data)
+
+    assert isinstance(lazy, Mapping)
+    assert isinstance(lazy['list'], Sequence)
+    assert lazy['ref']['nested'] == 'data'
+    assert lazy['list'][-1] == 'data'
+    assert lazy['list'][:] == [1, 'data']
+    assert lazy['ref'] is lazy['some']
+    assert lazy == resolve(json.loads(json.dumps(data)))
+    assert data['ref'] == {'$ref': '#/some'}
+
+
+def test_on_access(tmpdir):
+    tmpdir.join('used.json').write(json.dumps({'some': 'thing'}))
+    tmpdir.join('unused.json').write(json.dumps({'other': 'thing'}))
+
+    data = {
+        'used': {'$ref': 'used.json#/some'},
+        'unused': {'$ref': 'unused.json'}
+    }
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        lazy = lazy_resolve(data, cwd=str(tmpdir))
+
+        assert read.call_count == 0
+        assert lazy['used'] == 'thing'
+        assert lazy['used'] == 'thing'
+        assert read.call_count == 1
+
+
+def test_shared_documents(tmpdir):
+    tmpdir.join('cached.json').write(json.dumps({'some': {'cached': 1}}))
+    cache = DocumentCache()
+    document = cache.load(str(tmpdir.join('cached.json')),
+                          dollar_ref.read_file)
+    pet = {'name': {'first': 'pet'}}
+    memory = MemoryLoader({'pet.json': pet})
+
+    with patch.object(DocumentCache, 'load_copy') as load_copy:
+        lazy = lazy_resolve({
+            'cached': {'$ref': 'cached.json#/some'},
+            'pet': {'$ref': 'memory:/pet.json'}
+        }, cwd=str(tmpdir), cache=cache, loaders={'memory': memory})
+
+        assert lazy['cached']['cached'] == 1
+        assert lazy['pet']['name']['first'] == 'pet'
+
+    assert load_copy.call_count == 0
+    # pylint: disable=protected-access
+    assert lazy['cached']._data is document['some']
+    assert lazy['pet']._data is pet
+
+
+def test_nested_files(tmpdir):
+    tmpdir.mkdir('child').join('child.json').write(json.dumps({
+        'value': 'child',
+        'alias': {'$ref': '#/value'},
+        'grand': {'$ref': '../grand.json'}
+    }))
+    tmpdir.join('grand.json').write(json.dumps({'value': 'grand'}))
+
+    lazy = lazy_resolve({'child': {'$ref': 'child/child.json'}},
+                        cwd=str(tmpdir))
+
+    assert lazy['child']['alias'] == 'child'
+    assert lazy['child']['grand']['value'] == 'grand'
+
+
+def test_recursive():
+    data = {
+        'root': {'$ref': '#/definitions/Node'},
+        'definitions': {
+            'Node': {
+                'value': 1,
+                'child': {'$ref': '#/definitions/Node'}
+            }
+        }
+    }
+
+    lazy = lazy_resolve(data)
+
+    node = lazy['root']
+    for _ in range(100):
+        node = node['child']
+
+    assert node is lazy['root']
+    assert node['value'] == 1
+
+
+def test_loop():
+    lazy = lazy_resolve({
+        'a': {'$ref': '#/b'},
+        'b': {'$ref': '#/a'}
+    })
+
+    with raises(CircularReferenceError):
+        lazy['a']  # pylint: disable=pointless-statement
+
+
+def test_external_only():
+    lazy = lazy_resolve({
+        'value': 1,
+        'ref': {'$ref': '#/value'}
+    }, external_only=True)
+
+    assert lazy['ref'] == {'$ref': '#/value'}
@@ -0,0 +1,126 @@
+import io
+import json
+import tarfile
+import zipfile
+
+from pytest import raises
+
+from dollar_ref import (
+    resolve, join_uri, MemoryLoader, ArchiveLoader, register_loader,
+    unregister_loader, FileResolutionError, LOADERS
+)
+from dollar_ref.batch import Job, run_job
+
+
+def specs():
+    return {
+        'openapi.yaml': '---\nschema:\n  $ref: schemas/pet.json#/Pet\n',
+        'schemas/pet.json': json.dumps({
+            'Pet': {'name': {'$ref': 'common.json#/name'}}
+        }),
+        'schemas/common.json': json.dumps({'name': {'type': 'string'}})
+    }
+
+
+def test_join_uri():
+    assert join_uri('http://host/a/b.json', 'c.json#/x') == \
+        'http://host/a/c.json#/x'
+    assert join_uri('memory:/a/b.json', '../c.json') == 'memory:/c.json'
+    assert join_uri('memory:/a/b.json', '/c.json') == 'memory:/c.json'
+    assert join_uri('memory:/a/b.json', '#/x') == 'memory:/a/b.json#/x'
+    assert join_uri('memory:/a/b.json', 'other:/c.json') == 'other:/c.json'
+    assert join_uri('', 'c.json') == 'c.json'
+
+
+def test_memory():
+    memory = MemoryLoader(specs())
+
+    resolved = resolve({'$ref': 'memory:/openapi.yaml'},
+                       loaders={'memory': memory})
+
+    assert resolved == {'schema': {'name': {'type': 'string'}}}
+
+
+def test_memory_documents_not_modified():
+    pet = {'Pet': {'$ref': '#/Base'}, 'Base': {'type': 'object'}}
+    memory = MemoryLoader({'pet.json': pet})
+
+    resolved = resolve({'$ref': 'memory:pet.json#/Pet'},
+                       loaders={'memory': memory})
+
+    assert resolved == {'type': 'object'}
+    assert pet['Pet'] == {'$ref': '#/Base'}
+
+
+def test_base_uri():
+    memory = MemoryLoader(specs())
+    data = {'$ref': 'schemas/pet.json#/Pet/name'}
+
+    assert resolve(data, cwd='memory:/openapi.yaml',
+                   loaders={'memory': memory}) == {'type': 'string'}
+
+
+def test_zip(tmpdir):
+    path = str(tmpdir.join('specs.zip'))
+
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, content in specs().items():
+            archive.writestr(name, content)
+
+    resolved = resolve({'$ref': 'bundle:/openapi.yaml#/schema'},
+                       loaders={'bundle': ArchiveLoader(path)})
+
+    assert resolved == {'name': {'type': 'string'}}
+
+
+def test_tar(tmpdir):
+    path = str(tmpdir.join('specs.tar.gz'))
+
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, content in specs().items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content.encode())
+            archive.addfile(info, io.BytesIO(content.encode()))
+
+    loader = ArchiveLoader(path)
+
+    resolved = resolve({'$ref': 'bundle:/openapi.yaml#/schema'},
+                       loaders={'bundle': loader})
+
+    assert resolved == {'name': {'type': 'string'}}
+
+    with raises(FileResolutionError) as error:
+        resolve({'$ref': 'bundle:/missing.json'}, loaders={'bundle': loader})
+
+    assert 'missing.json' in str(error.value)
+
+
+def test_unknown_scheme():
+    with raises(FileResolutionError) as error:
+        resolve({'$ref': 'nowhere:/doc.json'})
+
+    assert "'nowhere' scheme" in str(error.value)
+
+
+def test_file_uri(tmpdir):
+    tmpdir.join('doc.json').write(json.dumps({'a': 1}))
+    uri = f"file://{tmpdir.join('doc.json')}"
+
+    assert resolve({'$ref': f'{uri}#/a'}) == 1
+
+
+def test_registered(tmpdir):
+    register_loader('memory', MemoryLoader(specs()))
+
+    try:
+        output = tmpdir.join('out.json')
+
+        run_job(Job('memory:/openapi.yaml', str(output)))
+
+        assert json.loads(output.read()) == {
+            'schema': {'name': {'type': 'string'}}
+        }
+    finally:
+        unregister_loader('memory')
+
+    assert 'memory' not in LOADERS
@@ -0,0 +1,89 @@
+import json
+from unittest.mock import patch
+
+import dollar_ref
+from dollar_ref import resolve
+
+
+def fan_out(depth):
+    definitions = {
+        f'd{i}': {
+            'left': {'$ref': f'#/definitions/d{i + 1}'},
+            'right': {'$ref': f'#/definitions/d{i + 1}'}
+        }
+        for i in range(depth)
+    }
+    definitions[f'd{depth}'] = {'leaf': True}
+
+    return {
+        'root': {'$ref': '#/definitions/d0'},
+        'definitions': definitions
+    }
+
+
+def test_resolved_once():
+    data = fan_out(40)
+
+    with patch('dollar_ref._follow_path',
+               wraps=dollar_ref._follow_path) as follow:
+        resolved = resolve(data)
+
+    assert follow.call_count == 41
+
+    node = resolved['root']
+    for _ in range(40):
+        assert node['left'] is node['right']
+        node = node['left']
+
+    assert node == {'leaf': True}
+
+
+def test_shared():
+    data = {
+        'some': {'nested': 'data'},
+        'first': {'$ref': '#/some'},
+        'second': {'$ref': '#/some'}
+    }
+
+    resolved = resolve(data)
+
+    assert resolved['first'] is resolved['some']
+    assert resolved['second'] is resolved['some']
+
+
+def test_copy():
+    data = {
+        'some': {'nested': 'data'},
+        'first': {'$ref': '#/some'},
+        'second': {'$ref': '#/some'}
+    }
+
+    resolved = resolve(data, copy=True)
+
+    assert resolved['first'] == {'nested': 'data'}
+    assert resolved['second'] == {'nested': 'data'}
+    assert resolved['first'] is not resolved['some']
+    assert resolved['first'] is not resolved['second']
+
+
+def test_file_shared(tmpdir):
+    tmpdir.join('common.json').write(json.dumps({
+        'thing': {'nested': 'data'}
+    }))
+
+    data = {
+        'first': {'$ref': 'common.json#/thing'},
+        'second': {'$ref': 'common.json#/thing'}
+    }
+
+    resolved = resolve(data, cwd=str(tmpdir))
+    assert resolved['first'] is resolved['second']
+
+    data = {
+        'first': {'$ref': 'common.json#/thing'},
+        'second': {'$ref': 'common.json#/thing'}
+    }
+
+    resolved = resolve(data, cwd=str(tmpdir), copy=True)
+    assert resolved['first'] == resolved['second']
+    assert resolved['first'] is not resolved['second']
@@ -0,0 +1,196 @@
+import os
+import json
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import resolve
+from dollar_ref.cache import normalize_path
+from dollar_ref.plan import compile_plan, ref_sites
+
+
+def touch(path, data):
+    stat = os.stat(str(path)) if path.exists() else None
+    path.write(json.dumps(data))
+
+    if stat is not None:
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def template(tmpdir):
+    touch(tmpdir.join('user.json'), {
+        'type': 'object',
+        'properties': {'name': {'$ref': '#/definitions/name'}},
+        'definitions': {'name': {'type': 'string'}}
+    })
+
+    return {
+        'user': {'$ref': 'user.json'},
+        'users': [{'$ref': 'user.json'}, {'$ref': '#/definitions/id'}],
+        'definitions': {'id': {'type': 'integer'}},
+        'limit': 10
+    }
+
+
+def test_ref_sites():
+    data = {
+        'a': {'$ref': '#/b'},
+        'b': [1, {'c': {'$ref': 'file.json#/d'}}],
+        'e': {'$ref': 1}
+    }
+
+    assert ref_sites(data) == [
+        (('a',), '#/b'),
+        (('b', 1, 'c'), 'file.json#/d')
+    ]
+
+
+def test_ref_sites_shared():
+    shared = {'ref': {'$ref': '#/x'}}
+    data = {'a': shared, 'b': [shared]}
+    data['b'].append(data['b'])
+
+    assert ref_sites(data) == [
+        (('a', 'ref'), '#/x'),
+        (('b', 0, 'ref'), '#/x')
+    ]
+
+
+def test_apply(tmpdir):
+    data = template(tmpdir)
+    plan = compile_plan(data, cwd=str(tmpdir))
+
+    expected = resolve(template(tmpdir), cwd=str(tmpdir))
+
+    assert plan.apply() == expected
+    assert data == template(tmpdir)
+    assert plan.sites == [
+        (('user',), 'user.json'),
+        (('users', 0), 'user.json'),
+        (('users', 1), '#/definitions/id')
+    ]
+    assert plan.dependencies == {
+        normalize_path(str(tmpdir.join('user.json')))
+    }
+
+
+def test_apply_independent(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+
+    first = plan.apply()
+    first['user']['type'] = 'changed'
+    first['limit'] = 20
+
+    second = plan.apply()
+
+    assert second['user']['type'] == 'object'
+    assert second['limit'] == 10
+    assert second['user'] is not first['user']
+    assert plan.compilations == 1
+
+
+def test_apply_template(tmpdir):
+    original = template(tmpdir)
+    plan = compile_plan(original, cwd=str(tmpdir))
+    expected = resolve(json.loads(json.dumps(original)), cwd=str(tmpdir))
+
+    data = json.loads(json.dumps(original))
+    data['limit'] = 20
+    data['extra'] = {'more': [1, 2]}
+
+    first = plan.apply(data)
+    second = plan.apply(data)
+
+    expected['limit'] = 20
+    expected['extra'] = {'more': [1, 2]}
+
+    assert first == second == expected
+    assert first['extra'] is data['extra']
+    assert first['user'] is first['users'][0]
+    assert first['user'] is not second['user']
+    assert data['user'] == {'$ref': 'user.json'}
+    assert data['users'][0] == {'$ref': 'user.json'}
+    assert plan.compilations == 1
+
+
+def test_apply_shared_container(tmpdir):
+    shared = [{'$ref': '#/definitions/id'}]
+    data = {'a': shared, 'b': shared, 'definitions': {'id': 1}}
+    plan = compile_plan(data)
+
+    resolved = plan.apply(data)
+
+    assert resolved['a'] == resolved['b'] == [1]
+    assert shared == [{'$ref': '#/definitions/id'}]
+
+
+def test_apply_mismatch(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+
+    data = template(tmpdir)
+    data['users'] = [{'$ref': 'other.json'}]
+
+    with raises(ValueError, match="'user.json' reference at '#/users/0'"):
+        plan.apply(data)
+
+    data = template(tmpdir)
+    del data['users']
+
+    with raises(ValueError):
+        plan.apply(data)
+
+
+def test_apply_shares_like_resolve(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+
+    resolved = plan.apply()
+
+    assert resolved['user'] is resolved['users'][0]
+
+
+def test_invalidation(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+    plan.apply()
+
+    touch(tmpdir.join('user.json'), {'type': 'null'})
+
+    assert plan.changed()
+    assert plan.apply()['user'] == {'type': 'null'}
+    assert plan.compilations == 2
+    assert not plan.changed()
+
+
+def test_no_check(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+
+    touch(tmpdir.join('user.json'), {'type': 'null'})
+
+    assert plan.apply(check=False)['user']['type'] == 'object'
+
+
+def test_removed_dependency(tmpdir):
+    plan = compile_plan(template(tmpdir), cwd=str(tmpdir))
+
+    tmpdir.join('user.json').remove()
+
+    with raises(dollar_ref.FileResolutionError):
+        plan.apply()
+
+
+def test_circular(tmpdir):
+    plan = compile_plan({'a': {'b': {'$ref': '#/a'}}}, circular='link')
+
+    resolved = plan.apply()
+
+    assert resolved['a']['b'] is resolved['a']
+
+
+def test_unpicklable():
+    def marker():
+        pass
+
+    plan = compile_plan({'a': {'$ref': '#/b'}, 'b': {'call': marker}})
+    resolved = plan.apply()
+
+    assert resolved == {'a': {'call': marker}, 'b': {'call': marker}}
+    assert resolved['a'] is resolved['b']
@@ -0,0 +1,89 @@
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import resolve, InternalResolutionError
+from dollar_ref.pointer import (
+    PointerIndex, PointerLookupError, compile_pointer
+)
+
+
+def test_compile():
+    assert compile_pointer('#') == ()
+    assert compile_pointer('#/') == ()
+    assert compile_pointer('') == ()
+    assert compile_pointer('#/a/b') == ('a', 'b')
+    assert compile_pointer('#/paths/~1users~1{id}') == ('paths', '/users/{id}')
+    assert compile_pointer('#/~01') == ('~1',)
+    assert compile_pointer('#/a//b') == ('a', '', 'b')
+
+    with raises(ValueError):
+        compile_pointer('#anchor')
+
+
+def test_escaped_and_indices():
+    data = {
+        'paths': {
+            '/users': {'get': 'users'},
+            'a~b': 'tilde'
+        },
+        'list': [{'name': 'first'}, {'name': 'second'}],
+        'slash': {'$ref': '#/paths/~1users/get'},
+        'tilde': {'$ref': '#/paths/a~0b'},
+        'item': {'$ref': '#/list/1/name'}
+    }
+
+    resolved = resolve(data)
+
+    assert resolved['slash'] == 'users'
+    assert resolved['tilde'] == 'tilde'
+    assert resolved['item'] == 'second'
+
+
+def test_bad_indices():
+    for ref in ('#/list/2', '#/list/01', '#/list/-', '#/list/x',
+                '#/value/x', '#anchor'):
+        with raises(InternalResolutionError):
+            resolve({
+                'list': [1, 2],
+                'value': 'scalar',
+                'ref': {'$ref': ref}
+            })
+
+
+def test_index():
+    definitions = {'a': {'x': 1}, 'b': {'y': 2}, 'c': {'$ref': '#/x'}}
+    document = {'definitions': definitions}
+    index = PointerIndex()
+
+    assert index.find(document, ('definitions', 'a')) is definitions['a']
+    assert len(index) == 2
+
+    with patch('dollar_ref.pointer.walk') as walk:
+        assert index.find(document, ('definitions', 'a')) is \
+            definitions['a']
+        assert index.find(document, ('definitions', 'b')) is \
+            definitions['b']
+        assert index.find(document, ('definitions', 'c')) is \
+            definitions['c']
+
+    assert walk.call_count == 0
+    assert len(index) == 3
+
+    with raises(PointerLookupError):
+        index.find(document, ('definitions', 'd'))
+
+
+def test_shared_index():
+    data = {
+        'definitions': {f'd{i}': {'value': i} for i in range(10)},
+        'refs': [{'$ref': f'#/definitions/d{i}'} for i in range(10)]
+    }
+
+    with patch('dollar_ref.pointer.walk',
+               wraps=dollar_ref.pointer.walk) as walk:
+        resolved = resolve(data)
+
+    assert walk.call_count == 1
+    assert resolved['refs'] == [{'value': i} for i in range(10)]
@@ -0,0 +1,63 @@
+import json
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import resolve, DocumentCache, FileResolutionError
+
+
+def write_tree(tmpdir, count=20):
+    for i in range(count):
+        child = {'name': f'file{i}', 'inner': {'$ref': '#/name'}}
+
+        if i + 1 < count:
+            child['next'] = {'$ref': f'sub/../file{i + 1}.json'}
+
+        tmpdir.join(f'file{i}.json').write(json.dumps(child))
+
+    tmpdir.mkdir('sub')
+
+    return {
+        'first': {'$ref': 'file0.json'},
+        'all': [{'$ref': f'file{i}.json#/name'} for i in range(count)]
+    }
+
+
+def test_same_result(tmpdir):
+    data = write_tree(tmpdir)
+
+    sequential = resolve(json.loads(json.dumps(data)), cwd=str(tmpdir))
+    parallel = resolve(json.loads(json.dumps(data)), cwd=str(tmpdir),
+                       workers=4)
+
+    assert parallel == sequential
+
+
+def test_reads_once(tmpdir):
+    data = write_tree(tmpdir)
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        resolve(data, cwd=str(tmpdir), workers=4)
+
+    assert read.call_count == 20
+
+
+def test_processes(tmpdir):
+    data = write_tree(tmpdir, count=5)
+
+    sequential = resolve(json.loads(json.dumps(data)), cwd=str(tmpdir))
+    parallel = resolve(json.loads(json.dumps(data)), cwd=str(tmpdir),
+                       workers=2, processes=True, cache=DocumentCache())
+
+    assert parallel == sequential
+
+
+def test_errors(tmpdir):
+    data = write_tree(tmpdir, count=3)
+    data['missing'] = {'$ref': 'missing.json'}
+
+    with raises(FileResolutionError) as exc:
+        resolve(data, cwd=str(tmpdir), workers=4)
+
+    assert str(exc.value).startswith("Could not resolve 'missing.json'")
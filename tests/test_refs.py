@@ -0,0 +1,114 @@
+import json
+import base64
+from unittest.mock import patch
+
+import dollar_ref
+from dollar_ref import resolve, read_file, RefIndex, scan
+from dollar_ref.decoders import register_decoder, unregister_decoder
+
+
+def test_scan_json():
+    raw = json.dumps({
+        'a': {'$ref': 'other.json#/a'},
+        'b': [{'$ref': '#/c/\\"quoted\\"'}],
+        'c': 'mentions \\"$ref\\": \\"not-a-ref\\"'
+    }).encode()
+
+    assert scan(raw, 'json') == ('other.json#/a', '#/c/\\"quoted\\"')
+    assert scan(raw.decode(), 'json') == scan(raw, 'json')
+
+
+def test_scan_no_refs():
+    assert scan(b'{"a": [1, 2, {"b": "ref"}]}', 'json') == ()
+    assert scan('---\na: ref\n', 'yaml') == ()
+
+
+def test_scan_unknown():
+    assert scan('---\na:\n  $ref: other.yaml\n', 'yaml') is None
+    assert scan(b'{"\\u0024ref": "#/a"}', 'json') is None
+    assert scan('{"a": 1}'.encode('utf-16'), 'json') is None
+    assert scan(b'{"$\\u0072ef": "#/a"}', 'json') is None
+    assert scan(b'{"a": "caf\\u00e9"}', 'json') is None
+    assert scan('"$r\\\n  ef": other.yaml\n', 'yaml') is None
+    assert scan(b'{"a": 1}', 'b64json') is None
+
+
+def test_read_file(tmpdir):
+    refs = RefIndex()
+
+    plain = tmpdir.join('plain.json')
+    plain.write('{"a": 1}')
+    linked = tmpdir.join('linked.json')
+    linked.write('{"a": {"$ref": "plain.json"}}')
+
+    plain_data = read_file(str(plain), refs=refs)
+    linked_data = read_file(str(linked), refs=refs)
+
+    assert refs.refs(plain_data) == ()
+    assert not refs.has_refs(plain_data)
+    assert refs.refs(linked_data) == ('plain.json',)
+    assert refs.has_refs({})
+
+
+def test_skip_plain_files(tmpdir):
+    tmpdir.join('plain.json').write(json.dumps({
+        'items': [{'id': i} for i in range(100)]
+    }))
+    tmpdir.join('linked.json').write(json.dumps({
+        'plain': {'$ref': 'plain.json#/items'},
+        'again': {'$ref': 'plain.json#/items'}
+    }))
+
+    resolver = dollar_ref._Resolver()
+    resolved = resolver.resolve({'$ref': 'linked.json'}, cwd=str(tmpdir))
+
+    plain = resolver.documents[
+        dollar_ref.normalize_path(str(tmpdir.join('plain.json')))
+    ]
+
+    assert resolved['plain'] is plain['items']
+    assert resolved['again'] is plain['items']
+    assert id(plain['items']) not in resolver.resolved
+
+
+def test_escaped_ref(tmpdir):
+    tmpdir.join('leaf.json').write('{"leaf": true}')
+    tmpdir.join('escaped.json').write('{"a": {"$\\u0072ef": "leaf.json"}}')
+
+    resolved = resolve({'$ref': 'escaped.json'}, cwd=str(tmpdir))
+
+    assert resolved == {'a': {'leaf': True}}
+
+
+def test_other_decoders(tmpdir):
+    tmpdir.join('leaf.json').write('{"leaf": true}')
+    tmpdir.join('doc.b64').write(base64.b64encode(
+        b'{"a": {"$ref": "leaf.json"}}'
+    ))
+
+    register_decoder('b64json',
+                     lambda raw: json.loads(base64.b64decode(raw)),
+                     extensions=('.b64',), binary=True)
+
+    try:
+        resolved = resolve({'$ref': 'doc.b64'}, cwd=str(tmpdir))
+    finally:
+        unregister_decoder('b64json')
+
+    assert resolved == {'a': {'leaf': True}}
+
+
+def test_prefetch_without_walking(tmpdir):
+    for i in range(5):
+        child = {'name': f'file{i}'}
+        if i + 1 < 5:
+            child['next'] = {'$ref': f'file{i + 1}.json'}
+
+        tmpdir.join(f'file{i}.json').write(json.dumps(child))
+
+    with patch('dollar_ref._file_refs', wraps=dollar_ref._file_refs) as walk:
+        resolved = resolve({'$ref': 'file0.json'}, cwd=str(tmpdir),
+                           workers=2)
+
+    assert walk.call_count == 1
+    assert resolved['next']['next']['next']['next'] == {'name': 'file4'}
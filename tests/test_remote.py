@@ -0,0 +1,223 @@
+import json
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from pytest import fixture, raises
+
+from dollar_ref import (
+    resolve, RemoteLoader, RemoteResolutionError, ResolutionError
+)
+from dollar_ref.console import main
+
+
+def teardown_function():
+    log = logging.getLogger('dollar-ref')
+    log.handlers = []
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.headers.append(dict(self.headers))
+
+        if self.path == '/moved.json':
+            self.send_response(302)
+            self.send_header('Location', '/specs/a.json')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if self.path == '/elsewhere.json':
+            port = self.server.server_address[1]
+            self.send_response(302)
+            self.send_header('Location',
+                             f'http://localhost:{port}/specs/a.json')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        try:
+            body, content_type = self.server.documents[self.path]
+        except KeyError:
+            self.send_error(404)
+            return
+
+        etag = f'"{hash(body)}"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.requests = []
+    httpd.headers = []
+    httpd.not_modified = 0
+    httpd.documents = {
+        '/specs/a.json': (json.dumps({
+            'name': 'a',
+            'b': {'$ref': 'sub/b.yaml#/name'},
+            'self': {'$ref': '#/name'}
+        }).encode(), 'application/json'),
+        '/specs/sub/b.yaml': (b'name: b\n', 'text/plain')
+    }
+    httpd.base = f'http://127.0.0.1:{httpd.server_address[1]}'
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield httpd
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_no_loader(server):
+    with raises(RemoteResolutionError):
+        resolve({'$ref': f'{server.base}/specs/a.json'})
+
+
+def test_resolve(server):
+    remote = RemoteLoader()
+
+    try:
+        resolved = resolve({'a': {'$ref': f'{server.base}/specs/a.json'}},
+                           remote=remote)
+    finally:
+        remote.close()
+
+    assert resolved == {'a': {'name': 'a', 'b': 'b', 'self': 'a'}}
+    assert server.requests == ['/specs/a.json', '/specs/sub/b.yaml']
+
+
+def test_redirect(server):
+    remote = RemoteLoader()
+
+    resolved = resolve({'$ref': f'{server.base}/moved.json#/b'},
+                       remote=remote)
+
+    assert resolved == 'b'
+
+
+def test_redirect_to_other_host(server):
+    remote = RemoteLoader(headers={'Authorization': 'secret'})
+
+    try:
+        for _ in range(2):
+            remote.fetch(f'{server.base}/elsewhere.json')
+
+            first, redirected = server.headers[-2:]
+
+            assert first['Authorization'] == 'secret'
+            assert 'Authorization' not in redirected
+            assert 'If-None-Match' not in redirected
+
+        assert 'If-None-Match' in first
+    finally:
+        remote.close()
+
+    remote = RemoteLoader(headers={'Authorization': 'secret'})
+
+    try:
+        remote.fetch(f'{server.base}/moved.json')
+    finally:
+        remote.close()
+
+    assert server.headers[-1]['Authorization'] == 'secret'
+
+
+def test_not_found(server):
+    with raises(ResolutionError) as error:
+        resolve({'$ref': f'{server.base}/missing.json'},
+                remote=RemoteLoader())
+
+    assert '404' in str(error.value)
+
+
+def test_revalidation_and_offline(server, tmpdir):
+    url = f'{server.base}/specs/sub/b.yaml'
+    directory = str(tmpdir.join('remote'))
+
+    assert RemoteLoader(directory).fetch(url).body == b'name: b\n'
+
+    loader = RemoteLoader(directory)
+    response = loader.fetch(url)
+
+    assert response.body == b'name: b\n'
+    assert server.not_modified == 1
+
+    server.shutdown()
+
+    offline = RemoteLoader(directory, offline=True)
+
+    assert resolve({'$ref': f'{url}#/name'}, remote=offline) == 'b'
+
+    with raises(RemoteResolutionError):
+        resolve({'$ref': f'{server.base}/specs/a.json'}, remote=offline)
+
+
+def test_keep_alive(server):
+    remote = RemoteLoader()
+
+    for _ in range(3):
+        remote.fetch(f'{server.base}/specs/a.json')
+
+    assert len(remote._idle[('http', server.base[7:])]) == 1
+
+
+def test_prefetch(server):
+    server.documents.update({
+        f'/specs/item{i}.json': (json.dumps({'item': i}).encode(),
+                                 'application/json')
+        for i in range(10)
+    })
+
+    data = {
+        'items': [{'$ref': f'{server.base}/specs/item{i}.json#/item'}
+                  for i in range(10)]
+    }
+
+    assert resolve(data, remote=RemoteLoader(), workers=4) == {
+        'items': list(range(10))
+    }
+
+
+def test_console(server, tmpdir):
+    input_file = tmpdir.join('input.json')
+    input_file.write(json.dumps({'$ref': f'{server.base}/specs/a.json'}))
+    output_file = tmpdir.join('output.json')
+    cache_dir = str(tmpdir.join('cache'))
+
+    main([str(input_file), str(output_file), '-i', '--remote',
+          '--cache-dir', cache_dir])
+
+    assert json.loads(output_file.read()) == {
+        'name': 'a', 'b': 'b', 'self': 'a'
+    }
+
+    server.shutdown()
+    output_file.remove()
+
+    main([str(input_file), str(output_file), '-i', '--offline',
+          '--cache-dir', cache_dir])
+
+    assert json.loads(output_file.read())['b'] == 'b'
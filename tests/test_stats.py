@@ -0,0 +1,117 @@
+import json
+import logging
+
+from dollar_ref import resolve, DocumentCache, ResolutionStats
+from dollar_ref.console import main
+
+
+def teardown_function():
+    log = logging.getLogger('dollar-ref')
+    log.handlers = []
+
+
+def tree(tmpdir):
+    tmpdir.join('child.yaml').write('---\nvalue: child\n')
+    tmpdir.join('other.json').write(json.dumps({'value': 'other'}))
+
+    return {
+        'definitions': {'a': {'nested': [{'deep': True}]}},
+        'first': {'$ref': '#/definitions/a'},
+        'second': {'$ref': '#/definitions/a'},
+        'child': {'$ref': 'child.yaml'},
+        'again': {'$ref': 'child.yaml#/value'},
+        'other': {'$ref': 'other.json'}
+    }
+
+
+def test_counters(tmpdir):
+    events = []
+    stats = ResolutionStats(hook=lambda event, **details: events.append(
+        (event, details)
+    ))
+
+    resolve(tree(tmpdir), cwd=str(tmpdir), stats=stats)
+
+    assert stats.resolutions == 1
+    assert stats.files_read == 2
+    assert set(stats.decoders) == {'yaml', 'json'}
+    assert stats.decoders['yaml'][0] == 1
+    assert stats.internal_refs == 2
+    assert stats.external_refs == 3
+    assert stats.memo_hits == 1
+    assert stats.document_hits == 1
+    assert stats.max_depth >= 4
+    assert {path for path, _ in stats.slowest()} == {
+        str(tmpdir.join('child.yaml')), str(tmpdir.join('other.json'))
+    }
+
+    assert [event for event, _ in events].count('file') == 2
+    assert events[-1][0] == 'resolution'
+    assert ('memo', {'ref': '#/definitions/a'}) in events
+
+
+def test_cache(tmpdir):
+    stats = ResolutionStats()
+    cache = DocumentCache()
+    data = json.dumps(tree(tmpdir))
+
+    for _ in range(2):
+        resolve(json.loads(data), cwd=str(tmpdir), cache=cache, stats=stats)
+
+    assert stats.resolutions == 2
+    assert stats.files_read == 2
+    assert stats.cache_misses == 2
+    assert stats.cache_hits == 2
+
+
+def test_report(tmpdir):
+    stats = ResolutionStats()
+    resolve(tree(tmpdir), cwd=str(tmpdir), stats=stats)
+
+    report = stats.as_dict(slowest=1)
+
+    assert json.loads(json.dumps(report)) == report
+    assert len(report['slowest_files']) == 1
+    assert report['external_refs'] == 3
+
+    table = stats.format_table()
+
+    assert 'yaml decoding' in table
+    assert 'slowest files:' in table
+
+
+def test_merge(tmpdir):
+    stats = ResolutionStats()
+    resolve(tree(tmpdir), cwd=str(tmpdir), stats=stats)
+
+    merged = ResolutionStats()
+    merged.merge(stats.as_dict(slowest=None))
+    merged.merge(stats.as_dict(slowest=None))
+
+    assert merged.resolutions == 2
+    assert merged.files_read == 4
+    assert merged.external_refs == 6
+    assert merged.decoders['yaml'][0] == 2
+    assert merged.max_depth == stats.max_depth
+    assert merged.files == {path: 2 * elapsed
+                            for path, elapsed in stats.files.items()}
+
+
+def test_console(tmpdir, capsys):
+    root = tmpdir.join('root.json')
+    root.write(json.dumps(tree(tmpdir)))
+
+    main([str(root), '-', '-i', '--stats', 'json'])
+
+    out, err = capsys.readouterr()
+    report = json.loads(err[err.index('{'):])
+
+    assert json.loads(out)['again'] == 'child'
+    assert report['files_read'] == 3
+    assert report['external_refs'] == 3
+
+    main([str(root), str(tmpdir.join('out.json')), '--stats'])
+
+    out, _ = capsys.readouterr()
+
+    assert 'files read' in out
@@ -0,0 +1,162 @@
+import os
+import json
+import asyncio
+import logging
+from unittest.mock import patch
+
+from pytest import raises
+
+import dollar_ref
+from dollar_ref import (
+    resolve, resolve_file, resolve_internal, lazy_resolve, async_resolve
+)
+from dollar_ref.batch import Job
+from dollar_ref.cache import normalize_path
+from dollar_ref.console import main
+from dollar_ref.watch import Watcher
+
+
+def teardown_function():
+    log = logging.getLogger('dollar-ref')
+    log.handlers = []
+
+
+def touch(path, data):
+    stat = os.stat(str(path)) if path.exists() else None
+    path.write(json.dumps(data))
+
+    if stat is not None:
+        os.utime(str(path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def tree(tmpdir):
+    touch(tmpdir.join('shared.json'), {'shared': 1})
+    touch(tmpdir.join('a_only.json'), {'a': 1})
+    touch(tmpdir.join('a.json'), {
+        'shared': {'$ref': 'shared.json'},
+        'own': {'$ref': 'a_only.json'}
+    })
+    touch(tmpdir.join('b.json'), {'shared': {'$ref': 'shared.json'}})
+
+    return [Job(str(tmpdir.join(f'{name}.json')),
+                str(tmpdir.join(f'{name}.out.json')))
+            for name in ('a', 'b')]
+
+
+def test_dependencies(tmpdir):
+    dependencies = set()
+
+    with raises(dollar_ref.FileResolutionError):
+        resolve({'$ref': 'missing.json'}, cwd=str(tmpdir),
+                dependencies=dependencies)
+
+    assert dependencies == {normalize_path(str(tmpdir.join('missing.json')))}
+
+
+def test_dependencies_of_all_resolutions(tmpdir):
+    jobs = tree(tmpdir)
+    root = str(tmpdir.join('a.json'))
+    expected = {normalize_path(str(tmpdir.join(name)))
+                for name in ('shared.json', 'a_only.json')}
+
+    dependencies = set()
+    resolve_file('a.json', str(tmpdir), dependencies=dependencies)
+
+    assert dependencies == expected | {normalize_path(root)}
+
+    dependencies = set()
+    resolve_internal('#/own', {'own': {'$ref': 'a_only.json'}},
+                     str(tmpdir), dependencies=dependencies)
+
+    assert dependencies == {normalize_path(str(tmpdir.join('a_only.json')))}
+
+    dependencies = set()
+    lazy = lazy_resolve({'a': {'$ref': 'a.json'}}, cwd=str(tmpdir),
+                        dependencies=dependencies)
+
+    assert dependencies == set()
+    assert lazy['a']['shared'] == {'shared': 1}
+    assert dependencies == {
+        normalize_path(root), normalize_path(str(tmpdir.join('shared.json')))
+    }
+
+    dependencies = set()
+    loop = asyncio.new_event_loop()
+
+    try:
+        loop.run_until_complete(async_resolve(
+            {'$ref': jobs[0].input_uri}, cwd=str(tmpdir),
+            dependencies=dependencies
+        ))
+    finally:
+        loop.close()
+
+    assert dependencies == expected | {normalize_path(root)}
+
+
+def test_incremental(tmpdir):
+    jobs = tree(tmpdir)
+    watcher = Watcher(jobs, external_only=False)
+
+    assert [error for _, _, error in watcher.build()] == [None, None]
+    assert watcher.dependents[
+        normalize_path(str(tmpdir.join('shared.json')))
+    ] == set(jobs)
+    assert watcher.poll() == (set(), [])
+
+    touch(tmpdir.join('a_only.json'), {'a': 2})
+
+    with patch('dollar_ref.read_file', wraps=dollar_ref.read_file) as read:
+        changed, results = watcher.poll()
+
+    assert changed == {normalize_path(str(tmpdir.join('a_only.json')))}
+    assert [job for job, _, _ in results] == [jobs[0]]
+    assert read.call_count == 1
+    assert json.loads(tmpdir.join('a.out.json').read())['own'] == {'a': 2}
+
+    touch(tmpdir.join('shared.json'), {'shared': 2})
+
+    _, results = watcher.poll()
+
+    assert [job for job, _, _ in results] == jobs
+    assert json.loads(tmpdir.join('b.out.json').read()) == {
+        'shared': {'shared': 2}
+    }
+
+
+def test_changed_dependencies(tmpdir):
+    jobs = tree(tmpdir)
+    watcher = Watcher(jobs[:1], external_only=False)
+    watcher.build()
+
+    touch(tmpdir.join('a.json'), {'own': {'$ref': 'new.json'}})
+
+    _, results = watcher.poll()
+
+    assert results[0][2] is not None
+    assert normalize_path(str(tmpdir.join('shared.json'))) \
+        not in watcher.signatures
+
+    touch(tmpdir.join('new.json'), {'new': 1})
+
+    _, results = watcher.poll()
+
+    assert results[0][2] is None
+    assert json.loads(tmpdir.join('a.out.json').read()) == {
+        'own': {'new': 1}
+    }
+
+
+def test_console(tmpdir, capsys):
+    jobs = tree(tmpdir)
+
+    with patch('dollar_ref.watch.Watcher.watch',
+               side_effect=KeyboardInterrupt):
+        main([jobs[0].input_uri, jobs[0].output, '--watch', '-i'])
+
+    stdout, _ = capsys.readouterr()
+    lines = stdout.splitlines()
+
+    assert lines[0].startswith(f"Resolved '{jobs[0].input_uri}' into "
+                               f"'{jobs[0].output}' in ")
+    assert lines[1] == 'Watching 3 files for changes.'
@@ -0,0 +1,137 @@
+import io
+import json
+import datetime
+
+import yaml
+
+from dollar_ref import write_json, write_yaml
+from dollar_ref.console import main
+
+
+def sample():
+    shared = {'shared': [1, 2]}
+
+    return {
+        'scalars': [1, '2', None, True, 1.5, 'yes', '', 'multi\nline',
+                    datetime.date(2020, 1, 1)],
+        'empty': {'map': {}, 'list': []},
+        'first': shared,
+        'second': shared,
+        'nested': [[shared]]
+    }
+
+
+def test_json():
+    data = {'some': ['data', {'nested': None}], 'number': 1.5}
+    out = io.StringIO()
+
+    write_json(data, out)
+
+    assert out.getvalue() == json.dumps(data)
+
+
+def test_json_options():
+    data = {
+        'b': [{'é': [1, {'deep': [2.5, None]}]}, [], {}],
+        'a': {1: 'int key', 2: 'ü'},
+        'c': 'text'
+    }
+
+    for options in ({}, {'sort_keys': True}, {'ensure_ascii': False},
+                    {'separators': (',', ':')}, {'indent': 2}):
+        out = io.StringIO()
+
+        write_json(data, out, **options)
+
+        assert out.getvalue() == json.dumps(data, **options)
+
+    for scalar in ('text', 1, None, [], {}):
+        out = io.StringIO()
+
+        write_json(scalar, out)
+
+        assert out.getvalue() == json.dumps(scalar)
+
+
+def test_yaml():
+    for dumper in (yaml.Dumper, yaml.CDumper):
+        out = io.StringIO()
+
+        write_yaml(sample(), out, dumper=dumper)
+
+        assert out.getvalue() == yaml.dump(sample(), Dumper=dumper,
+                                           explicit_start=True,
+                                           default_flow_style=False)
+
+
+def test_yaml_scalar():
+    out = io.StringIO()
+
+    write_yaml('scalar', out, dumper=yaml.Dumper)
+
+    assert out.getvalue() == '--- scalar\n...\n'
+
+
+def test_yaml_deep():
+    data = node = {}
+    for _ in range(5000):
+        node['child'] = [{}]
+        node = node['child'][0]
+
+    out = io.StringIO()
+
+    write_yaml(data, out)
+
+    assert out.getvalue().count('child:') == 5000
+
+
+class ExpandingDumper(yaml.Dumper):
+    def ignore_aliases(self, data):
+        return True
+
+
+def test_yaml_expand():
+    out = io.StringIO()
+
+    write_yaml(sample(), out, dumper=yaml.Dumper, expand=True)
+
+    assert out.getvalue() == yaml.dump(sample(), Dumper=ExpandingDumper,
+                                       explicit_start=True,
+                                       default_flow_style=False)
+
+    shared = {'shared': 1}
+    data = {'loop': {'shared': shared}, 'other': shared}
+    data['loop']['self'] = data['loop']
+    out = io.StringIO()
+
+    write_yaml(data, out, expand=True)
+
+    assert out.getvalue() == (
+        '---\n'
+        'loop: &id001\n'
+        '  self: *id001\n'
+        '  shared:\n'
+        '    shared: 1\n'
+        'other:\n'
+        '  shared: 1\n'
+    )
+
+
+def test_console_yaml(tmpdir):
+    tmpdir.join('shared.yaml').write('---\nvalue: 1\n')
+    tmpdir.join('in.yaml').write(
+        '---\n'
+        'a:\n  $ref: shared.yaml\n'
+        'b:\n  $ref: shared.yaml\n'
+        'c:\n  $ref: "#/a"\n'
+    )
+    out = tmpdir.join('out.yaml')
+
+    for args in ([], ['-i']):
+        main([str(tmpdir.join('in.yaml')), str(out)] + args)
+
+        assert out.read() == (
+            '---\n'
+            'a:\n  value: 1\n'
+            'b:\n  value: 1\n'
+        ) + ('c:\n  value: 1\n' if args else "c:\n  $ref: '#/a'\n")